@@ -0,0 +1,62 @@
+"""
+Бенчмарк холодного старта: сколько стоит импорт задач в новом процессе.
+
+Сравниваются два сценария:
+  - lazy  - запуск, которому нужен только ShipsTasks (`from queries import ShipsTasks`);
+  - eager - прежнее поведение queries.py: импорт моделей и задач всех БД, psycopg2,
+            асинхронного расширения SQLAlchemy и построение движка при импорте.
+
+Каждый сценарий запускается в отдельном процессе несколько раз, из времени вычитается
+время запуска пустого интерпретатора. Запуск из корня проекта:
+
+    python -m benchmarks.import_time --repeat 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    'python': 'pass',
+    'lazy': 'from queries import ShipsTasks',
+    'eager': (
+        'import psycopg2, sqlalchemy.ext.asyncio; '
+        'import tasks.computer_firm, tasks.recycling_firm, tasks.ships; '
+        'from db.database import get_engine; get_engine()'
+    ),
+}
+
+
+def measure(code, repeat):
+    """Возвращает медиану времени выполнения `python -c code` в новом процессе (в секундах)."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT, check=True)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=10, help='число запусков каждого сценария')
+    args = parser.parse_args()
+
+    results = {name: measure(code, args.repeat) for name, code in SCENARIOS.items()}
+    interpreter = results.pop('python')
+
+    print(f'Запуск интерпретатора: {interpreter * 1000:.1f} мс')
+    for name, seconds in results.items():
+        print(f'{name:>5}: {(seconds - interpreter) * 1000:.1f} мс сверх запуска интерпретатора')
+
+    lazy, eager = results['lazy'] - interpreter, results['eager'] - interpreter
+    if eager > 0:
+        print(f'Холодный старт для ShipsTasks быстрее на {(1 - lazy / eager) * 100:.0f}%')
+
+
+if __name__ == '__main__':
+    main()
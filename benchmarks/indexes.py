@@ -0,0 +1,82 @@
+"""
+Бенчмарк: ускорение задач от вторичных индексов моделей (см. db/indexes.py).
+
+Каждая ORM-задача выполняется несколько раз без объявленных индексов, затем индексы
+создаются, и задача выполняется снова. Перед каждым из двух прогонов статистика таблиц
+обновляется (ANALYZE). Для каждой задачи выводится медианное время
+в обоих режимах и ускорение. Заметный эффект индексы дают на больших наборах данных,
+поэтому по умолчанию данные загружаются с коэффициентом 10.
+
+Запуск из корня проекта:
+
+    python -m benchmarks.indexes --load                 # загрузить данные sf=10 и сравнить
+    python -m benchmarks.indexes --sf 100 --load --domain computer_firm
+    python -m benchmarks.indexes --task 1 --task 5 --iterations 20
+"""
+import argparse
+import statistics
+
+from tabulate import tabulate
+
+from db.indexes import analyze_tables, create_indexes, drop_indexes
+from tasks.registry import ORM, TASK_CLASSES, run_task, select_tasks
+
+
+def measure(specs, iterations, warmup):
+    """Возвращает словарь {задача: медианное время в мс}; задачи с ошибкой пропускаются."""
+    timings = {}
+    for spec in specs:
+        for _ in range(warmup):
+            run_task(spec)
+        results = [run_task(spec) for _ in range(iterations)]
+        if all(result.ok for result in results):
+            timings[spec.name] = statistics.median(result.seconds for result in results) * 1000
+        else:
+            print(f'{spec.name}: {next(result.error for result in results if not result.ok).splitlines()[-1]}')
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--task', type=int, action='append', dest='numbers', metavar='N',
+                        help='номер задачи (по умолчанию - все ORM-задачи)')
+    parser.add_argument('--domain', action='append', choices=list(TASK_CLASSES),
+                        help='предметная область (можно указать несколько раз), по умолчанию - все')
+    parser.add_argument('--iterations', type=int, default=10, help='число замеров каждой задачи')
+    parser.add_argument('--warmup', type=int, default=2, help='число прогревочных запусков')
+    parser.add_argument('--sf', type=float, default=10, help='масштабный коэффициент набора данных (для --load)')
+    parser.add_argument('--seed', type=int, default=0, help='зерно генератора данных (для --load)')
+    parser.add_argument('--load', action='store_true',
+                        help='перед замерами загрузить данные генератором db.generator с коэффициентом --sf')
+    args = parser.parse_args()
+
+    domains = args.domain or list(TASK_CLASSES)
+    if args.load:
+        from db.generator import load_scale_factor
+
+        load_scale_factor(args.sf, args.seed, domains=domains)
+
+    specs = [spec for spec in select_tasks(args.numbers, domains) if spec.variant == ORM]
+    if not specs:
+        parser.error('не найдено ни одной ORM-задачи')
+
+    # Перед каждым замером обновляем статистику: после массовой загрузки и пересоздания индексов
+    # планировщик иначе работает по устаревшим или отсутствующим оценкам
+    drop_indexes(domains)
+    analyze_tables(domains)
+    without_indexes = measure(specs, args.iterations, args.warmup)
+    create_indexes(domains)
+    analyze_tables(domains)
+    with_indexes = measure(specs, args.iterations, args.warmup)
+
+    rows = [
+        (name, f'{without_indexes[name]:.3f}', f'{with_indexes[name]:.3f}',
+         f'{without_indexes[name] / with_indexes[name]:.2f}x' if with_indexes[name] else '-')
+        for name in without_indexes if name in with_indexes
+    ]
+    print('Медианное время в миллисекундах:')
+    print(tabulate(rows, ['task', 'without indexes', 'with indexes', 'speedup'], tablefmt='pretty'))
+
+
+if __name__ == '__main__':
+    main()
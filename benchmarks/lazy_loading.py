@@ -0,0 +1,77 @@
+"""
+Бенчмарк стратегий загрузки связей на обходе производители -> модели -> изделия
+(ComputerFirmTasks.maker_catalog).
+
+Для каждого масштабного коэффициента из --sf данные компьютерной фирмы загружаются заново
+генератором db.generator, после чего отчет несколько раз выполняется со стратегиями lazy, select
+и joined для связей Product.pcs/laptops/printers. Для каждой стратегии выводятся медианное время
+и число запросов (по db/instrumentation.py): при ленивой загрузке оно растет с числом моделей (N+1),
+при select и joined - не зависит от него. Со стратегией raise отчет завершается ошибкой
+на первом обращении к незагруженной связи.
+
+Запуск из корня проекта:
+
+    python -m benchmarks.lazy_loading --sf 1 --sf 10
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import InvalidRequestError
+from tabulate import tabulate
+
+from db.database import get_engine
+from db.db_1_computer_firm.models import Product
+from db.generator import load_scale_factor
+from db.instrumentation import enable_instrumentation, track_task
+from tasks.computer_firm import ComputerFirmTasks
+
+RELATIONSHIPS = ('Product.pcs', 'Product.laptops', 'Product.printers')
+STRATEGIES = ('lazy', 'select', 'joined')
+
+
+def run_catalog(strategy):
+    """Выполняет отчет в новой сессии; возвращает (время в секундах, число запросов, число строк)."""
+    loaders = {name: strategy for name in RELATIONSHIPS}
+    with track_task(f'maker_catalog[{strategy}]') as metrics:
+        started = time.perf_counter()
+        with ComputerFirmTasks(loaders=loaders) as tasks:
+            rows = sum(1 for _ in tasks.maker_catalog())
+        seconds = time.perf_counter() - started
+    return seconds, metrics.statements, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sf', type=float, action='append', dest='scale_factors',
+                        help='масштабный коэффициент (можно указать несколько раз), по умолчанию 1 и 10')
+    parser.add_argument('--seed', type=int, default=0, help='зерно генератора данных')
+    parser.add_argument('--iterations', type=int, default=3, help='число замеров каждой стратегии')
+    args = parser.parse_args()
+
+    enable_instrumentation()
+    rows = []
+    for sf in sorted(args.scale_factors or [1, 10]):
+        load_scale_factor(sf, args.seed, domains=['computer_firm'])
+        with get_engine('computer_firm').connect() as connection:
+            products = connection.scalar(select(func.count()).select_from(Product))
+
+        for strategy in STRATEGIES:
+            samples = [run_catalog(strategy) for _ in range(args.iterations)]
+            _, statements, _ = samples[-1]
+            median = statistics.median(seconds for seconds, _, _ in samples)
+            rows.append([f'{sf:g}', products, strategy, f'{median * 1000:.1f}', statements])
+
+        try:
+            run_catalog('raise')
+            outcome = 'без обращений к связям'
+        except InvalidRequestError as error:
+            outcome = type(error).__name__
+        rows.append([f'{sf:g}', products, 'raise', '-', outcome])
+
+    print(tabulate(rows, ['sf', 'products', 'strategy', 'ms (median)', 'statements'], tablefmt='pretty'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""
+Бенчмарк: накладные расходы SQLAlchemy по сравнению с "сырым" psycopg2 для задач,
+у которых есть оба варианта решения (task_N и task_N_postgre).
+
+Каждый вариант выполняется много раз, время раскладывается на фазы:
+  - build   - построение запроса (для ORM - вызов stmt_N(), для сырого SQL - ничего);
+  - compile - компиляция запроса в SQL диалекта PostgreSQL (для сырого SQL - ничего);
+  - execute - отправка запроса и выполнение в БД;
+  - fetch   - получение строк (для ORM - с построением Row);
+  - render  - форматирование таблицы tabulate (без вывода на экран).
+Для каждой фазы и суммарного времени считаются p50/p95/p99; результаты сохраняются в JSON,
+чтобы сравнивать прогоны между собой.
+
+Запуск из корня проекта:
+
+    python -m benchmarks.orm_vs_raw --iterations 200
+    python -m benchmarks.orm_vs_raw --sf 10 --load --output results.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+
+import sqlalchemy
+from tabulate import tabulate
+
+from db.database import get_pool, get_session
+from tasks.registry import ORM, POSTGRE, select_tasks
+
+PHASES = ('build', 'compile', 'execute', 'fetch', 'render')
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def find_pairs(numbers=None):
+    """Находит задачи, у которых есть и ORM-вариант с stmt_N, и сырой вариант с SQL_N."""
+    specs = select_tasks(numbers)
+    orm = {spec.number: spec for spec in specs if spec.variant == ORM}
+    raw = {spec.number: spec for spec in specs if spec.variant == POSTGRE}
+    pairs = []
+    for number in sorted(orm.keys() & raw.keys()):
+        task_class = orm[number].task_class
+        if hasattr(task_class, f'stmt_{number}') and hasattr(task_class, f'SQL_{number}'):
+            pairs.append((number, orm[number], raw[number]))
+    return pairs
+
+
+def run_orm_once(session, task_class, number):
+    timings = {}
+    started = time.perf_counter()
+    statement = getattr(task_class, f'stmt_{number}')()
+    timings['build'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    statement.compile(dialect=session.get_bind(clause=statement).dialect)
+    timings['compile'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    result = session.execute(statement)
+    timings['execute'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    rows = result.all()
+    headers = list(result.keys())
+    timings['fetch'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    tabulate(rows, headers, tablefmt='pretty')
+    timings['render'] = time.perf_counter() - started
+    return timings
+
+
+def run_raw_once(connection, task_class, number):
+    timings = {'build': 0.0, 'compile': 0.0}
+    sql = getattr(task_class, f'SQL_{number}')
+
+    with connection.cursor() as cursor:
+        started = time.perf_counter()
+        cursor.execute(sql)
+        timings['execute'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        rows = cursor.fetchall()
+        headers = [column[0] for column in cursor.description]
+        timings['fetch'] = time.perf_counter() - started
+    connection.rollback()
+
+    started = time.perf_counter()
+    tabulate(rows, headers, tablefmt='pretty')
+    timings['render'] = time.perf_counter() - started
+    return timings
+
+
+def percentiles(values):
+    """Возвращает p50/p95/p99 и среднее в миллисекундах."""
+    if len(values) == 1:
+        values = values * 2
+    cuts = statistics.quantiles(values, n=100, method='inclusive')
+    return {
+        'p50': cuts[49] * 1000,
+        'p95': cuts[94] * 1000,
+        'p99': cuts[98] * 1000,
+        'mean': statistics.fmean(values) * 1000,
+    }
+
+
+def summarize(samples):
+    """Сводит замеры итераций в статистику по фазам и по суммарному времени."""
+    summary = {phase: percentiles([sample[phase] for sample in samples]) for phase in PHASES}
+    summary['total'] = percentiles([sum(sample.values()) for sample in samples])
+    return summary
+
+
+def benchmark_pair(number, orm_spec, raw_spec, iterations, warmup):
+    task_class = orm_spec.task_class
+    results = []
+
+    with get_session() as session:
+        for _ in range(warmup):
+            run_orm_once(session, task_class, number)
+        samples = [run_orm_once(session, task_class, number) for _ in range(iterations)]
+    results.append({'task': orm_spec.name, 'number': number, 'variant': ORM, 'phases': summarize(samples)})
+
+    with get_pool(raw_spec.domain).connection() as connection:
+        for _ in range(warmup):
+            run_raw_once(connection, task_class, number)
+        samples = [run_raw_once(connection, task_class, number) for _ in range(iterations)]
+    results.append({'task': raw_spec.name, 'number': number, 'variant': POSTGRE, 'phases': summarize(samples)})
+
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results):
+    rows = []
+    for result in results:
+        phases = result['phases']
+        rows.append([result['task']] + [f'{phases[phase]["p50"]:.3f}' for phase in PHASES] + [
+            f'{phases["total"]["p50"]:.3f}', f'{phases["total"]["p95"]:.3f}', f'{phases["total"]["p99"]:.3f}'
+        ])
+    headers = ['task'] + [f'{phase} p50' for phase in PHASES] + ['total p50', 'total p95', 'total p99']
+    print('Время в миллисекундах:')
+    print(tabulate(rows, headers, tablefmt='pretty'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--task', type=int, action='append', dest='numbers', metavar='N',
+                        help='номер задачи (по умолчанию - все задачи с обоими вариантами)')
+    parser.add_argument('--iterations', type=int, default=100, help='число замеров каждого варианта')
+    parser.add_argument('--warmup', type=int, default=5, help='число прогревочных запусков')
+    parser.add_argument('--sf', type=float, default=None, help='масштабный коэффициент набора данных')
+    parser.add_argument('--seed', type=int, default=0, help='зерно генератора данных (для --load)')
+    parser.add_argument('--load', action='store_true',
+                        help='перед замерами загрузить данные генератором db.generator с коэффициентом --sf')
+    parser.add_argument('--output', help='путь к JSON-файлу с результатами')
+    args = parser.parse_args()
+
+    if args.load:
+        if args.sf is None:
+            parser.error('--load требует --sf')
+        from db.generator import load_scale_factor
+
+        load_scale_factor(args.sf, args.seed, domains=['computer_firm'])
+
+    results = []
+    for number, orm_spec, raw_spec in find_pairs(args.numbers):
+        results.extend(benchmark_pair(number, orm_spec, raw_spec, args.iterations, args.warmup))
+
+    print_report(results)
+
+    if args.output:
+        report = {
+            'meta': {
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'git_revision': git_revision(),
+                'scale_factor': args.sf,
+                'seed': args.seed if args.load else None,
+                'iterations': args.iterations,
+                'warmup': args.warmup,
+                'python': platform.python_version(),
+                'sqlalchemy': sqlalchemy.__version__,
+            },
+            'results': results,
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        print(f'Результаты сохранены в {args.output}')
+
+
+if __name__ == '__main__':
+    main()
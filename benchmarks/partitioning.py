@@ -0,0 +1,122 @@
+"""
+Бенчмарк секционирования таблиц операций фирмы вторсырья по дате (db/db_2_recycling_firm/partitions.py).
+
+Для каждого режима (без секционирования, секции по месяцам и по годам) таблицы фирмы вторсырья
+пересоздаются в отдельном процессе: режим задается переменной DB_RECYCLING_PARTITIONING
+и действует при импорте моделей. Затем для каждой длины истории из --years данные загружаются
+заново генератором db.generator, и несколько раз выполняются запросы task_29 и task_30
+за последние --period дней истории (stmt_29_range и stmt_30_range). Без секционирования время
+растет с длиной истории, а с секционированием PostgreSQL читает только секции периода
+и время почти не зависит от нее.
+
+Бенчмарк пересоздает таблицы фирмы вторсырья (данные в них теряются). Запуск из корня проекта
+(против локальной БД PostgreSQL из .env):
+
+    python -m benchmarks.partitioning --years 1 --years 4 --years 16
+    python -m benchmarks.partitioning --mode none --mode month --sf 10 --period 7
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import timedelta
+
+from tabulate import tabulate
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = ('none', 'month', 'year')
+
+
+def median_time(run, iterations):
+    """Медианное время вызова run() в миллисекундах (после одного прогревочного вызова)."""
+    run()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def measure(args):
+    """Замеры в текущем процессе (режим уже задан окружением); печатает строки результата в JSON."""
+    from db.database import get_engine
+    from db.db_2_recycling_firm.models import Base
+    from db.generator import RECYCLING_START, load_scale_factor
+    from tasks.recycling_firm import RecyclingFirmTasks
+
+    engine = get_engine('recycling_firm')
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    rows = []
+    for years in args.years:
+        days = years * 365
+        counts = load_scale_factor(args.sf, args.seed, domains=['recycling_firm'], days=days)
+        last = RECYCLING_START + timedelta(days=days - 1)
+        params = {'date_from': last - timedelta(days=args.period - 1), 'date_to': last}
+
+        with engine.connect() as connection:
+            for task, statement in (
+                (29, RecyclingFirmTasks.stmt_29_range()),
+                (30, RecyclingFirmTasks.stmt_30_range()),
+            ):
+                milliseconds = median_time(lambda: connection.execute(statement, params).all(), args.iterations)
+                source = 'income_o' if task == 29 else 'income'
+                rows.append({'years': years, 'task': task, 'rows': counts[source], 'ms': milliseconds})
+    print(json.dumps(rows))
+
+
+def run_mode(mode, args):
+    """Запускает замеры режима в отдельном процессе и возвращает их строки."""
+    environment = dict(os.environ, DB_RECYCLING_PARTITIONING='' if mode == 'none' else mode)
+    command = [
+        sys.executable, '-m', 'benchmarks.partitioning', '--child',
+        '--sf', str(args.sf), '--seed', str(args.seed),
+        '--period', str(args.period), '--iterations', str(args.iterations),
+    ]
+    for years in args.years:
+        command += ['--years', str(years)]
+    completed = subprocess.run(
+        command, cwd=PROJECT_ROOT, env=environment, check=True, capture_output=True, text=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=int, action='append',
+                        help='длина истории в годах (можно указать несколько раз), по умолчанию 1, 4 и 16')
+    parser.add_argument('--mode', action='append', dest='modes', choices=MODES,
+                        help='режим секционирования (можно указать несколько раз), по умолчанию - все')
+    parser.add_argument('--sf', type=float, default=1, help='масштабный коэффициент (число пунктов приема)')
+    parser.add_argument('--seed', type=int, default=0, help='зерно генератора данных')
+    parser.add_argument('--period', type=int, default=30, help='длина запрашиваемого периода в днях')
+    parser.add_argument('--iterations', type=int, default=5, help='число замеров каждого запроса')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.years = sorted(args.years or [1, 4, 16])
+
+    if args.child:
+        measure(args)
+        return
+
+    results = {mode: run_mode(mode, args) for mode in args.modes or MODES}
+    modes = list(results)
+    table = []
+    for index, row in enumerate(results[modes[0]]):
+        table.append([
+            row['years'], f"task_{row['task']}", row['rows'],
+            *(f"{results[mode][index]['ms']:.1f}" for mode in modes)
+        ])
+
+    print(f'Период запроса: последние {args.period} дней истории')
+    print(tabulate(table, ['years', 'task', 'rows', *(f'{mode}, ms' for mode in modes)], tablefmt='pretty'))
+
+
+if __name__ == '__main__':
+    main()
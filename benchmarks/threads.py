@@ -0,0 +1,62 @@
+"""
+Бенчмарк пропускной способности многопоточного запуска задач (tasks.runner.run_tasks с threads).
+
+Выбранные задачи (по умолчанию - все варианты SQLAlchemy) повторяются --repeat раз и выполняются
+на 1, 2, 4, ... потоках. Для каждого числа потоков выводятся общее время, пропускная способность
+(задач в секунду), ускорение относительно наименьшего числа потоков и эффективность
+(ускорение на поток относительно него).
+Пока задачи ждут ответа БД, интерпретатор отпускает GIL, поэтому ускорение ограничено долей времени,
+которую задачи проводят в Python (построение запросов и разбор результатов), и числом ядер СУБД.
+
+Запуск из корня проекта (против локальной БД из .env):
+
+    python -m benchmarks.threads --threads 1 --threads 2 --threads 4 --threads 8
+    python -m benchmarks.threads --domain ships --variant postgre --repeat 20
+"""
+import argparse
+
+from tabulate import tabulate
+
+from tasks.registry import ORM, POSTGRE, TASK_CLASSES, select_tasks
+from tasks.runner import run_tasks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, action='append', dest='thread_counts',
+                        help='число потоков (можно указать несколько раз), по умолчанию 1, 2, 4, 8')
+    parser.add_argument('--task', type=int, action='append', dest='numbers', metavar='N',
+                        help='номер задачи (можно указать несколько раз), по умолчанию - все')
+    parser.add_argument('--domain', action='append', dest='domains', choices=list(TASK_CLASSES),
+                        help='предметная область (можно указать несколько раз)')
+    parser.add_argument('--variant', action='append', dest='variants', choices=[ORM, POSTGRE],
+                        help='вариант решения, по умолчанию orm')
+    parser.add_argument('--repeat', type=int, default=10, help='сколько раз повторить набор задач')
+    args = parser.parse_args()
+
+    specs = select_tasks(args.numbers, args.domains, args.variants or [ORM]) * args.repeat
+    if not specs:
+        parser.error('под заданные фильтры не подходит ни одна задача')
+
+    # Прогрев: движки, пулы соединений и кэш компиляции запросов
+    run_tasks(specs[:len(specs) // args.repeat])
+
+    rows = []
+    baseline = None
+    thread_counts = sorted(args.thread_counts or [1, 2, 4, 8])
+    for threads in thread_counts:
+        results, wall_time = run_tasks(specs, threads=threads)
+        failed = sum(not result.ok for result in results)
+        throughput = len(results) / wall_time
+        baseline = baseline or throughput
+        speedup = throughput / baseline
+        rows.append([
+            threads, f'{wall_time:.3f}', f'{throughput:.1f}', f'{speedup:.2f}', f'{speedup * thread_counts[0] / threads:.0%}', failed
+        ])
+
+    print(f'Задач в наборе: {len(specs)}')
+    print(tabulate(rows, ['threads', 'seconds', 'tasks/s', 'speedup', 'efficiency', 'errors'], tablefmt='pretty'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Бенчмарк масштабирования задач на оконных функциях (task_58, task_65, task_82, task_89, task_90).
+
+Для каждого масштабного коэффициента из --sf данные компьютерной фирмы загружаются заново
+генератором db.generator, после чего оба варианта каждой задачи (запрос SQLAlchemy stmt_N
+и текст SQL_N) выполняются несколько раз. По медианному времени на разных объемах данных
+оценивается показатель роста k в зависимости t ~ n^k от числа строк таблиц PC и Product:
+k около 1 означает линейный рост, около 2 - квадратичный.
+
+С ключом --quadratic дополнительно замеряется исходное решение task_82 из T-SQL
+(самосоединение пронумерованных строк), чтобы сравнить его рост с оконным вариантом.
+На больших коэффициентах оно выполняется очень долго.
+
+Запуск из корня проекта:
+
+    python -m benchmarks.window_functions --sf 1 --sf 2 --sf 4 --sf 8
+    python -m benchmarks.window_functions --sf 0.25 --sf 0.5 --sf 1 --quadratic
+"""
+import argparse
+import math
+import statistics
+import time
+
+from sqlalchemy import func, select
+from tabulate import tabulate
+
+from db.database import get_engine
+from db.db_1_computer_firm.models import PC, Product
+from db.generator import load_scale_factor
+from tasks.computer_firm import ComputerFirmTasks
+
+TASKS = (58, 65, 82, 89, 90)
+
+# Решение task_82 из docstring, переведенное на PostgreSQL: самосоединение CTE, квадратичное по числу ПК
+QUADRATIC_82 = """
+    WITH cte AS (
+        SELECT code, price, row_number() OVER (ORDER BY code) AS number
+        FROM pc
+    )
+    SELECT cte.code, avg(c.price)
+    FROM cte JOIN cte c
+        ON c.number - cte.number < 6 AND c.number - cte.number >= 0
+    GROUP BY cte.number, cte.code
+    HAVING count(*) = 6
+    """
+
+
+def median_time(run, iterations, warmup):
+    """Медианное время вызова run() в миллисекундах."""
+    for _ in range(warmup):
+        run()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def variants(quadratic):
+    """Возвращает пары (название варианта, функция выполнения на соединении)."""
+    result = []
+    for number in TASKS:
+        statement = getattr(ComputerFirmTasks, f'stmt_{number}')()
+        sql = getattr(ComputerFirmTasks, f'SQL_{number}')
+        result.append((f'task_{number}', lambda connection, statement=statement: connection.execute(statement).all()))
+        result.append((f'task_{number}_postgre', lambda connection, sql=sql: connection.exec_driver_sql(sql).all()))
+    if quadratic:
+        result.append(('task_82 self-join', lambda connection: connection.exec_driver_sql(QUADRATIC_82).all()))
+    return result
+
+
+def growth_exponent(sizes, timings):
+    """Наклон прямой log(t) от log(n) по методу наименьших квадратов."""
+    points = [(math.log(size), math.log(timing)) for size, timing in zip(sizes, timings) if size and timing]
+    if len(points) < 2:
+        return None
+    mean_x = statistics.fmean(x for x, _ in points)
+    mean_y = statistics.fmean(y for _, y in points)
+    denominator = sum((x - mean_x) ** 2 for x, _ in points)
+    if not denominator:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / denominator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sf', type=float, action='append', dest='scale_factors',
+                        help='масштабный коэффициент (можно указать несколько раз), по умолчанию 1, 2, 4, 8')
+    parser.add_argument('--seed', type=int, default=0, help='зерно генератора данных')
+    parser.add_argument('--iterations', type=int, default=5, help='число замеров каждого варианта')
+    parser.add_argument('--warmup', type=int, default=1, help='число прогревочных запусков')
+    parser.add_argument('--quadratic', action='store_true',
+                        help='замерить и исходное решение task_82 с самосоединением')
+    args = parser.parse_args()
+
+    scale_factors = sorted(args.scale_factors or [1, 2, 4, 8])
+    engine = get_engine('computer_firm')
+    runs = variants(args.quadratic)
+
+    sizes = {'pc': [], 'product': []}
+    timings = {name: [] for name, _ in runs}
+    for sf in scale_factors:
+        load_scale_factor(sf, args.seed, domains=['computer_firm'])
+        with engine.connect() as connection:
+            sizes['pc'].append(connection.scalar(select(func.count()).select_from(PC)))
+            sizes['product'].append(connection.scalar(select(func.count()).select_from(Product)))
+            for name, run in runs:
+                timings[name].append(median_time(lambda: run(connection), args.iterations, args.warmup))
+                # Соединение не держит открытую транзакцию между замерами
+                connection.rollback()
+
+    headers = ['variant'] + [
+        f'sf={sf:g}\n{pc} pc / {product} product'
+        for sf, pc, product in zip(scale_factors, sizes['pc'], sizes['product'])
+    ] + ['k (pc)', 'k (product)']
+    rows = []
+    for name, values in timings.items():
+        exponents = [growth_exponent(sizes[table], values) for table in ('pc', 'product')]
+        rows.append([name] + [f'{value:.3f}' for value in values] + [
+            '-' if exponent is None else f'{exponent:.2f}' for exponent in exponents
+        ])
+    print('Медианное время в миллисекундах; k - показатель роста t ~ n^k:')
+    print(tabulate(rows, headers, tablefmt='pretty'))
+
+
+if __name__ == '__main__':
+    main()
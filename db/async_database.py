@@ -0,0 +1,69 @@
+import os
+import threading
+
+from db.config import DB_ASYNC_CONCURRENCY, DB_QUERY_CACHE_SIZE
+from db.routing import RoutingSession, get_connect_params
+
+# Асинхронные движки предметных областей и фабрика сессий создаются при первом обращении;
+# ключ None - движок общей БД DB_NAME
+_async_engines = {}
+_AsyncSession = None
+_lock = threading.Lock()
+
+
+class AsyncRoutingSession(RoutingSession):
+    """
+    Синхронная "проекция" асинхронной сессии (AsyncSession.sync_session): маршрутизирует запросы
+    по предметным областям так же, как RoutingSession, но на асинхронные движки областей.
+    """
+
+    def domain_engine(self, domain):
+        return get_async_engine(domain).sync_engine
+
+
+def get_async_engine(domain=None):
+    """Возвращает асинхронный движок (драйвер asyncpg) предметной области, создавая его при первом обращении"""
+    engine = _async_engines.get(domain)
+    if engine is None:
+        # Неизвестная область отклоняется get_connect_params до создания движка
+        params = get_connect_params(domain)
+        with _lock:
+            engine = _async_engines.get(domain)
+            if engine is None:
+                from sqlalchemy.ext.asyncio import create_async_engine
+
+                # Размер пула равен числу одновременно выполняемых задач,
+                # чтобы задачи не ждали друг друга в очереди за соединением
+                engine = create_async_engine(
+                    f'postgresql+asyncpg://{params["user"]}:{params["password"]}@'
+                    f'{params["host"]}:{params["port"]}/{params["dbname"]}',
+                    pool_size=DB_ASYNC_CONCURRENCY,
+                    query_cache_size=DB_QUERY_CACHE_SIZE
+                )
+                _async_engines[domain] = engine
+    return engine
+
+
+def get_async_session():
+    """Возвращает новую асинхронную сессию; движок каждого запроса выбирается по его предметной области"""
+    global _AsyncSession
+
+    if _AsyncSession is None:
+        with _lock:
+            if _AsyncSession is None:
+                from sqlalchemy.ext.asyncio import async_sessionmaker
+
+                _AsyncSession = async_sessionmaker(sync_session_class=AsyncRoutingSession)
+    return _AsyncSession()
+
+
+def _after_fork_in_child():
+    global _lock
+    # Как и в db.routing: ребенок забывает движки родителя и создает собственные при первом обращении
+    _lock = threading.Lock()
+    for engine in _async_engines.values():
+        engine.sync_engine.dispose(close=False)
+    _async_engines.clear()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
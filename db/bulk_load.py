@@ -0,0 +1,187 @@
+"""
+Массовая загрузка строк в таблицы без создания ORM-объектов.
+
+В PostgreSQL строки передаются потоком через `COPY ... FROM STDIN`: итератор строк
+кодируется в текстовый формат COPY по мере чтения драйвером, поэтому в памяти
+одновременно находится только небольшой буфер. Для остальных СУБД (например, SQLite)
+строки вставляются пачками через executemany.
+"""
+import datetime
+import io
+from itertools import islice
+
+from sqlalchemy.engine import Connection
+
+from db.config import DB_BULK_BATCH_SIZE
+from db.result_cache import invalidate_tables
+from db.routing import domain_of_table, get_domain_engine
+
+
+# Секционированные таблицы: имя таблицы -> функция (соединение, таблица, столбцы, строки), которая
+# создает недостающие секции для строк пачки до их загрузки (см. register_partitioner)
+_partitioners = {}
+
+
+def register_partitioner(table_name, partitioner):
+    """
+    Регистрирует создание секций при массовой загрузке в секционированную таблицу PostgreSQL:
+    строки загружаются пачками, и перед каждой пачкой вызывается partitioner(connection, table, columns, rows).
+
+    Args:
+        table_name (str): Имя таблицы.
+        partitioner: Функция, создающая секции для строк пачки.
+    """
+    _partitioners[table_name] = partitioner
+
+
+def _as_table(table):
+    """Принимает таблицу или ORM-модель и возвращает объект Table."""
+    return getattr(table, '__table__', table)
+
+
+def _resolve_bind(table, bind):
+    """Возвращает переданный движок/соединение или движок предметной области таблицы."""
+    if bind is not None:
+        return bind
+    return get_domain_engine(domain_of_table(table))
+
+
+def _copy_value(value):
+    """Кодирует значение в текстовый формат COPY."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+class _CopyReader(io.TextIOBase):
+    """Файлоподобный объект, который отдает строки итератора в текстовом формате COPY."""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = ''
+        self.rows_read = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._buffer += '\t'.join(_copy_value(value) for value in row) + '\n'
+            self.rows_read += 1
+
+        if size < 0:
+            chunk, self._buffer = self._buffer, ''
+        else:
+            chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
+def _copy_rows(connection, table, columns, rows):
+    """Загружает строки одной командой COPY FROM STDIN на соединении psycopg2."""
+    preparer = connection.dialect.identifier_preparer
+    sql = 'COPY {table} ({columns}) FROM STDIN'.format(
+        table=preparer.format_table(table),
+        columns=', '.join(preparer.quote(column) for column in columns)
+    )
+    reader = _CopyReader(rows)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(sql, reader, size=64 * 1024)
+    finally:
+        cursor.close()
+    # COPY выполняется в обход SQLAlchemy, поэтому сообщаем кэшу результатов об изменении таблицы сами
+    invalidate_tables([table.name], connection)
+    return reader.rows_read
+
+
+def _copy_partitioned_rows(connection, table, columns, rows, partitioner, batch_size):
+    """Загружает строки пачками через COPY, создавая перед каждой пачкой секции для ее строк."""
+    rows = iter(rows)
+    total = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        partitioner(connection, table, columns, batch)
+        total += _copy_rows(connection, table, columns, batch)
+    return total
+
+
+def _insert_rows(connection, table, columns, rows, batch_size):
+    """Вставляет строки пачками через executemany."""
+    statement = table.insert()
+    rows = iter(rows)
+    total = 0
+    while True:
+        batch = [dict(zip(columns, row)) for row in islice(rows, batch_size)]
+        if not batch:
+            break
+        connection.execute(statement, batch)
+        total += len(batch)
+    return total
+
+
+def bulk_load(table, rows, columns=None, bind=None, batch_size=None):
+    """
+    Загружает строки в таблицу, минуя ORM.
+
+    Args:
+        table: ORM-модель или объект Table.
+        rows: Итерируемый объект с кортежами значений в порядке `columns`.
+            Может быть генератором - строки читаются по мере загрузки.
+        columns: Имена столбцов таблицы; по умолчанию - все столбцы в порядке объявления.
+            Автоинкрементные ключи (например, PC.code) можно не указывать.
+        bind: Движок или соединение SQLAlchemy. При передаче соединения загрузка идет
+            в его текущей транзакции; по умолчанию - движок предметной области таблицы.
+        batch_size (int): Размер пачки для executemany (не PostgreSQL) и для COPY в секционированную
+            таблицу (см. register_partitioner), по умолчанию DB_BULK_BATCH_SIZE.
+
+    Returns:
+        Число загруженных строк.
+    """
+    table = _as_table(table)
+    columns = list(columns or (column.name for column in table.columns))
+    bind = _resolve_bind(table, bind)
+
+    if not isinstance(bind, Connection):
+        with bind.begin() as connection:
+            return bulk_load(table, rows, columns, connection, batch_size)
+
+    if bind.dialect.name == 'postgresql':
+        partitioner = _partitioners.get(table.name)
+        if partitioner is None:
+            return _copy_rows(bind, table, columns, rows)
+        return _copy_partitioned_rows(bind, table, columns, rows, partitioner, batch_size or DB_BULK_BATCH_SIZE)
+    return _insert_rows(bind, table, columns, rows, batch_size or DB_BULK_BATCH_SIZE)
+
+
+def clear_tables(*tables, bind=None):
+    """
+    Удаляет все строки из таблиц в указанном порядке (сначала зависимые, затем родительские).
+
+    Args:
+        tables: ORM-модели или объекты Table.
+        bind: Движок или соединение; по умолчанию - движок предметной области первой таблицы.
+    """
+    tables = [_as_table(table) for table in tables]
+    bind = _resolve_bind(tables[0], bind)
+
+    if not isinstance(bind, Connection):
+        with bind.begin() as connection:
+            return clear_tables(*tables, bind=connection)
+
+    for table in tables:
+        bind.execute(table.delete())
@@ -7,11 +7,75 @@ load_dotenv()
 # Переменные для подключения к Postgresql
 DB_HOST = os.environ.get('DB_HOST')
 DB_PORT = os.environ.get('DB_PORT')
-DB_NAME_COMPUTER_FIRM = os.environ.get('DB_NAME_COMPUTER_FIRM')
 DB_NAME = os.environ.get('DB_NAME')
-# DB_NAME_RECYCLING_FIRM = os.environ.get('DB_NAME_RECYCLING_FIRM')
-# DB_NAME_SHIPS = os.environ.get('DB_NAME_SHIPS')
-# DB_NAME_AIRPORT = os.environ.get('DB_NAME_AIRPORT')
-# DB_NAME_PAINTING = os.environ.get('DB_NAME_PAINTING')
 DB_USER = os.environ.get('DB_USER')
-DB_PASSWORD = os.environ.get('DB_PASSWORD')
\ No newline at end of file
+DB_PASSWORD = os.environ.get('DB_PASSWORD')
+
+# Отдельные БД для каждой предметной области (см. db/routing.py).
+# Если переменная не задана, используется общая БД DB_NAME
+DB_NAME_COMPUTER_FIRM = os.environ.get('DB_NAME_COMPUTER_FIRM')
+DB_NAME_RECYCLING_FIRM = os.environ.get('DB_NAME_RECYCLING_FIRM')
+DB_NAME_SHIPS = os.environ.get('DB_NAME_SHIPS')
+DB_NAME_AIRPORT = os.environ.get('DB_NAME_AIRPORT')
+DB_NAME_PAINTING = os.environ.get('DB_NAME_PAINTING')
+# Необязательные адреса отдельных экземпляров PostgreSQL для предметных областей (по умолчанию DB_HOST/DB_PORT)
+DB_HOST_COMPUTER_FIRM = os.environ.get('DB_HOST_COMPUTER_FIRM')
+DB_PORT_COMPUTER_FIRM = os.environ.get('DB_PORT_COMPUTER_FIRM')
+DB_HOST_RECYCLING_FIRM = os.environ.get('DB_HOST_RECYCLING_FIRM')
+DB_PORT_RECYCLING_FIRM = os.environ.get('DB_PORT_RECYCLING_FIRM')
+DB_HOST_SHIPS = os.environ.get('DB_HOST_SHIPS')
+DB_PORT_SHIPS = os.environ.get('DB_PORT_SHIPS')
+DB_HOST_AIRPORT = os.environ.get('DB_HOST_AIRPORT')
+DB_PORT_AIRPORT = os.environ.get('DB_PORT_AIRPORT')
+DB_HOST_PAINTING = os.environ.get('DB_HOST_PAINTING')
+DB_PORT_PAINTING = os.environ.get('DB_PORT_PAINTING')
+
+# Размеры пула SQLAlchemy; у движка каждой предметной области свой пул такого размера
+DB_ENGINE_POOL_SIZE = int(os.environ.get('DB_ENGINE_POOL_SIZE', 5))
+DB_ENGINE_MAX_OVERFLOW = int(os.environ.get('DB_ENGINE_MAX_OVERFLOW', 10))
+# Сколько скомпилированных запросов движок хранит в кэше компиляции SQLAlchemy
+DB_QUERY_CACHE_SIZE = int(os.environ.get('DB_QUERY_CACHE_SIZE', 500))
+# Кэш результатов запросов (db/result_cache.py): включен ли он при старте и сколько результатов хранит
+DB_RESULT_CACHE = os.environ.get('DB_RESULT_CACHE', 'false').lower() in ('1', 'true', 'yes')
+DB_RESULT_CACHE_SIZE = int(os.environ.get('DB_RESULT_CACHE_SIZE', 256))
+# Детектор ленивых загрузок связей (db/loading.py): сколько ленивых загрузок одной связи допустимо
+# в сессии (пусто - детектор выключен) и что делать при превышении: warn - предупреждение, raise - исключение
+DB_LAZY_LOAD_THRESHOLD = int(os.environ['DB_LAZY_LOAD_THRESHOLD']) if os.environ.get('DB_LAZY_LOAD_THRESHOLD') else None
+DB_LAZY_LOAD_ACTION = os.environ.get('DB_LAZY_LOAD_ACTION', 'warn')
+
+# Секционирование таблиц операций фирмы вторсырья по дате (только PostgreSQL, db/db_2_recycling_firm/partitions.py):
+# month - секция на месяц, year - на год; пусто - обычные таблицы. Применяется при создании таблиц
+DB_RECYCLING_PARTITIONING = os.environ.get('DB_RECYCLING_PARTITIONING', '').lower() or None
+
+# Параметры пула соединений psycopg2, через который работает exec_query
+DB_POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN_SIZE', 1))
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', 10))
+# Время (в секундах), через которое простаивающее соединение сверх DB_POOL_MIN_SIZE закрывается
+DB_POOL_IDLE_TIMEOUT = float(os.environ.get('DB_POOL_IDLE_TIMEOUT', 300))
+# Сколько секунд ждать свободного соединения, если пул исчерпан
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+# Проверять соединение запросом SELECT 1 перед выдачей, если оно простаивало дольше интервала
+DB_POOL_HEALTH_CHECK = os.environ.get('DB_POOL_HEALTH_CHECK', 'true').lower() in ('1', 'true', 'yes')
+DB_POOL_HEALTH_CHECK_INTERVAL = float(os.environ.get('DB_POOL_HEALTH_CHECK_INTERVAL', 30))
+
+# Размер пачки строк, которую серверный курсор отдает за один запрос в потоковом режиме
+DB_FETCH_BATCH_SIZE = int(os.environ.get('DB_FETCH_BATCH_SIZE', 1000))
+
+# Сколько задач одновременно выполняет асинхронный исполнитель (и размер пула асинхронного движка каждой области)
+DB_ASYNC_CONCURRENCY = int(os.environ.get('DB_ASYNC_CONCURRENCY', 8))
+
+# Размер пачки строк при массовой загрузке через executemany (для СУБД без COPY)
+DB_BULK_BATCH_SIZE = int(os.environ.get('DB_BULK_BATCH_SIZE', 10000))
+
+# Вывод результатов задач (tasks/output.py): формат (pretty, stream, csv, jsonl),
+# сколько строк выводить (0 - все) и по скольким строкам считать ширину столбцов в формате stream
+TASK_OUTPUT_FORMAT = os.environ.get('TASK_OUTPUT_FORMAT', 'pretty')
+TASK_OUTPUT_MAX_ROWS = int(os.environ.get('TASK_OUTPUT_MAX_ROWS', 0))
+TASK_OUTPUT_SAMPLE_SIZE = int(os.environ.get('TASK_OUTPUT_SAMPLE_SIZE', 100))
+
+# Каталог архива планов EXPLAIN ANALYZE (db/explain.py)
+PLAN_ARCHIVE_DIR = os.environ.get('PLAN_ARCHIVE_DIR', 'plans')
+
+# Файл с записанными длительностями задач: по ним python -m tasks запускает на пуле
+# процессов или потоков сначала самые долгие задачи (tasks/durations.py)
+TASK_DURATIONS_FILE = os.environ.get('TASK_DURATIONS_FILE', 'task_durations.json')
@@ -1,19 +1,79 @@
-import psycopg2
+import itertools
+import os
+import threading
+import time
+from collections import Counter
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.orm import scoped_session, sessionmaker
 from db.config import (
-    DB_PASSWORD,
-    DB_USER,
-    DB_HOST,
-    DB_PORT,
-    DB_NAME
+    DB_POOL_MIN_SIZE,
+    DB_POOL_MAX_SIZE,
+    DB_POOL_IDLE_TIMEOUT,
+    DB_POOL_TIMEOUT,
+    DB_POOL_HEALTH_CHECK,
+    DB_POOL_HEALTH_CHECK_INTERVAL,
+    DB_FETCH_BATCH_SIZE,
+    DB_RESULT_CACHE,
+    DB_LAZY_LOAD_THRESHOLD,
 )
+from db.explain import explain_if_capturing
+from db.instrumentation import record_checkout, record_statement
+from db.routing import RoutingSession, get_connect_params, get_domain_engine, set_engine_pool_size
 
-engine = create_engine(f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}')
+# Создаем сессию. Движок выбирается при выполнении запроса по предметной области
+# модели (см. db/routing.py), поэтому сама фабрика ни к какому движку не привязана
+Session = sessionmaker(class_=RoutingSession)
 
-# Создаем сессию
-Session = sessionmaker(bind=engine)
+# Сессии потоков: каждый поток получает из реестра собственную сессию (см. SessionCreater)
+ScopedSession = scoped_session(Session)
+
+# Пулы соединений psycopg2 для exec_query, по одному на предметную область
+# (ключ None - общая БД DB_NAME). Создаются при первом запросе к области
+_pools = {}
+_pool_lock = threading.Lock()
+# Пулы и сессии, унаследованные дочерним процессом от родителя. Ссылки на них хранятся, чтобы сборщик
+# мусора не закрыл их соединения: закрытие или откат отправили бы серверу команды по сокету родителя
+_inherited = []
+# Наибольший размер пулов psycopg2; увеличивается size_pools под число потоков
+_pool_max_size = DB_POOL_MAX_SIZE
+
+# Кэш результатов запросов включается переменной DB_RESULT_CACHE или вызовом enable_result_cache
+if DB_RESULT_CACHE:
+    from db.result_cache import enable_result_cache
+
+    enable_result_cache()
+
+# Детектор ленивых загрузок связей включается переменной DB_LAZY_LOAD_THRESHOLD
+if DB_LAZY_LOAD_THRESHOLD is not None:
+    from db.loading import enable_lazy_load_detection
+
+    enable_lazy_load_detection(DB_LAZY_LOAD_THRESHOLD)
+
+# Счетчик для уникальных имен серверных курсоров
+_cursor_counter = itertools.count()
+
+# Статистика кэша компиляции SQLAlchemy: сколько запросов взято из кэша, сколько скомпилировано заново
+_statement_cache_stats = Counter()
+_statement_cache_lock = threading.Lock()
+
+
+def get_engine(domain=None):
+    """
+    Возвращает движок SQLAlchemy, создавая его при первом обращении.
+
+    Args:
+        domain (str): Предметная область ('computer_firm', 'ships', ...);
+            по умолчанию - движок общей БД DB_NAME.
+    """
+    return get_domain_engine(domain)
+
+
+def get_sessionmaker():
+    """Возвращает фабрику сессий с маршрутизацией запросов по предметным областям"""
+    return Session
 
 
 def get_session():
@@ -21,29 +81,193 @@ def get_session():
     return Session()
 
 
-def exec_query(query):
+def get_scoped_session():
+    """Возвращает сессию текущего потока, создавая ее при первом обращении в потоке"""
+    return ScopedSession()
+
+
+def has_scoped_session():
+    """Проверяет, есть ли у текущего потока сессия"""
+    return ScopedSession.registry.has()
+
+
+def remove_scoped_session():
+    """Закрывает сессию текущего потока и удаляет ее из реестра"""
+    ScopedSession.remove()
+
+
+def size_pools(threads):
+    """
+    Подстраивает пулы соединений под число потоков, одновременно выполняющих задачи: каждый поток
+    держит не больше одного соединения движка области (сессия) и одного соединения exec_query,
+    поэтому пулам нужно не меньше `threads` соединений. Пулы только увеличиваются.
+
+    Args:
+        threads (int): Число потоков.
+    """
+    global _pool_max_size
+    set_engine_pool_size(threads)
+    with _pool_lock:
+        _pool_max_size = max(threads, DB_POOL_MAX_SIZE)
+        for pool in _pools.values():
+            if pool.max_size < _pool_max_size:
+                pool.resize(_pool_max_size)
+
+
+def __getattr__(name):
+    # Совместимость со старым кодом вида `from db.database import engine`:
+    # движок создается только в момент такого импорта
+    if name == 'engine':
+        return get_engine()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def get_pool(domain=None):
+    """Возвращает пул соединений psycopg2 предметной области, создавая его при первом обращении"""
+    pool = _pools.get(domain)
+    if pool is None:
+        with _pool_lock:
+            pool = _pools.get(domain)
+            if pool is None:
+                # psycopg2 нужен только "сырому" пути, поэтому импортируем его здесь
+                from db.pool import ConnectionPool
+
+                pool = ConnectionPool(
+                    connect_kwargs=get_connect_params(domain),
+                    min_size=DB_POOL_MIN_SIZE,
+                    max_size=_pool_max_size,
+                    idle_timeout=DB_POOL_IDLE_TIMEOUT,
+                    timeout=DB_POOL_TIMEOUT,
+                    health_check=DB_POOL_HEALTH_CHECK,
+                    health_check_interval=DB_POOL_HEALTH_CHECK_INTERVAL
+                )
+                _pools[domain] = pool
+    return pool
+
+
+def reset_pools():
+    """
+    Забывает пулы psycopg2, не закрывая их соединения (например, в дочернем процессе после fork).
+    Новые пулы создаются при следующем вызове exec_query.
+    """
+    with _pool_lock:
+        _inherited.extend(_pools.values())
+        _pools.clear()
+
+
+def _after_fork_in_child():
+    global _pool_lock
+    # Блокировку мог держать другой поток родителя в момент fork
+    _pool_lock = threading.Lock()
+    reset_pools()
+    # Сессия потока, выполнившего fork, работает на соединении родителя
+    if ScopedSession.registry.has():
+        _inherited.append(ScopedSession.registry())
+        ScopedSession.registry.clear()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def get_pool_stats(domain=None):
+    """
+    Возвращает статистику пула соединений exec_query предметной области в виде словаря:
+    число выдач соединений (checkouts), ожиданий свободного соединения (waits),
+    суммарное время ожидания (wait_time), число созданных и закрытых соединений и т.д.
+    """
+    pool = _pools.get(domain)
+    if pool is None:
+        return {}
+    return pool.stats().as_dict()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _count_statement_cache(conn, cursor, statement, parameters, context, executemany):
+    # Запросы в виде текста (exec_driver_sql) не компилируются и в статистику не попадают
+    if context is None or context.compiled is None:
+        return
+    with _statement_cache_lock:
+        _statement_cache_stats[context.cache_hit] += 1
+
+
+def get_statement_cache_stats():
+    """
+    Возвращает статистику кэша компиляции SQLAlchemy по всем движкам текущего процесса:
+    число запросов, взятых из кэша (hits), скомпилированных заново (misses), выполненных
+    без кэширования (uncached) и долю попаданий (hit_rate).
+    """
+    with _statement_cache_lock:
+        hits = _statement_cache_stats[CacheStats.CACHE_HIT]
+        misses = _statement_cache_stats[CacheStats.CACHE_MISS]
+        total = sum(_statement_cache_stats.values())
+    return {
+        'hits': hits,
+        'misses': misses,
+        'uncached': total - hits - misses,
+        'hit_rate': hits / total if total else 0.0,
+    }
+
+
+def reset_statement_cache_stats():
+    """Обнуляет статистику кэша компиляции SQLAlchemy."""
+    with _statement_cache_lock:
+        _statement_cache_stats.clear()
+
+
+def exec_query(query, stream=False, batch_size=None, domain=None):
     """
-    Создает подключение к БД, используя psycopg2 в качестве драйвера.
+    Выполняет запрос на соединении из общего пула psycopg2.
     Возвращает результат запроса из БД
+
+    Args:
+        query (str): Текст SQL-запроса.
+        stream (bool): Вместо списка всех строк вернуть итератор, который читает результат
+            пачками через именованный (серверный) курсор.
+        batch_size (int): Размер пачки строк в потоковом режиме, по умолчанию DB_FETCH_BATCH_SIZE.
+        domain (str): Предметная область, в БД которой выполняется запрос; по умолчанию - общая DB_NAME.
     """
-    # Подключаемся к PostgreSQL
-    connection = psycopg2.connect(
-        dbname=DB_NAME,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        host=DB_HOST,
-        port=DB_PORT
-    )
-
-    # Создаем курсор для отправки SQL-запросов базе данных
-    cursor = connection.cursor()
-    # Выполняет SQL-запрос, переданный как аргумент функции
-    cursor.execute(query)
-    # Сохраняем в переменной все строки результата запроса
-    results = cursor.fetchall()
-
-    # Закрываем курсор и соединение
-    cursor.close()
-    connection.close()
+    if stream:
+        return _stream_query(query, batch_size or DB_FETCH_BATCH_SIZE, domain)
+
+    started = time.perf_counter()
+    with get_pool(domain).connection() as connection:
+        record_checkout(started)
+        # Создаем курсор для отправки SQL-запросов базе данных
+        with connection.cursor() as cursor:
+            started = time.perf_counter()
+            # Выполняет SQL-запрос, переданный как аргумент функции
+            cursor.execute(query)
+            # Сохраняем в переменной все строки результата запроса
+            results = cursor.fetchall()
+            record_statement(started, len(results))
+        # В режиме профилирования сохраняем план запроса (см. db/explain.py)
+        explain_if_capturing(connection, query)
 
     return results
+
+
+def _stream_query(query, batch_size, domain):
+    """
+    Генератор строк результата через серверный курсор.
+    Соединение остается занятым, пока итератор не будет исчерпан или закрыт.
+    """
+    started = time.perf_counter()
+    with get_pool(domain).connection() as connection:
+        record_checkout(started)
+        explain_if_capturing(connection, query)
+        with connection.cursor(name=f'exec_query_{next(_cursor_counter)}') as cursor:
+            cursor.itersize = batch_size
+            # Время запроса включает чтение всех пачек, но не обработку строк потребителем
+            started, elapsed, count = time.perf_counter(), 0.0, 0
+            cursor.execute(query)
+            try:
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    elapsed += time.perf_counter() - started
+                    if not rows:
+                        break
+                    count += len(rows)
+                    yield from rows
+                    started = time.perf_counter()
+            finally:
+                record_statement(time.perf_counter() - elapsed, count)
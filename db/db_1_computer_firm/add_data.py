@@ -1,81 +1,78 @@
-from db.database import get_session
-from db.db_1_computer_firm.models import Product, PC, Laptop, Printer, engine
+from db.bulk_load import bulk_load, clear_tables
+from db.db_1_computer_firm.models import Product, PC, Laptop, Printer
+from db.routing import get_domain_engine
 
-# Получаем сессию
-session = get_session()
 
-# Очищаем таблицы перед вставкой данных
-session.query(Product).delete()
-session.query(PC).delete()
-session.query(Laptop).delete()
-session.query(Printer).delete()
+def add_data_to_computer_firm():
+    # Все таблицы загружаются в одной транзакции: при ошибке данные остаются прежними
+    with get_domain_engine('computer_firm').begin() as connection:
+        # Очищаем таблицы перед вставкой данных (сначала зависимые от Product)
+        clear_tables(PC, Laptop, Printer, Product, bind=connection)
 
-# Вставляем данные в таблицу Product
-products = [
-    Product(model=1121, maker='B', type='PC'),
-    Product(model=1232, maker='A', type='PC'),
-    Product(model=1233, maker='A', type='PC'),
-    Product(model=1260, maker='E', type='PC'),
-    Product(model=1276, maker='A', type='Printer'),
-    Product(model=1288, maker='D', type='Printer'),
-    Product(model=1298, maker='A', type='Laptop'),
-    Product(model=1321, maker='C', type='Laptop'),
-    Product(model=1401, maker='A', type='Printer'),
-    Product(model=1408, maker='A', type='Printer'),
-    Product(model=1433, maker='D', type='Printer'),
-    Product(model=1434, maker='E', type='Printer'),
-    Product(model=1750, maker='B', type='Laptop'),
-    Product(model=1752, maker='A', type='Laptop'),
-    Product(model=2112, maker='E', type='PC'),
-    Product(model=2113, maker='E', type='PC')
-]
+        # Вставляем данные в таблицу Product
+        products = [
+            (1121, 'B', 'PC'),
+            (1232, 'A', 'PC'),
+            (1233, 'A', 'PC'),
+            (1260, 'E', 'PC'),
+            (1276, 'A', 'Printer'),
+            (1288, 'D', 'Printer'),
+            (1298, 'A', 'Laptop'),
+            (1321, 'C', 'Laptop'),
+            (1401, 'A', 'Printer'),
+            (1408, 'A', 'Printer'),
+            (1433, 'D', 'Printer'),
+            (1434, 'E', 'Printer'),
+            (1750, 'B', 'Laptop'),
+            (1752, 'A', 'Laptop'),
+            (2112, 'E', 'PC'),
+            (2113, 'E', 'PC')
+        ]
 
-session.add_all(products)
+        bulk_load(Product, products, columns=('model', 'maker', 'type'), bind=connection)
 
-# Вставляем данные в таблицу PC
-pcs = [
-    PC(model_id=1121, speed=750, ram=128, hd=14.0, cd='40x', price=850.0),
-    PC(model_id=1232, speed=500, ram=64, hd=5.0, cd='12x', price=600.0),
-    PC(model_id=1233, speed=500, ram=64, hd=5.0, cd='12x', price=600.0),
-    PC(model_id=1121, speed=600, ram=128, hd=14.0, cd='40x', price=850.0),
-    PC(model_id=1121, speed=600, ram=128, hd=8.0, cd='40x', price=850.0),
-    PC(model_id=1233, speed=750, ram=128, hd=20.0, cd='50x', price=950.0),
-    PC(model_id=1232, speed=500, ram=32, hd=10.0, cd='12x', price=400.0),
-    PC(model_id=1232, speed=450, ram=64, hd=8.0, cd='24x', price=350.0),
-    PC(model_id=1232, speed=450, ram=32, hd=10.0, cd='24x', price=350.0),
-    PC(model_id=1260, speed=500, ram=32, hd=10.0, cd='12x', price=350.0),
-    PC(model_id=1233, speed=900, ram=128, hd=40.0, cd='40x', price=980.0),
-    PC(model_id=1233, speed=800, ram=128, hd=20.0, cd='50x', price=970.0)
-]
+        # Вставляем данные в таблицу PC
+        pcs = [
+            (1121, 750, 128, 14.0, '40x', 850.0),
+            (1232, 500, 64, 5.0, '12x', 600.0),
+            (1233, 500, 64, 5.0, '12x', 600.0),
+            (1121, 600, 128, 14.0, '40x', 850.0),
+            (1121, 600, 128, 8.0, '40x', 850.0),
+            (1233, 750, 128, 20.0, '50x', 950.0),
+            (1232, 500, 32, 10.0, '12x', 400.0),
+            (1232, 450, 64, 8.0, '24x', 350.0),
+            (1232, 450, 32, 10.0, '24x', 350.0),
+            (1260, 500, 32, 10.0, '12x', 350.0),
+            (1233, 900, 128, 40.0, '40x', 980.0),
+            (1233, 800, 128, 20.0, '50x', 970.0)
+        ]
 
-session.add_all(pcs)
+        bulk_load(PC, pcs, columns=('model_id', 'speed', 'ram', 'hd', 'cd', 'price'), bind=connection)
 
-# Вставляем данные в таблицу Laptop
-laptops = [
-    Laptop(model_id=1298, speed=350, ram=32, hd=4.0, price=700.0, screen=11),
-    Laptop(model_id=1321, speed=500, ram=64, hd=8.0, price=970.0, screen=12),
-    Laptop(model_id=1750, speed=750, ram=128, hd=12.0, price=1200.0, screen=14),
-    Laptop(model_id=1298, speed=600, ram=64, hd=10.0, price=1050.0, screen=15),
-    Laptop(model_id=1752, speed=750, ram=128, hd=10.0, price=1150.0, screen=14),
-    Laptop(model_id=1298, speed=450, ram=64, hd=10.0, price=950.0, screen=12)
-]
+        # Вставляем данные в таблицу Laptop
+        laptops = [
+            (1298, 350, 32, 4.0, 700.0, 11),
+            (1321, 500, 64, 8.0, 970.0, 12),
+            (1750, 750, 128, 12.0, 1200.0, 14),
+            (1298, 600, 64, 10.0, 1050.0, 15),
+            (1752, 750, 128, 10.0, 1150.0, 14),
+            (1298, 450, 64, 10.0, 950.0, 12)
+        ]
 
-session.add_all(laptops)
+        bulk_load(Laptop, laptops, columns=('model_id', 'speed', 'ram', 'hd', 'price', 'screen'), bind=connection)
 
-# Вставляем данные в таблицу Printer
-printers = [
-    Printer(model_id=1288, color='n', type='Laser', price=400.0),
-    Printer(model_id=1408, color='n', type='Matrix', price=270.0),
-    Printer(model_id=1401, color='n', type='Matrix', price=150.0),
-    Printer(model_id=1434, color='y', type='Jet', price=290.0),
-    Printer(model_id=1433, color='y', type='Jet', price=270.0),
-    Printer(model_id=1276, color='n', type='Laser', price=400.0)
-]
+        # Вставляем данные в таблицу Printer
+        printers = [
+            (1288, 'n', 'Laser', 400.0),
+            (1408, 'n', 'Matrix', 270.0),
+            (1401, 'n', 'Matrix', 150.0),
+            (1434, 'y', 'Jet', 290.0),
+            (1433, 'y', 'Jet', 270.0),
+            (1276, 'n', 'Laser', 400.0)
+        ]
 
-session.add_all(printers)
+        bulk_load(Printer, printers, columns=('model_id', 'color', 'type', 'price'), bind=connection)
 
-# Завершаем транзакцию и сохраняем изменения в БД
-session.commit()
 
-# Закрываем сессию
-session.close()
+if __name__ == '__main__':
+    add_data_to_computer_firm()
@@ -1,13 +1,17 @@
-from sqlalchemy import Column, Integer, String, Float, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Enum, ForeignKey, Index
 from sqlalchemy.orm import relationship, declarative_base
 
-from db.database import engine
-
 Base = declarative_base()
 
 
 class Product(Base):
     __tablename__ = 'product'
+    __table_args__ = (
+        # Отбор по типу продукции с выводом производителя (task_2, task_8, task_20, task_25, task_27)
+        Index('ix_product_type_maker', 'type', 'maker'),
+        # Отбор и группировка по производителю (task_7, task_13, task_26, task_28)
+        Index('ix_product_maker', 'maker', postgresql_include=['type']),
+    )
 
     model = Column(Integer, primary_key=True)
     maker = Column(String, nullable=False)
@@ -21,6 +25,14 @@ class Product(Base):
 
 class PC(Base):
     __tablename__ = 'pc'
+    __table_args__ = (
+        # Соединение с Product
+        Index('ix_pc_model_id', 'model_id'),
+        # Отбор по цене; покрывающий для task_1
+        Index('ix_pc_price', 'price', postgresql_include=['model_id', 'speed', 'hd']),
+        # Отбор по скорости и самосоединение по (speed, ram) в task_16
+        Index('ix_pc_speed_ram', 'speed', 'ram'),
+    )
 
     code = Column(Integer, primary_key=True)
     model_id = Column(Integer, ForeignKey('product.model'))
@@ -36,6 +48,11 @@ class PC(Base):
 
 class Laptop(Base):
     __tablename__ = 'laptop'
+    __table_args__ = (
+        Index('ix_laptop_model_id', 'model_id'),
+        Index('ix_laptop_price', 'price'),
+        Index('ix_laptop_speed', 'speed'),
+    )
 
     code = Column(Integer, primary_key=True)
     model_id = Column(Integer, ForeignKey('product.model'))
@@ -51,6 +68,12 @@ class Laptop(Base):
 
 class Printer(Base):
     __tablename__ = 'printer'
+    __table_args__ = (
+        Index('ix_printer_model_id', 'model_id'),
+        Index('ix_printer_price', 'price'),
+        # Цветные принтеры и минимальная цена среди них (task_4, task_18)
+        Index('ix_printer_color', 'color', postgresql_include=['price']),
+    )
 
     code = Column(Integer, primary_key=True)
     model_id = Column(Integer, ForeignKey('product.model'))
@@ -63,5 +86,7 @@ class Printer(Base):
 
 
 if __name__ == "__main__":
+    from db.database import get_engine
+
     # Создаем БД:
-    Base.metadata.create_all(engine)
+    Base.metadata.create_all(get_engine('computer_firm'))
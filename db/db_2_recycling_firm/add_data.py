@@ -1,95 +1,93 @@
-from datetime import datetime
-from db.database import get_session
+from datetime import date
+from db.bulk_load import bulk_load
+from db.db_2_recycling_firm.balances import maintain_balances
 from db.db_2_recycling_firm.models import Income, Outcome, Income_o, Outcome_o
+from db.routing import get_domain_engine
 
 
 def add_data_to_recycling_firm():
-    # Получаем сессию
-    session = get_session()
+    # Все таблицы загружаются в одной транзакции: при ошибке данные остаются прежними
+    with get_domain_engine('recycling_firm').begin() as connection:
+        incomes = [
+            (1, 1, date(2001, 3, 22), 15000.0000),
+            (2, 1, date(2001, 3, 23), 15000.0000),
+            (3, 1, date(2001, 3, 24), 3600.0000),
+            (4, 2, date(2001, 3, 22), 10000.0000),
+            (5, 2, date(2001, 3, 24), 1500.0000),
+            (6, 1, date(2001, 4, 13), 5000.0000),
+            (7, 1, date(2001, 5, 11), 4500.0000),
+            (8, 1, date(2001, 3, 22), 15000.0000),
+            (9, 2, date(2001, 3, 24), 1500.0000),
+            (10, 1, date(2001, 4, 13), 5000.0000),
+            (11, 1, date(2001, 3, 24), 3400.0000),
+            (12, 3, date(2001, 9, 13), 1350.0000),
+            (13, 3, date(2001, 9, 13), 1750.0000)
+        ]
 
-    incomes = [
-        Income(code=1, point=1, date=datetime(2001, 3, 22), inc=15000.0000),
-        Income(code=2, point=1, date=datetime(2001, 3, 23), inc=15000.0000),
-        Income(code=3, point=1, date=datetime(2001, 3, 24), inc=3600.0000),
-        Income(code=4, point=2, date=datetime(2001, 3, 22), inc=10000.0000),
-        Income(code=5, point=2, date=datetime(2001, 3, 24), inc=1500.0000),
-        Income(code=6, point=1, date=datetime(2001, 4, 13), inc=5000.0000),
-        Income(code=7, point=1, date=datetime(2001, 5, 11), inc=4500.0000),
-        Income(code=8, point=1, date=datetime(2001, 3, 22), inc=15000.0000),
-        Income(code=9, point=2, date=datetime(2001, 3, 24), inc=1500.0000),
-        Income(code=10, point=1, date=datetime(2001, 4, 13), inc=5000.0000),
-        Income(code=11, point=1, date=datetime(2001, 3, 24), inc=3400.0000),
-        Income(code=12, point=3, date=datetime(2001, 9, 13), inc=1350.0000),
-        Income(code=13, point=3, date=datetime(2001, 9, 13), inc=1750.0000)
-    ]
+        bulk_load(Income, incomes, bind=connection)
 
-    session.add_all(incomes)
+        # Добавляем данные в таблицу Income_o
+        income_o_entries = [
+            (1, date(2001, 3, 22), 15000.0000),
+            (1, date(2001, 3, 23), 15000.0000),
+            (1, date(2001, 3, 24), 3400.0000),
+            (1, date(2001, 4, 13), 5000.0000),
+            (1, date(2001, 5, 11), 4500.0000),
+            (2, date(2001, 3, 22), 10000.0000),
+            (2, date(2001, 3, 24), 1500.0000),
+            (3, date(2001, 9, 13), 11500.0000),
+            (3, date(2001, 10, 2), 18000.0000)
+        ]
 
-    # Добавляем данные в таблицу Income_o
-    income_o_entries = [
-        Income_o(point=1, date=datetime(2001, 3, 22), inc=15000.0000),
-        Income_o(point=1, date=datetime(2001, 3, 23), inc=15000.0000),
-        Income_o(point=1, date=datetime(2001, 3, 24), inc=3400.0000),
-        Income_o(point=1, date=datetime(2001, 4, 13), inc=5000.0000),
-        Income_o(point=1, date=datetime(2001, 5, 11), inc=4500.0000),
-        Income_o(point=2, date=datetime(2001, 3, 22), inc=10000.0000),
-        Income_o(point=2, date=datetime(2001, 3, 24), inc=1500.0000),
-        Income_o(point=3, date=datetime(2001, 9, 13), inc=11500.0000),
-        Income_o(point=3, date=datetime(2001, 10, 2), inc=18000.0000)
-    ]
+        bulk_load(Income_o, income_o_entries, bind=connection)
 
-    session.add_all(income_o_entries)
+        # Добавляем данные в таблицу Outcome
+        outcomes = [
+            (1, 1, date(2001, 3, 14), 15348.0000),
+            (2, 1, date(2001, 3, 24), 3663.0000),
+            (3, 1, date(2001, 3, 26), 1221.0000),
+            (4, 1, date(2001, 3, 28), 2075.0000),
+            (5, 1, date(2001, 3, 29), 2004.0000),
+            (6, 1, date(2001, 4, 11), 3195.0400),
+            (7, 1, date(2001, 4, 13), 4490.0000),
+            (8, 1, date(2001, 4, 27), 3110.0000),
+            (9, 1, date(2001, 5, 11), 2530.0000),
+            (10, 2, date(2001, 3, 22), 1440.0000),
+            (11, 2, date(2001, 3, 29), 7848.0000),
+            (12, 2, date(2001, 4, 2), 2040.0000),
+            (13, 1, date(2001, 3, 24), 3500.0000),
+            (14, 2, date(2001, 3, 22), 1440.0000),
+            (15, 1, date(2001, 3, 29), 2006.0000),
+            (16, 3, date(2001, 9, 13), 1200.0000),
+            (17, 3, date(2001, 9, 13), 1500.0000),
+            (18, 3, date(2001, 9, 14), 1150.0000)
+        ]
 
-    # Добавляем данные в таблицу Outcome
-    outcomes = [
-        Outcome(code=1, point=1, date=datetime(2001, 3, 14), out=15348.0000),
-        Outcome(code=2, point=1, date=datetime(2001, 3, 24), out=3663.0000),
-        Outcome(code=3, point=1, date=datetime(2001, 3, 26), out=1221.0000),
-        Outcome(code=4, point=1, date=datetime(2001, 3, 28), out=2075.0000),
-        Outcome(code=5, point=1, date=datetime(2001, 3, 29), out=2004.0000),
-        Outcome(code=6, point=1, date=datetime(2001, 4, 11), out=3195.0400),
-        Outcome(code=7, point=1, date=datetime(2001, 4, 13), out=4490.0000),
-        Outcome(code=8, point=1, date=datetime(2001, 4, 27), out=3110.0000),
-        Outcome(code=9, point=1, date=datetime(2001, 5, 11), out=2530.0000),
-        Outcome(code=10, point=2, date=datetime(2001, 3, 22), out=1440.0000),
-        Outcome(code=11, point=2, date=datetime(2001, 3, 29), out=7848.0000),
-        Outcome(code=12, point=2, date=datetime(2001, 4, 2), out=2040.0000),
-        Outcome(code=13, point=1, date=datetime(2001, 3, 24), out=3500.0000),
-        Outcome(code=14, point=2, date=datetime(2001, 3, 22), out=1440.0000),
-        Outcome(code=15, point=1, date=datetime(2001, 3, 29), out=2006.0000),
-        Outcome(code=16, point=3, date=datetime(2001, 9, 13), out=1200.0000),
-        Outcome(code=17, point=3, date=datetime(2001, 9, 13), out=1500.0000),
-        Outcome(code=18, point=3, date=datetime(2001, 9, 14), out=1150.0000)
-    ]
+        bulk_load(Outcome, outcomes, bind=connection)
 
-    session.add_all(outcomes)
+        # Добавляем данные в таблицу Outcome_o
+        outcome_o_entries = [
+            (1, date(2001, 3, 14), 15348.0000),
+            (1, date(2001, 3, 24), 3663.0000),
+            (1, date(2001, 3, 26), 1221.0000),
+            (1, date(2001, 3, 28), 2075.0000),
+            (1, date(2001, 3, 29), 2004.0000),
+            (1, date(2001, 4, 11), 3195.0400),
+            (1, date(2001, 4, 13), 4490.0000),
+            (1, date(2001, 4, 27), 3110.0000),
+            (1, date(2001, 5, 11), 2530.0000),
+            (2, date(2001, 3, 22), 1440.0000),
+            (2, date(2001, 3, 29), 7848.0000),
+            (2, date(2001, 4, 2), 2040.0000),
+            (3, date(2001, 9, 13), 1500.0000),
+            (3, date(2001, 9, 14), 2300.0000),
+            (3, date(2002, 9, 16), 2150.0000)
+        ]
 
-    # Добавляем данные в таблицу Outcome_o
-    outcome_o_entries = [
-        Outcome_o(point=1, date=datetime(2001, 3, 14), out=15348.0000),
-        Outcome_o(point=1, date=datetime(2001, 3, 24), out=3663.0000),
-        Outcome_o(point=1, date=datetime(2001, 3, 26), out=1221.0000),
-        Outcome_o(point=1, date=datetime(2001, 3, 28), out=2075.0000),
-        Outcome_o(point=1, date=datetime(2001, 3, 29), out=2004.0000),
-        Outcome_o(point=1, date=datetime(2001, 4, 11), out=3195.0400),
-        Outcome_o(point=1, date=datetime(2001, 4, 13), out=4490.0000),
-        Outcome_o(point=1, date=datetime(2001, 4, 27), out=3110.0000),
-        Outcome_o(point=1, date=datetime(2001, 5, 11), out=2530.0000),
-        Outcome_o(point=2, date=datetime(2001, 3, 22), out=1440.0000),
-        Outcome_o(point=2, date=datetime(2001, 3, 29), out=7848.0000),
-        Outcome_o(point=2, date=datetime(2001, 4, 2), out=2040.0000),
-        Outcome_o(point=3, date=datetime(2001, 9, 13), out=1500.0000),
-        Outcome_o(point=3, date=datetime(2001, 9, 14), out=2300.0000),
-        Outcome_o(point=3, date=datetime(2002, 9, 16), out=2150.0000)
-    ]
+        bulk_load(Outcome_o, outcome_o_entries, bind=connection)
 
-    session.add_all(outcome_o_entries)
-
-    # Завершаем транзакцию и сохраняем изменения в БД
-    session.commit()
-
-    # Закрываем сессию
-    session.close()
+        # В PostgreSQL балансы обновили триггеры, в остальных СУБД пересчитываем их
+        maintain_balances(connection)
 
 
 if __name__ == '__main__':
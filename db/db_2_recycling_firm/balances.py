@@ -0,0 +1,255 @@
+"""
+Материализованные балансы пунктов приема по (пункт, дата).
+
+Таблица balance_o хранит результат task_29 (приход из Income_o и расход из Outcome_o за день),
+таблица balance - результат task_30 (суммы прихода из Income и расхода из Outcome за день).
+Задачи читают готовые строки, поэтому время отчета зависит от его размера, а не от длины
+истории операций.
+
+В PostgreSQL балансы поддерживаются триггерами уровня оператора на исходных таблицах: по таблицам
+переходов (REFERENCING NEW/OLD TABLE) находятся затронутые пары (пункт, дата), и пересчитываются
+только они - по индексам (point, date) исходных таблиц. Так обрабатываются и INSERT/UPDATE/DELETE
+через SQLAlchemy, и загрузка через COPY (одна пачка ключей на команду), и TRUNCATE (полный пересчет).
+Триггеры и функции создаются вместе с таблицами (Base.metadata.create_all) и пересоздаются при
+повторном вызове, после чего балансы пересчитываются по уже имеющимся данным.
+
+Для остальных СУБД триггеров нет: после изменения данных балансы пересчитываются целиком
+функцией refresh_balances (генератор данных делает это сам, см. maintain_balances).
+
+Запуск из корня проекта (полный пересчет):
+
+    python -m db.db_2_recycling_firm.balances
+"""
+from sqlalchemy import DDL, and_, event, func, select
+from sqlalchemy.engine import Connection
+
+from db.result_cache import add_dependent_tables
+from db.routing import get_domain_engine
+
+# Таблица балансов -> (таблица прихода, таблица расхода)
+BALANCES = {
+    'balance_o': ('income_o', 'outcome_o'),
+    'balance': ('income', 'outcome'),
+}
+
+# Затронутые ключи из массивов points/dates; строки без пункта или даты в балансы не попадают
+_KEYS = """(
+        SELECT DISTINCT point, date
+        FROM unnest(points, dates) AS k(point, date)
+        WHERE point IS NOT NULL AND date IS NOT NULL
+    )"""
+
+
+def _refresh_function(view, income, outcome):
+    return f"""
+CREATE OR REPLACE FUNCTION {view}_refresh() RETURNS void
+LANGUAGE sql AS $$
+    DELETE FROM {view};
+    INSERT INTO {view} (point, date, inc, out)
+    SELECT coalesce(i.point, o.point), coalesce(i.date, o.date), i.inc, o.out
+    FROM (
+        SELECT point, date, sum(inc) AS inc
+        FROM {income}
+        WHERE point IS NOT NULL AND date IS NOT NULL
+        GROUP BY point, date
+    ) i
+    FULL JOIN (
+        SELECT point, date, sum(out) AS out
+        FROM {outcome}
+        WHERE point IS NOT NULL AND date IS NOT NULL
+        GROUP BY point, date
+    ) o ON i.point = o.point AND i.date = o.date;
+$$
+"""
+
+
+def _apply_function(view, income, outcome):
+    return f"""
+CREATE OR REPLACE FUNCTION {view}_apply(points integer[], dates date[]) RETURNS void
+LANGUAGE plpgsql AS $$
+BEGIN
+    -- Строки затронутых ключей создаются и блокируются до пересчета: параллельные транзакции
+    -- пересчитывают один и тот же ключ по очереди, и следующая видит изменения предыдущей
+    INSERT INTO {view} (point, date)
+    SELECT point, date FROM {_KEYS} k
+    ORDER BY point, date
+    ON CONFLICT (point, date) DO NOTHING;
+
+    PERFORM 1
+    FROM {view} b JOIN {_KEYS} k ON b.point = k.point AND b.date = k.date
+    ORDER BY b.point, b.date
+    FOR UPDATE OF b;
+
+    UPDATE {view} b
+    SET inc = i.inc, out = o.out
+    FROM {_KEYS} k
+        CROSS JOIN LATERAL (
+            SELECT sum(inc) AS inc FROM {income} WHERE point = k.point AND date = k.date
+        ) i
+        CROSS JOIN LATERAL (
+            SELECT sum(out) AS out FROM {outcome} WHERE point = k.point AND date = k.date
+        ) o
+    WHERE b.point = k.point AND b.date = k.date;
+
+    -- Ключи, по которым не осталось ни прихода, ни расхода
+    DELETE FROM {view} b
+    USING {_KEYS} k
+    WHERE b.point = k.point AND b.date = k.date
+        AND NOT EXISTS (SELECT 1 FROM {income} WHERE point = k.point AND date = k.date)
+        AND NOT EXISTS (SELECT 1 FROM {outcome} WHERE point = k.point AND date = k.date);
+END;
+$$
+"""
+
+
+def _trigger_function(view):
+    return f"""
+CREATE OR REPLACE FUNCTION {view}_changed() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    points integer[];
+    dates date[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(point), array_agg(date) INTO points, dates
+        FROM (SELECT DISTINCT point, date FROM new_rows) k;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(point), array_agg(date) INTO points, dates
+        FROM (SELECT DISTINCT point, date FROM old_rows) k;
+    ELSIF TG_OP = 'UPDATE' THEN
+        SELECT array_agg(point), array_agg(date) INTO points, dates
+        FROM (SELECT point, date FROM old_rows UNION SELECT point, date FROM new_rows) k;
+    ELSE
+        -- У TRUNCATE нет таблиц переходов
+        PERFORM {view}_refresh();
+        RETURN NULL;
+    END IF;
+
+    IF points IS NOT NULL THEN
+        PERFORM {view}_apply(points, dates);
+    END IF;
+    RETURN NULL;
+END;
+$$
+"""
+
+
+def _triggers(view, source):
+    # Таблицы переходов допустимы только у триггеров на одно событие, поэтому триггеров четыре
+    events = {
+        'insert': 'INSERT ON {source} REFERENCING NEW TABLE AS new_rows',
+        'update': 'UPDATE ON {source} REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows',
+        'delete': 'DELETE ON {source} REFERENCING OLD TABLE AS old_rows',
+        'truncate': 'TRUNCATE ON {source}',
+    }
+    statements = []
+    for name, definition in events.items():
+        trigger = f'{source}_{view}_{name}'
+        statements.append(f'DROP TRIGGER IF EXISTS {trigger} ON {source}')
+        statements.append(
+            f'CREATE TRIGGER {trigger} AFTER {definition.format(source=source)} '
+            f'FOR EACH STATEMENT EXECUTE FUNCTION {view}_changed()'
+        )
+    return statements
+
+
+def balance_ddl():
+    """Возвращает команды PostgreSQL, создающие функции и триггеры балансов и заполняющие балансы."""
+    statements = []
+    for view, (income, outcome) in BALANCES.items():
+        statements.append(_refresh_function(view, income, outcome))
+        statements.append(_apply_function(view, income, outcome))
+        statements.append(_trigger_function(view))
+        statements.extend(_triggers(view, income))
+        statements.extend(_triggers(view, outcome))
+        statements.append(f'SELECT {view}_refresh()')
+    return statements
+
+
+def install_balance_triggers(metadata):
+    """
+    Регистрирует создание триггеров балансов после create_all (только для PostgreSQL)
+    и удаление их функций после drop_all.
+
+    Args:
+        metadata: MetaData моделей фирмы вторсырья.
+    """
+    for statement in balance_ddl():
+        event.listen(metadata, 'after_create', DDL(statement).execute_if(dialect='postgresql'))
+    for view in BALANCES:
+        event.listen(metadata, 'after_drop', DDL(
+            f'DROP FUNCTION IF EXISTS {view}_changed(), {view}_apply(integer[], date[]), {view}_refresh()'
+        ).execute_if(dialect='postgresql'))
+
+
+def refresh_balances(bind=None):
+    """
+    Пересчитывает балансы целиком по исходным таблицам (работает в любой СУБД).
+
+    Args:
+        bind: Движок или соединение; по умолчанию - движок БД фирмы вторсырья.
+
+    Returns:
+        Словарь {таблица балансов: число строк}.
+    """
+    from db.db_2_recycling_firm.models import Base
+
+    bind = bind if bind is not None else get_domain_engine('recycling_firm')
+    if not isinstance(bind, Connection):
+        with bind.begin() as connection:
+            return refresh_balances(connection)
+
+    tables = Base.metadata.tables
+    counts = {}
+    for view, (income_name, outcome_name) in BALANCES.items():
+        view_table, income, outcome = tables[view], tables[income_name], tables[outcome_name]
+        incomes = (
+            select(income.c.point, income.c.date, func.sum(income.c.inc).label('inc'))
+            .where(income.c.point.isnot(None), income.c.date.isnot(None))
+            .group_by(income.c.point, income.c.date)
+            .subquery()
+        )
+        outcomes = (
+            select(outcome.c.point, outcome.c.date, func.sum(outcome.c.out).label('out'))
+            .where(outcome.c.point.isnot(None), outcome.c.date.isnot(None))
+            .group_by(outcome.c.point, outcome.c.date)
+            .subquery()
+        )
+        rows = (
+            select(
+                func.coalesce(incomes.c.point, outcomes.c.point),
+                func.coalesce(incomes.c.date, outcomes.c.date),
+                incomes.c.inc,
+                outcomes.c.out
+            )
+            .select_from(incomes.join(
+                outcomes, and_(incomes.c.point == outcomes.c.point, incomes.c.date == outcomes.c.date), full=True
+            ))
+        )
+        bind.execute(view_table.delete())
+        counts[view] = bind.execute(view_table.insert().from_select(['point', 'date', 'inc', 'out'], rows)).rowcount
+    return counts
+
+
+def maintain_balances(bind=None):
+    """
+    Пересчитывает балансы после массового изменения данных, если их не поддерживают триггеры
+    (в PostgreSQL ничего не делает).
+
+    Args:
+        bind: Движок или соединение; по умолчанию - движок БД фирмы вторсырья.
+    """
+    bind = bind if bind is not None else get_domain_engine('recycling_firm')
+    if bind.dialect.name != 'postgresql':
+        refresh_balances(bind)
+
+
+# Триггеры меняют балансы в обход SQLAlchemy: кэш результатов должен сбрасывать их вместе с исходными таблицами
+for _view, _sources in BALANCES.items():
+    for _source in _sources:
+        add_dependent_tables(_source, [_view])
+
+
+if __name__ == '__main__':
+    for table, count in refresh_balances().items():
+        print(f'{table}: {count} rows')
@@ -1,21 +1,30 @@
-from sqlalchemy import Column, Integer, Float, Date
+from sqlalchemy import Column, Integer, Float, Date, Index
 from sqlalchemy.orm import declarative_base
 
-from db.database import engine
+from db.db_2_recycling_firm.balances import install_balance_triggers
+from db.db_2_recycling_firm.partitions import install_partitioning, is_partitioned, partition_table_args
 
 Base = declarative_base()
 
 
 class Income(Base):
     __tablename__ = 'income'
-    code = Column(Integer, primary_key=True)
+    # Группировка по (пункт, дата) в task_30; покрывающий, чтобы не читать таблицу
+    __table_args__ = (
+        Index('ix_income_point_date', 'point', 'date', postgresql_include=['inc']),
+        partition_table_args(),
+    )
+    # В составном ключе (code, date) секционированной таблицы SERIAL задается явно
+    code = Column(Integer, primary_key=True, autoincrement=is_partitioned() or 'auto')
     point = Column(Integer)
-    date = Column(Date)
+    # Ключ секционирования входит в первичный ключ секционированной таблицы (см. partitions.py)
+    date = Column(Date, primary_key=is_partitioned())
     inc = Column(Float)
 
 
 class Income_o(Base):
     __tablename__ = 'income_o'
+    __table_args__ = partition_table_args()
     point = Column(Integer, primary_key=True)
     date = Column(Date, primary_key=True)
     inc = Column(Float)
@@ -23,19 +32,50 @@ class Income_o(Base):
 
 class Outcome(Base):
     __tablename__ = 'outcome'
-    code = Column(Integer, primary_key=True)
+    __table_args__ = (
+        Index('ix_outcome_point_date', 'point', 'date', postgresql_include=['out']),
+        partition_table_args(),
+    )
+    code = Column(Integer, primary_key=True, autoincrement=is_partitioned() or 'auto')
     point = Column(Integer)
-    date = Column(Date)
+    date = Column(Date, primary_key=is_partitioned())
     out = Column(Float)
 
 
 class Outcome_o(Base):
     __tablename__ = 'outcome_o'
+    __table_args__ = partition_table_args()
     point = Column(Integer, primary_key=True)
     date = Column(Date, primary_key=True)
     out = Column(Float)
 
 
+class Balance_o(Base):
+    """Материализованный результат task_29: приход и расход из Income_o/Outcome_o за день (см. balances.py)"""
+    __tablename__ = 'balance_o'
+    point = Column(Integer, primary_key=True)
+    date = Column(Date, primary_key=True)
+    inc = Column(Float)
+    out = Column(Float)
+
+
+class Balance(Base):
+    """Материализованный результат task_30: суммы прихода и расхода из Income/Outcome за день (см. balances.py)"""
+    __tablename__ = 'balance'
+    point = Column(Integer, primary_key=True)
+    date = Column(Date, primary_key=True)
+    inc = Column(Float)
+    out = Column(Float)
+
+
+# Функции и триггеры PostgreSQL, поддерживающие балансы, создаются вместе с таблицами
+install_balance_triggers(Base.metadata)
+# При включенном секционировании - секции DEFAULT и создание секций при массовой загрузке
+install_partitioning(Base.metadata)
+
+
 if __name__ == "__main__":
+    from db.database import get_engine
+
     # Создаем БД:
-    Base.metadata.create_all(engine)
+    Base.metadata.create_all(get_engine('recycling_firm'))
@@ -0,0 +1,172 @@
+"""
+Необязательное секционирование таблиц операций фирмы вторсырья по дате (только PostgreSQL).
+
+Если задана переменная DB_RECYCLING_PARTITIONING (month или year), таблицы Income, Outcome,
+Income_o и Outcome_o создаются как секционированные по диапазону дат (PARTITION BY RANGE (date))
+с секцией на каждый месяц или год и секцией DEFAULT для дат, у которых еще нет своей секции.
+Первичный ключ секционированной таблицы должен включать дату, поэтому у Income и Outcome он
+становится (code, date). Индексы, объявленные на моделях, создаются в каждой секции, а триггеры
+материализованных балансов (balances.py) работают на родительской таблице как и раньше.
+
+Секции создаются при массовой загрузке (db.bulk_load): строки загружаются пачками, и перед каждой
+пачкой создаются недостающие секции ее дат. Строки, вставленные другим способом (через ORM и т.п.)
+в месяц без секции, попадают в секцию DEFAULT; секцию на такой месяц создать уже нельзя, поэтому
+секции на будущие периоды лучше создавать заранее:
+
+    python -m db.db_2_recycling_firm.partitions create 2004-01-01 2005-12-31
+    python -m db.db_2_recycling_firm.partitions list
+
+Запросы с условием по дате (например, task_29 и task_30 за период) читают только секции периода.
+Секционирование действует при создании таблиц; чтобы секционировать существующие таблицы,
+их нужно пересоздать (Base.metadata.drop_all/create_all) и загрузить данные заново.
+"""
+import argparse
+from datetime import date
+
+from sqlalchemy import DDL, event, text
+from tabulate import tabulate
+
+from db.bulk_load import register_partitioner
+from db.config import DB_RECYCLING_PARTITIONING
+from db.routing import get_domain_engine
+
+PARTITIONED_TABLES = ('income', 'outcome', 'income_o', 'outcome_o')
+INTERVALS = ('month', 'year')
+
+PARTITION_INTERVAL = DB_RECYCLING_PARTITIONING
+if PARTITION_INTERVAL not in (None, *INTERVALS):
+    raise ValueError(
+        f'Неизвестный интервал секционирования {PARTITION_INTERVAL!r}, доступны: {", ".join(INTERVALS)}'
+    )
+
+
+def is_partitioned():
+    """Создаются ли таблицы операций секционированными."""
+    return PARTITION_INTERVAL is not None
+
+
+def partition_table_args():
+    """Параметры таблицы для __table_args__ моделей операций (пустой словарь без секционирования)."""
+    return {'postgresql_partition_by': 'RANGE (date)'} if is_partitioned() else {}
+
+
+def partition_bounds(day, interval=None):
+    """
+    Возвращает границы [начало, конец) секции, в которую попадает дата.
+
+    Args:
+        day (date): Дата.
+        interval (str): 'month' или 'year', по умолчанию PARTITION_INTERVAL.
+    """
+    if (interval or PARTITION_INTERVAL) == 'year':
+        return date(day.year, 1, 1), date(day.year + 1, 1, 1)
+    start = day.replace(day=1)
+    return start, date(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def partition_name(table, start, interval=None):
+    """Имя секции, например income_p2001_03 (месяц) или income_p2001 (год)."""
+    if (interval or PARTITION_INTERVAL) == 'year':
+        return f'{table}_p{start:%Y}'
+    return f'{table}_p{start:%Y_%m}'
+
+
+def create_partitions(connection, table, days, interval=None):
+    """
+    Создает недостающие секции таблицы для дат.
+
+    Args:
+        connection: Соединение SQLAlchemy с БД PostgreSQL.
+        table (str): Имя секционированной таблицы.
+        days: Даты, для которых нужны секции (None пропускаются).
+        interval (str): 'month' или 'year', по умолчанию PARTITION_INTERVAL.
+
+    Returns:
+        Список имен секций (в том числе уже существовавших).
+    """
+    names = []
+    for start, end in sorted({partition_bounds(day, interval) for day in days if day is not None}):
+        name = partition_name(table, start, interval)
+        connection.exec_driver_sql(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        names.append(name)
+    return names
+
+
+def create_partitions_for_range(connection, table, first, last, interval=None):
+    """Создает секции таблицы на все месяцы (годы) от даты first до даты last включительно."""
+    days = []
+    day = first
+    while day <= last:
+        days.append(day)
+        day = partition_bounds(day, interval)[1]
+    return create_partitions(connection, table, days, interval)
+
+
+def _partition_batch(connection, table, columns, rows):
+    position = list(columns).index('date')
+    create_partitions(connection, table.name, (row[position] for row in rows))
+
+
+def install_partitioning(metadata):
+    """
+    Регистрирует секцию DEFAULT, создаваемую вместе с каждой секционированной таблицей,
+    и создание секций при массовой загрузке. Без секционирования ничего не делает.
+
+    Args:
+        metadata: MetaData моделей фирмы вторсырья.
+    """
+    if not is_partitioned():
+        return
+    for name in PARTITIONED_TABLES:
+        event.listen(metadata.tables[name], 'after_create', DDL(
+            f'CREATE TABLE IF NOT EXISTS {name}_default PARTITION OF {name} DEFAULT'
+        ).execute_if(dialect='postgresql'))
+        register_partitioner(name, _partition_batch)
+
+
+def list_partitions(connection):
+    """Возвращает строки (таблица, секция, границы, число строк) секций таблиц операций."""
+    rows = []
+    for table in PARTITIONED_TABLES:
+        partitions = connection.execute(text(
+            """
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = CAST(:table AS regclass)
+            ORDER BY c.relname
+            """
+        ), {'table': table}).all()
+        for name, bounds in partitions:
+            count = connection.exec_driver_sql(f'SELECT count(*) FROM {name}').scalar()
+            rows.append((table, name, bounds, count))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    create = commands.add_parser('create', help='создать секции таблиц операций на период')
+    create.add_argument('first', type=date.fromisoformat, help='первая дата периода (YYYY-MM-DD)')
+    create.add_argument('last', type=date.fromisoformat, help='последняя дата периода (YYYY-MM-DD)')
+    commands.add_parser('list', help='показать секции и число строк в них')
+    args = parser.parse_args()
+
+    if not is_partitioned():
+        parser.error('секционирование выключено: задайте DB_RECYCLING_PARTITIONING (month или year)')
+
+    engine = get_domain_engine('recycling_firm')
+    if args.command == 'create':
+        with engine.begin() as connection:
+            for table in PARTITIONED_TABLES:
+                names = create_partitions_for_range(connection, table, args.first, args.last)
+                print(f'{table}: {len(names)} секций')
+    else:
+        with engine.connect() as connection:
+            print(tabulate(list_partitions(connection), ['table', 'partition', 'bounds', 'rows'], tablefmt='pretty'))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, Date, String, ForeignKey
+from sqlalchemy import Column, Integer, Float, Date, String, ForeignKey, Index
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
@@ -6,6 +6,10 @@ Base = declarative_base()
 
 class Classes(Base):
     __tablename__ = 'classes'
+    # Отбор классов по типу с выводом страны (task_34, task_38)
+    __table_args__ = (
+        Index('ix_classes_type', 'type', postgresql_include=['country']),
+    )
     class_name = Column(String, primary_key=True, nullable=False)
     type = Column(String, nullable=False)
     country = Column(String, nullable=False)
@@ -18,6 +22,10 @@ class Classes(Base):
 
 class Ships(Base):
     __tablename__ = 'ships'
+    # Соединение с Classes (task_32, task_34, task_37, task_52, task_56)
+    __table_args__ = (
+        Index('ix_ships_class_name', 'class_name'),
+    )
     name = Column(String, primary_key=True, nullable=False)
     class_name = Column(String, ForeignKey('classes.class_name'), nullable=False)
     launched = Column(Integer)
@@ -27,6 +35,10 @@ class Ships(Base):
 
 class Outcomes(Base):
     __tablename__ = 'outcomes'
+    # Первичный ключ (ship, battle) уже служит индексом по ship; для соединения с Battles нужен индекс по battle
+    __table_args__ = (
+        Index('ix_outcomes_battle', 'battle'),
+    )
     ship = Column(String, primary_key=True, nullable=False)
     battle = Column(String, ForeignKey('battles.name'), primary_key=True, nullable=False)
     result = Column(String, nullable=False)
@@ -43,6 +55,6 @@ class Battles(Base):
 
 
 if __name__ == "__main__":
-    from db.database import engine  # Замените на вашу настройку SQLAlchemy
+    from db.database import get_engine
 
-    Base.metadata.create_all(engine)
+    Base.metadata.create_all(get_engine('ships'))
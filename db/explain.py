@@ -0,0 +1,336 @@
+"""
+Профилирование запросов через EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON).
+
+Внутри блока `with capture_plans() as plans:` для каждого запроса на чтение, выполненного
+через SQLAlchemy или exec_query в PostgreSQL, сохраняется его план с фактическими
+показателями. Для этого запрос выполняется повторно под EXPLAIN ANALYZE на том же соединении
+(в откатываемой точке сохранения), поэтому время задачи в режиме профилирования примерно удваивается.
+Запросы SQLAlchemy профилируются, только если это скомпилированный SELECT (не DML и не text()).
+
+Планы сохраняются в архив (PLAN_ARCHIVE_DIR/<масштаб>/<задача>.json). По ним можно построить
+сводку "горячих" узлов (последовательные сканирования, сбросы хэша и сортировки на диск,
+ошибки оценки числа строк, самые долгие узлы) и сравнить планы двух прогонов.
+
+Запуск из корня проекта:
+
+    python -m tasks --task 56 --explain --scale sf10         # сохранить планы задачи
+    python -m db.explain summary plans/sf10                  # сводка по архиву
+    python -m db.explain diff plans/sf1 plans/sf10           # сравнение двух архивов
+"""
+import argparse
+import contextlib
+import contextvars
+import json
+import os
+import re
+import sys
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from tabulate import tabulate
+
+from db.config import PLAN_ARCHIVE_DIR
+
+EXPLAIN_PREFIX = 'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) '
+
+# Во сколько раз фактическое число строк узла должно отличаться от оценки, чтобы считаться ошибкой оценки
+MISESTIMATE_FACTOR = 10
+# Сколько самых долгих узлов плана показывать в сводке
+HOT_NODES = 3
+# Во сколько раз должно измениться время выполнения запроса, чтобы diff считал это регрессией
+TIME_CHANGE_FACTOR = 1.5
+
+# Изменяющие команды, при которых запрос WITH не профилируется (WITH x AS (DELETE ... RETURNING ...))
+_DML_WORDS = re.compile(r'\b(INSERT|UPDATE|DELETE|MERGE)\b', re.IGNORECASE)
+
+# Список, в который сохраняются планы в текущем контексте (None - профилирование выключено)
+_capture = contextvars.ContextVar('plan_capture', default=None)
+
+
+@contextlib.contextmanager
+def capture_plans():
+    """
+    Включает сохранение планов запросов в текущем потоке/контексте.
+
+    Yields:
+        Список словарей {'statement': текст запроса, 'plan': план EXPLAIN в формате JSON}.
+    """
+    plans = []
+    token = _capture.set(plans)
+    try:
+        yield plans
+    finally:
+        _capture.reset(token)
+
+
+def _is_select(statement):
+    """Текст запроса (exec_query) на чтение: SELECT/VALUES/TABLE или WITH без изменяющих CTE."""
+    words = statement.split(None, 1)
+    if not words:
+        return False
+    first = words[0].upper()
+    if first == 'WITH':
+        return _DML_WORDS.search(statement) is None
+    return first in ('SELECT', 'VALUES', 'TABLE')
+
+
+def _is_select_context(context):
+    """Выполняется ли скомпилированный SQLAlchemy запрос на чтение (SELECT, UNION, ...), а не DML и не text()."""
+    compiled = getattr(context, 'compiled', None)
+    if compiled is None or context.isinsert or context.isupdate or context.isdelete:
+        return False
+    return compiled.statement.is_select
+
+
+def explain_if_capturing(dbapi_connection, statement, parameters=None):
+    """
+    Сохраняет план запроса, если в текущем контексте включено профилирование.
+
+    EXPLAIN ANALYZE выполняет запрос еще раз, поэтому он выполняется внутри точки сохранения,
+    которая затем откатывается: даже если запрос на чтение что-то изменил (функция с записью,
+    изменяющее CTE), повторное выполнение не удвоит изменения.
+
+    Args:
+        dbapi_connection: Соединение psycopg2, на котором выполнялся запрос.
+        statement (str): Текст запроса.
+        parameters: Параметры запроса в формате драйвера.
+    """
+    plans = _capture.get()
+    if plans is None or not _is_select(statement):
+        return
+    _explain(dbapi_connection, statement, parameters, plans)
+
+
+def _explain(dbapi_connection, statement, parameters, plans):
+    with dbapi_connection.cursor() as cursor:
+        cursor.execute('SAVEPOINT explain_capture')
+        try:
+            cursor.execute(EXPLAIN_PREFIX + statement, parameters or None)
+            plan = cursor.fetchone()[0]
+        finally:
+            cursor.execute('ROLLBACK TO SAVEPOINT explain_capture')
+            cursor.execute('RELEASE SAVEPOINT explain_capture')
+    # psycopg2 разбирает json сам, но на всякий случай поддерживаем и строку
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    plans.append({'statement': statement, 'plan': plan[0]})
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    plans = _capture.get()
+    if plans is None or executemany or conn.dialect.name != 'postgresql':
+        return
+    # Решение принимается по скомпилированному запросу, а не по первому слову текста:
+    # text() и INSERT/UPDATE/DELETE (в том числе с RETURNING) не профилируются
+    if _is_select_context(context):
+        _explain(cursor.connection, statement, parameters, plans)
+
+
+# --- Архив планов ---
+
+def archive_path(task_name, scale=None, archive_dir=None):
+    return os.path.join(archive_dir or PLAN_ARCHIVE_DIR, scale or 'default', f'{task_name}.json')
+
+
+def save_plans(task_name, plans, scale=None, archive_dir=None):
+    """
+    Сохраняет планы задачи в архив и возвращает путь к файлу.
+
+    Args:
+        task_name (str): Имя задачи, например 'ships.task_56'.
+        plans: Планы, собранные capture_plans.
+        scale (str): Метка набора данных (например, 'sf10'); планы разных масштабов хранятся раздельно.
+        archive_dir (str): Каталог архива, по умолчанию PLAN_ARCHIVE_DIR.
+    """
+    path = archive_path(task_name, scale, archive_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump({
+            'task': task_name,
+            'scale': scale,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'statements': plans,
+        }, file, ensure_ascii=False, indent=2)
+    return path
+
+
+def load_archive(directory):
+    """Загружает все планы каталога архива в словарь {задача: список планов}."""
+    archive = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.json'):
+            with open(os.path.join(directory, name), encoding='utf-8') as file:
+                data = json.load(file)
+            archive[data['task']] = data['statements']
+    return archive
+
+
+# --- Сводка ---
+
+def _walk(node, depth=0):
+    yield node, depth
+    for child in node.get('Plans', ()):
+        yield from _walk(child, depth + 1)
+
+
+def _node_label(node):
+    label = node['Node Type']
+    if 'Relation Name' in node:
+        label += f' on {node["Relation Name"]}'
+    return label
+
+
+def _exclusive_time(node):
+    """Время узла без учета дочерних узлов, в мс."""
+    total = node.get('Actual Total Time', 0) * node.get('Actual Loops', 1)
+    children = sum(
+        child.get('Actual Total Time', 0) * child.get('Actual Loops', 1)
+        for child in node.get('Plans', ())
+    )
+    return max(total - children, 0)
+
+
+def summarize_plan(explained):
+    """
+    Находит "горячие" узлы плана.
+
+    Args:
+        explained: Элемент результата EXPLAIN FORMAT JSON (словарь с ключом 'Plan').
+
+    Returns:
+        Список словарей {'kind', 'node', 'detail'}; kind - один из 'seq_scan', 'hash_spill',
+        'sort_spill', 'misestimate', 'hot'.
+    """
+    findings = []
+    nodes = [node for node, _ in _walk(explained['Plan'])]
+
+    for node in nodes:
+        node_type = node['Node Type']
+        loops = node.get('Actual Loops', 1)
+        actual = node.get('Actual Rows', 0) * loops
+        estimated = node.get('Plan Rows', 0) * loops
+
+        if node_type == 'Seq Scan':
+            findings.append({
+                'kind': 'seq_scan', 'node': _node_label(node),
+                'detail': f'rows={actual}, removed by filter={node.get("Rows Removed by Filter", 0)}'
+            })
+        if node_type == 'Hash' and node.get('Hash Batches', 1) > 1:
+            findings.append({
+                'kind': 'hash_spill', 'node': _node_label(node),
+                'detail': f'batches={node["Hash Batches"]}, memory={node.get("Peak Memory Usage")} kB'
+            })
+        if node.get('Sort Space Type') == 'Disk':
+            findings.append({
+                'kind': 'sort_spill', 'node': _node_label(node),
+                'detail': f'method={node.get("Sort Method")}, disk={node.get("Sort Space Used")} kB'
+            })
+        if 'Actual Rows' in node and max(actual, estimated) >= MISESTIMATE_FACTOR * max(min(actual, estimated), 1):
+            findings.append({
+                'kind': 'misestimate', 'node': _node_label(node),
+                'detail': f'estimated={estimated}, actual={actual}'
+            })
+
+    for node in sorted(nodes, key=_exclusive_time, reverse=True)[:HOT_NODES]:
+        findings.append({
+            'kind': 'hot', 'node': _node_label(node),
+            'detail': f'self time={_exclusive_time(node):.3f} ms'
+        })
+    return findings
+
+
+def plan_shape(explained):
+    """Форма плана: список строк "отступ + тип узла + таблица" в порядке обхода."""
+    return ['  ' * depth + _node_label(node) for node, depth in _walk(explained['Plan'])]
+
+
+# --- Сравнение ---
+
+def diff_plans(old, new):
+    """
+    Сравнивает планы одной задачи из двух прогонов.
+
+    Args:
+        old, new: Списки планов задачи (как в архиве).
+
+    Returns:
+        Список строк с описанием изменений (пустой, если планы не изменились).
+    """
+    changes = []
+    if len(old) != len(new):
+        changes.append(f'число запросов: {len(old)} -> {len(new)}')
+
+    for index, (old_item, new_item) in enumerate(zip(old, new), start=1):
+        old_plan, new_plan = old_item['plan'], new_item['plan']
+        old_shape, new_shape = plan_shape(old_plan), plan_shape(new_plan)
+        if old_shape != new_shape:
+            changes.append(f'запрос {index}: изменилась форма плана')
+            changes.extend(f'    - {line}' for line in old_shape if line not in new_shape)
+            changes.extend(f'    + {line}' for line in new_shape if line not in old_shape)
+
+        old_time = old_plan.get('Execution Time', 0)
+        new_time = new_plan.get('Execution Time', 0)
+        if old_time and new_time and max(old_time, new_time) >= TIME_CHANGE_FACTOR * min(old_time, new_time):
+            trend = 'медленнее' if new_time > old_time else 'быстрее'
+            changes.append(f'запрос {index}: {old_time:.3f} ms -> {new_time:.3f} ms ({trend})')
+    return changes
+
+
+def diff_archives(old_dir, new_dir):
+    """Сравнивает два каталога архива и возвращает словарь {задача: список изменений}."""
+    old_archive, new_archive = load_archive(old_dir), load_archive(new_dir)
+    result = {}
+    for task in sorted(old_archive.keys() | new_archive.keys()):
+        if task not in old_archive:
+            result[task] = ['задача появилась']
+        elif task not in new_archive:
+            result[task] = ['задача отсутствует']
+        else:
+            changes = diff_plans(old_archive[task], new_archive[task])
+            if changes:
+                result[task] = changes
+    return result
+
+
+def print_summary(task_name, plans, file=None):
+    """Печатает сводку горячих узлов по планам задачи."""
+    rows = [
+        (index, finding['kind'], finding['node'], finding['detail'])
+        for index, item in enumerate(plans, start=1)
+        for finding in summarize_plan(item['plan'])
+    ]
+    print(f'{task_name}:', file=file)
+    print(tabulate(rows, ['query', 'kind', 'node', 'detail'], tablefmt='pretty'), file=file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m db.explain', description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+    summary = commands.add_parser('summary', help='сводка горячих узлов по каталогу архива')
+    summary.add_argument('directory')
+    diff = commands.add_parser('diff', help='сравнение планов двух каталогов архива')
+    diff.add_argument('old')
+    diff.add_argument('new')
+    args = parser.parse_args(argv)
+
+    if args.command == 'summary':
+        for task_name, plans in load_archive(args.directory).items():
+            print_summary(task_name, plans)
+        return 0
+
+    changes = diff_archives(args.old, args.new)
+    for task_name, lines in changes.items():
+        print(task_name)
+        for line in lines:
+            print(f'  {line}')
+    if not changes:
+        print('Планы не изменились')
+    return 1 if changes else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,351 @@
+"""
+Детерминированный генератор данных с масштабным коэффициентом (scale factor) в духе TPC.
+
+Генерирует ссылочно-целостные строки для всех трех заполняемых БД:
+  - компьютерная фирма: Product, PC, Laptop, Printer;
+  - фирма вторсырья: Income_o, Outcome_o, Income, Outcome;
+  - корабли: Classes, Ships, Battles, Outcomes.
+
+Объем таблиц растет линейно с коэффициентом SF (1, 10, 100, ...). При одинаковых SF и seed
+данные всегда одни и те же: у каждой таблицы свой генератор случайных чисел, а свойства,
+от которых зависят другие таблицы (например, тип модели в Product), вычисляются
+хеш-функцией от номера строки, поэтому ни одна таблица не держится в памяти целиком -
+строки по одной передаются в db.bulk_load.
+
+Запуск из корня проекта:
+
+    python -m db.generator --sf 10 --seed 42
+    python -m db.generator --sf 1 --domain ships
+"""
+import argparse
+import random
+from datetime import date, timedelta
+
+from db.bulk_load import bulk_load, clear_tables
+
+# Базовые объемы таблиц при SF=1
+PRODUCTS_PER_SF = 1_000
+PCS_PER_SF = 10_000
+LAPTOPS_PER_SF = 5_000
+PRINTERS_PER_SF = 3_000
+MAKERS_PER_SF = 20
+POINTS_PER_SF = 10
+CLASSES_PER_SF = 50
+SHIPS_PER_SF = 500
+BATTLES_PER_SF = 100
+
+# Диапазон дат операций фирмы вторсырья по умолчанию (не зависит от SF, растет число пунктов приема)
+RECYCLING_START = date(2001, 1, 1)
+RECYCLING_DAYS = 3 * 365
+
+FIRST_MODEL = 1000
+PRODUCT_TYPES = ('PC', 'PC', 'PC', 'PC', 'Laptop', 'Laptop', 'Laptop', 'Printer', 'Printer', 'Printer')
+# Типы первых моделей: каждый тип есть хотя бы у одной модели, иначе для PC, Laptop или Printer не из чего выбирать
+FIRST_PRODUCT_TYPES = ('PC', 'Laptop', 'Printer')
+# Наименьший SF, при котором моделей хватает на все типы
+MIN_SCALE_FACTOR = len(FIRST_PRODUCT_TYPES) / PRODUCTS_PER_SF
+COUNTRIES = ('USA', 'Gt.Britain', 'Japan', 'Germany', 'Italy', 'France', 'Russia')
+RESULTS = ('sunk', 'damaged', 'ok')
+
+_MASK64 = (1 << 64) - 1
+
+
+def _mix(seed, value):
+    """Хеш splitmix64: детерминированное псевдослучайное 64-битное число для пары (seed, value)."""
+    z = (seed * 0x9E3779B97F4A7C15 + value + 0x632BE59BD9B4E5F1) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+
+def _scaled(base, sf):
+    return max(1, int(base * sf))
+
+
+def _rng(seed, table):
+    """Отдельный генератор случайных чисел для каждой таблицы."""
+    return random.Random(f'{seed}:{table}')
+
+
+def maker_name(index):
+    """Имя производителя по номеру: A, B, ..., Z, AA, AB, ..."""
+    name = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(ord('A') + remainder) + name
+    return name
+
+
+class ScaleFactorGenerator:
+    """
+    Генератор строк всех таблиц для заданных масштабного коэффициента и seed.
+
+    Каждый метод `<таблица>_rows` возвращает генератор кортежей в порядке столбцов,
+    указанном в `COLUMNS`.
+    """
+
+    COLUMNS = {
+        'product': ('model', 'maker', 'type'),
+        'pc': ('model_id', 'speed', 'ram', 'hd', 'cd', 'price'),
+        'laptop': ('model_id', 'speed', 'ram', 'hd', 'price', 'screen'),
+        'printer': ('model_id', 'color', 'type', 'price'),
+        'income_o': ('point', 'date', 'inc'),
+        'outcome_o': ('point', 'date', 'out'),
+        'income': ('code', 'point', 'date', 'inc'),
+        'outcome': ('code', 'point', 'date', 'out'),
+        'classes': ('class_name', 'type', 'country', 'numGuns', 'bore', 'displacement'),
+        'ships': ('name', 'class_name', 'launched'),
+        'battles': ('name', 'date'),
+        'outcomes': ('ship', 'battle', 'result'),
+    }
+
+    def __init__(self, sf=1, seed=0, days=RECYCLING_DAYS):
+        if _scaled(PRODUCTS_PER_SF, sf) < len(FIRST_PRODUCT_TYPES):
+            raise ValueError(
+                f'Масштабный коэффициент {sf} слишком мал: нужно не меньше {MIN_SCALE_FACTOR:g}, '
+                f'чтобы в Product были модели всех типов ({", ".join(FIRST_PRODUCT_TYPES)})'
+            )
+        self.sf = sf
+        self.seed = seed
+        self.days = days
+        self.product_count = _scaled(PRODUCTS_PER_SF, sf)
+        self.maker_count = _scaled(MAKERS_PER_SF, sf)
+        self.point_count = _scaled(POINTS_PER_SF, sf)
+        self.class_count = _scaled(CLASSES_PER_SF, sf)
+        self.ship_count = _scaled(SHIPS_PER_SF, sf)
+        self.battle_count = _scaled(BATTLES_PER_SF, sf)
+
+    # --- Компьютерная фирма ---
+
+    def product_type(self, index):
+        """Тип модели с номером index (0..product_count-1), вычисляется без обращения к Product."""
+        if index < len(FIRST_PRODUCT_TYPES):
+            return FIRST_PRODUCT_TYPES[index]
+        return PRODUCT_TYPES[_mix(self.seed, index) % len(PRODUCT_TYPES)]
+
+    def _random_model(self, rng, product_type):
+        """
+        Случайная модель заданного типа (выборка с отклонением по product_type). Завершается всегда:
+        модели всех типов есть среди первых номеров (FIRST_PRODUCT_TYPES).
+        """
+        while True:
+            index = rng.randrange(self.product_count)
+            if self.product_type(index) == product_type:
+                return FIRST_MODEL + index
+
+    def product_rows(self):
+        for index in range(self.product_count):
+            maker = maker_name(_mix(self.seed + 1, index) % self.maker_count)
+            yield FIRST_MODEL + index, maker, self.product_type(index)
+
+    def pc_rows(self):
+        rng = _rng(self.seed, 'pc')
+        for _ in range(_scaled(PCS_PER_SF, self.sf)):
+            yield (
+                self._random_model(rng, 'PC'),
+                rng.choice((450, 500, 600, 750, 800, 900, 1000, 1200)),
+                rng.choice((32, 64, 128, 256)),
+                rng.choice((5.0, 8.0, 10.0, 14.0, 20.0, 40.0)),
+                rng.choice(('12x', '24x', '40x', '50x')),
+                float(rng.randrange(300, 1500, 10))
+            )
+
+    def laptop_rows(self):
+        rng = _rng(self.seed, 'laptop')
+        for _ in range(_scaled(LAPTOPS_PER_SF, self.sf)):
+            yield (
+                self._random_model(rng, 'Laptop'),
+                rng.choice((350, 450, 500, 600, 750, 900)),
+                rng.choice((32, 64, 128, 256)),
+                rng.choice((4.0, 8.0, 10.0, 12.0, 20.0)),
+                float(rng.randrange(500, 2500, 10)),
+                rng.choice((11, 12, 14, 15, 17))
+            )
+
+    def printer_rows(self):
+        rng = _rng(self.seed, 'printer')
+        for _ in range(_scaled(PRINTERS_PER_SF, self.sf)):
+            yield (
+                self._random_model(rng, 'Printer'),
+                rng.choice(('y', 'n')),
+                rng.choice(('Laser', 'Jet', 'Matrix')),
+                float(rng.randrange(100, 600, 10))
+            )
+
+    # --- Фирма вторсырья ---
+
+    def _daily_rows(self, table, probability, low, high):
+        """Не более одной операции на (пункт, дата) - для таблиц Income_o и Outcome_o."""
+        rng = _rng(self.seed, table)
+        for point in range(1, self.point_count + 1):
+            for day in range(self.days):
+                if rng.random() < probability:
+                    yield point, RECYCLING_START + timedelta(days=day), float(rng.randrange(low, high))
+
+    def _coded_rows(self, table, probability, low, high):
+        """Произвольное число операций на (пункт, дата) - для таблиц Income и Outcome."""
+        rng = _rng(self.seed, table)
+        code = 0
+        for point in range(1, self.point_count + 1):
+            for day in range(self.days):
+                while rng.random() < probability:
+                    code += 1
+                    yield code, point, RECYCLING_START + timedelta(days=day), float(rng.randrange(low, high))
+
+    def income_o_rows(self):
+        return self._daily_rows('income_o', 0.4, 1000, 20000)
+
+    def outcome_o_rows(self):
+        return self._daily_rows('outcome_o', 0.5, 500, 8000)
+
+    def income_rows(self):
+        return self._coded_rows('income', 0.4, 1000, 20000)
+
+    def outcome_rows(self):
+        return self._coded_rows('outcome', 0.5, 500, 8000)
+
+    # --- Корабли ---
+
+    def class_name(self, index):
+        return f'Class {index + 1}'
+
+    def ship_name(self, index):
+        return f'Ship {index + 1}'
+
+    def battle_name(self, index):
+        return f'Battle {index + 1}'
+
+    def classes_rows(self):
+        rng = _rng(self.seed, 'classes')
+        for index in range(self.class_count):
+            yield (
+                self.class_name(index),
+                rng.choice(('bb', 'bc')),
+                rng.choice(COUNTRIES),
+                rng.choice((6, 8, 9, 10, 12)),
+                rng.choice((14.0, 15.0, 16.0, 18.0)),
+                rng.randrange(25000, 70000, 1000)
+            )
+
+    def ships_rows(self):
+        rng = _rng(self.seed, 'ships')
+        for index in range(self.ship_count):
+            yield self.ship_name(index), self.class_name(rng.randrange(self.class_count)), rng.randrange(1910, 1946)
+
+    def battles_rows(self):
+        rng = _rng(self.seed, 'battles')
+        for index in range(self.battle_count):
+            yield self.battle_name(index), date(1939, 9, 1) + timedelta(days=rng.randrange(6 * 365))
+
+    def outcomes_rows(self):
+        """
+        Участники сражений: в основном корабли из Ships, а также головные корабли классов
+        и корабли, которых нет в Ships (как и в исходных данных sql-ex).
+        """
+        rng = _rng(self.seed, 'outcomes')
+        unknown_count = max(1, self.ship_count // 10)
+        # Номера участников: [0, ship_count) - Ships, далее - классы, далее - неизвестные корабли
+        candidates = self.ship_count + self.class_count + unknown_count
+        for index in range(self.battle_count):
+            battle = self.battle_name(index)
+            for candidate in rng.sample(range(candidates), min(candidates, rng.randint(5, 20))):
+                if candidate < self.ship_count:
+                    ship = self.ship_name(candidate)
+                elif candidate < self.ship_count + self.class_count:
+                    ship = self.class_name(candidate - self.ship_count)
+                else:
+                    ship = f'Unknown {candidate - self.ship_count - self.class_count + 1}'
+                yield ship, battle, rng.choice(RESULTS)
+
+
+def load_computer_firm(generator, bind=None):
+    from db.db_1_computer_firm.models import Product, PC, Laptop, Printer
+
+    clear_tables(PC, Laptop, Printer, Product, bind=bind)
+    columns = generator.COLUMNS
+    return {
+        'product': bulk_load(Product, generator.product_rows(), columns['product'], bind),
+        'pc': bulk_load(PC, generator.pc_rows(), columns['pc'], bind),
+        'laptop': bulk_load(Laptop, generator.laptop_rows(), columns['laptop'], bind),
+        'printer': bulk_load(Printer, generator.printer_rows(), columns['printer'], bind),
+    }
+
+
+def load_recycling_firm(generator, bind=None):
+    from db.db_2_recycling_firm.models import Income, Outcome, Income_o, Outcome_o
+
+    from db.db_2_recycling_firm.balances import maintain_balances
+
+    clear_tables(Income, Outcome, Income_o, Outcome_o, bind=bind)
+    columns = generator.COLUMNS
+    counts = {
+        'income_o': bulk_load(Income_o, generator.income_o_rows(), columns['income_o'], bind),
+        'outcome_o': bulk_load(Outcome_o, generator.outcome_o_rows(), columns['outcome_o'], bind),
+        'income': bulk_load(Income, generator.income_rows(), columns['income'], bind),
+        'outcome': bulk_load(Outcome, generator.outcome_rows(), columns['outcome'], bind),
+    }
+    maintain_balances(bind)
+    return counts
+
+
+def load_ships(generator, bind=None):
+    from db.db_3_ships.models import Classes, Ships, Battles, Outcomes
+
+    clear_tables(Outcomes, Battles, Ships, Classes, bind=bind)
+    columns = generator.COLUMNS
+    return {
+        'classes': bulk_load(Classes, generator.classes_rows(), columns['classes'], bind),
+        'ships': bulk_load(Ships, generator.ships_rows(), columns['ships'], bind),
+        'battles': bulk_load(Battles, generator.battles_rows(), columns['battles'], bind),
+        'outcomes': bulk_load(Outcomes, generator.outcomes_rows(), columns['outcomes'], bind),
+    }
+
+
+LOADERS = {
+    'computer_firm': load_computer_firm,
+    'recycling_firm': load_recycling_firm,
+    'ships': load_ships,
+}
+
+
+def load_scale_factor(sf=1, seed=0, domains=None, bind=None, days=None):
+    """
+    Заменяет данные выбранных БД сгенерированными для масштабного коэффициента sf.
+
+    Args:
+        sf: Масштабный коэффициент (1, 10, 100, ...; допускаются дробные значения).
+        seed (int): Зерно генератора; одинаковые sf и seed дают одинаковые данные.
+        domains: Предметные области для загрузки, по умолчанию - все три.
+        bind: Движок или соединение; по умолчанию - движок предметной области каждой таблицы.
+        days (int): Длина истории операций фирмы вторсырья в днях, по умолчанию RECYCLING_DAYS.
+
+    Returns:
+        Словарь {таблица: число загруженных строк}.
+    """
+    generator = ScaleFactorGenerator(sf, seed, days or RECYCLING_DAYS)
+    counts = {}
+    for domain in domains or LOADERS:
+        counts.update(LOADERS[domain](generator, bind))
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sf', type=float, default=1, help='масштабный коэффициент (1, 10, 100, ...)')
+    parser.add_argument('--seed', type=int, default=0, help='зерно генератора')
+    parser.add_argument('--domain', action='append', choices=list(LOADERS),
+                        help='загружаемая БД (можно указать несколько раз), по умолчанию - все')
+    parser.add_argument('--days', type=int, default=RECYCLING_DAYS,
+                        help=f'длина истории операций фирмы вторсырья в днях, по умолчанию {RECYCLING_DAYS}')
+    args = parser.parse_args()
+
+    sf = int(args.sf) if args.sf.is_integer() else args.sf
+    if sf < MIN_SCALE_FACTOR:
+        parser.error(f'масштабный коэффициент должен быть не меньше {MIN_SCALE_FACTOR:g}')
+    for table, count in load_scale_factor(sf, args.seed, args.domain, days=args.days).items():
+        print(f'{table}: {count} строк')
+
+
+if __name__ == '__main__':
+    main()
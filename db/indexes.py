@@ -0,0 +1,133 @@
+"""
+Вторичные индексы моделей.
+
+Индексы объявлены в __table_args__ моделей (db/db_*/models.py) и создаются вместе с таблицами
+через create_all. Для уже существующих таблиц create_all индексы не добавляет, поэтому
+их можно создать (или удалить) отдельно функциями create_indexes/drop_indexes.
+Советник по индексам для запросов задач - tasks/index_advisor.py.
+
+Запуск из корня проекта:
+
+    python -m db.indexes create --domain ships        # создать объявленные индексы
+    python -m db.indexes drop                         # удалить объявленные индексы
+    python -m db.indexes analyze                      # обновить статистику таблиц (ANALYZE)
+"""
+import argparse
+import importlib
+import importlib.util
+import sys
+
+from sqlalchemy import inspect
+
+from db.routing import DOMAINS, get_domain_engine
+
+
+def _model_domains():
+    """Предметные области, для которых есть модуль моделей SQLAlchemy."""
+    return [domain for domain, settings in DOMAINS.items() if importlib.util.find_spec(settings['models'])]
+
+
+def declared_indexes(domains=None):
+    """
+    Возвращает объявленные в моделях вторичные индексы.
+
+    Args:
+        domains: Предметные области, по умолчанию - все, для которых есть модели.
+
+    Returns:
+        Словарь {предметная область: список объектов Index}.
+    """
+    result = {}
+    for domain in domains or _model_domains():
+        module = importlib.import_module(DOMAINS[domain]['models'])
+        result[domain] = [
+            index
+            for table in module.Base.metadata.sorted_tables
+            for index in sorted(table.indexes, key=lambda index: index.name)
+        ]
+    return result
+
+
+def create_indexes(domains=None):
+    """Создает объявленные индексы, которых еще нет в БД. Возвращает имена созданных индексов."""
+    created = []
+    for domain, indexes in declared_indexes(domains).items():
+        engine = get_domain_engine(domain)
+        with engine.begin() as connection:
+            existing = _existing_indexes(connection, indexes)
+            for index in indexes:
+                if index.name not in existing:
+                    index.create(connection)
+                    created.append(index.name)
+    return created
+
+
+def drop_indexes(domains=None):
+    """Удаляет объявленные индексы, которые есть в БД. Возвращает имена удаленных индексов."""
+    dropped = []
+    for domain, indexes in declared_indexes(domains).items():
+        engine = get_domain_engine(domain)
+        with engine.begin() as connection:
+            existing = _existing_indexes(connection, indexes)
+            for index in indexes:
+                if index.name in existing:
+                    index.drop(connection)
+                    dropped.append(index.name)
+    return dropped
+
+
+def analyze_tables(domains=None):
+    """
+    Обновляет статистику планировщика (ANALYZE) по таблицам моделей, которые есть в БД,
+    например после массовой загрузки или создания индексов. Возвращает имена таблиц.
+    """
+    analyzed = []
+    for domain in domains or _model_domains():
+        module = importlib.import_module(DOMAINS[domain]['models'])
+        engine = get_domain_engine(domain)
+        with engine.begin() as connection:
+            inspector = inspect(connection)
+            quote = connection.dialect.identifier_preparer.quote
+            for table in module.Base.metadata.sorted_tables:
+                if inspector.has_table(table.name):
+                    connection.exec_driver_sql(f'ANALYZE {quote(table.name)}')
+                    analyzed.append(table.name)
+    return analyzed
+
+
+def _existing_indexes(connection, indexes):
+    inspector = inspect(connection)
+    names = set()
+    for table_name in {index.table.name for index in indexes}:
+        if inspector.has_table(table_name):
+            names.update(item['name'] for item in inspector.get_indexes(table_name))
+    return names
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m db.indexes', description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('create', help='создать объявленные в моделях индексы')
+    commands.add_parser('drop', help='удалить объявленные в моделях индексы')
+    commands.add_parser('analyze', help='обновить статистику планировщика по таблицам моделей')
+    for command in commands.choices.values():
+        command.add_argument('--domain', action='append', choices=_model_domains(),
+                             help='предметная область (можно указать несколько раз), по умолчанию - все')
+    args = parser.parse_args(argv)
+
+    if args.command == 'create':
+        names = create_indexes(args.domain)
+        print(f'Создано индексов: {len(names)}' + (f' ({", ".join(names)})' if names else ''))
+    elif args.command == 'drop':
+        names = drop_indexes(args.domain)
+        print(f'Удалено индексов: {len(names)}' + (f' ({", ".join(names)})' if names else ''))
+    else:
+        names = analyze_tables(args.domain)
+        print(f'Обновлена статистика таблиц: {len(names)}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
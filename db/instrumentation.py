@@ -0,0 +1,262 @@
+"""
+Инструментирование задач: сколько запросов выполняет задача и на что уходит время.
+
+Внутри блока `with track_task(name):` (его открывают run_task и конкурентный запуск задач)
+каждому запросу приписываются число запросов (statements), время выполнения в БД (db_time),
+число прочитанных строк (rows), число выдач соединения из пула (checkouts) и время ожидания
+соединения (pool_wait). Запросы SQLAlchemy учитываются обработчиками событий движка
+before_cursor_execute/after_cursor_execute, запросы exec_query - вызовами record_* из db/database.py,
+выдача соединения SQLAlchemy - публичным событием пула checkout. Время ожидания соединения
+сессии считается от выбора движка (RoutingSession.get_bind отмечает его mark_checkout_start)
+до выдачи соединения пулом; у соединений, взятых вне сессий (Engine.connect), учитывается
+только число выдач.
+
+Задача определяется контекстной переменной, поэтому задачи, выполняемые одновременно в разных
+потоках или корутинах, учитываются раздельно. Строки считаются по cursor.rowcount драйвера:
+строки, прочитанные серверным курсором (потоковое чтение), в rows не попадают.
+
+Пока инструментирование выключено (по умолчанию), обработчики событий не установлены,
+а track_task и record_* сводятся к проверке одной переменной.
+Сводку возвращают get_metrics (словарь), to_json и to_openmetrics (текстовый формат OpenMetrics).
+"""
+import contextlib
+import contextvars
+import json
+import threading
+import time
+from dataclasses import dataclass, asdict, fields
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+# Префикс имен метрик в формате OpenMetrics
+METRICS_PREFIX = 'sqlex_task'
+
+# Метрики задачи, выполняемой в текущем контексте (None - задача не отслеживается)
+_current = contextvars.ContextVar('instrumented_task', default=None)
+
+# Включено ли инструментирование и накопленные метрики: имя задачи -> TaskMetrics
+_enabled = False
+_metrics = {}
+_lock = threading.Lock()
+
+# Когда сессия текущего контекста начала получать соединение (см. mark_checkout_start)
+_checkout_started = contextvars.ContextVar('instrumented_checkout_started', default=None)
+
+# Ключ connection.info со стеком времени начала выполняемых запросов
+_STARTED = 'instrumentation_started'
+
+
+@dataclass
+class TaskMetrics:
+    """Счетчики задачи; время - в секундах."""
+    runs: int = 0
+    statements: int = 0
+    db_time: float = 0.0
+    rows: int = 0
+    checkouts: int = 0
+    pool_wait: float = 0.0
+
+    def add(self, other):
+        for field in fields(self):
+            setattr(self, field.name, getattr(self, field.name) + getattr(other, field.name))
+
+    def as_dict(self):
+        return asdict(self)
+
+
+# Описание метрик для OpenMetrics: поле -> (единица измерения, описание)
+_DESCRIPTIONS = {
+    'runs': ('', 'Number of task runs'),
+    'statements': ('', 'Statements executed by the task'),
+    'db_time': ('seconds', 'Time spent executing statements'),
+    'rows': ('', 'Rows returned or affected by the statements'),
+    'checkouts': ('', 'Connection checkouts from the pool'),
+    'pool_wait': ('seconds', 'Time spent waiting for a pooled connection'),
+}
+
+
+def is_enabled():
+    return _enabled
+
+
+@contextlib.contextmanager
+def track_task(name):
+    """
+    Приписывает запросы, выполняемые внутри блока, задаче `name` и после блока добавляет
+    ее метрики к накопленным. Если инструментирование выключено, ничего не делает.
+
+    Args:
+        name (str): Имя задачи, например 'ships.task_56'.
+
+    Yields:
+        TaskMetrics этого запуска или None.
+    """
+    if not _enabled:
+        yield None
+        return
+
+    metrics = TaskMetrics(runs=1)
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+        with _lock:
+            _metrics.setdefault(name, TaskMetrics()).add(metrics)
+
+
+def record_statement(started, rows):
+    """
+    Учитывает запрос, выполненный в обход SQLAlchemy (exec_query).
+
+    Args:
+        started (float): Время начала запроса по time.perf_counter().
+        rows (int): Число прочитанных строк.
+    """
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.statements += 1
+        metrics.db_time += time.perf_counter() - started
+        metrics.rows += rows
+
+
+def record_checkout(started):
+    """
+    Учитывает выдачу соединения из пула.
+
+    Args:
+        started (float): Время запроса соединения по time.perf_counter().
+    """
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.checkouts += 1
+        metrics.pool_wait += time.perf_counter() - started
+
+
+def mark_checkout_start():
+    """
+    Отмечает начало получения соединения сессией: следующая выдача соединения пулом
+    в этом контексте учитывает время от этой отметки как ожидание (pool_wait).
+    """
+    if _current.get() is not None:
+        _checkout_started.set(time.perf_counter())
+
+
+def _checkout(dbapi_connection, connection_record, connection_proxy):
+    if _current.get() is None:
+        return
+    started = _checkout_started.get()
+    _checkout_started.set(None)
+    record_checkout(started if started is not None else time.perf_counter())
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        # Запрос выполняется на уже полученном соединении: отметка mark_checkout_start больше не нужна
+        _checkout_started.set(None)
+        conn.info.setdefault(_STARTED, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get(_STARTED)
+    if started:
+        record_statement(started.pop(), max(cursor.rowcount, 0))
+
+
+def _handle_error(exception_context):
+    # Запрос с ошибкой тоже учитывается, иначе стек времени начала разойдется с запросами
+    connection = exception_context.connection
+    started = connection.info.get(_STARTED) if connection is not None else None
+    if started and exception_context.cursor is not None:
+        record_statement(started.pop(), 0)
+
+
+_LISTENERS = (
+    ('before_cursor_execute', _before_cursor_execute),
+    ('after_cursor_execute', _after_cursor_execute),
+    ('handle_error', _handle_error),
+)
+
+
+def enable_instrumentation():
+    """Включает учет запросов задач (повторный вызов ничего не меняет)."""
+    global _enabled
+    for name, listener in _LISTENERS:
+        if not event.contains(Engine, name, listener):
+            event.listen(Engine, name, listener)
+    if not event.contains(Pool, 'checkout', _checkout):
+        event.listen(Pool, 'checkout', _checkout)
+    _enabled = True
+
+
+def disable_instrumentation():
+    """Выключает учет запросов задач; накопленные метрики сохраняются."""
+    global _enabled
+    _enabled = False
+    for name, listener in _LISTENERS:
+        if event.contains(Engine, name, listener):
+            event.remove(Engine, name, listener)
+    if event.contains(Pool, 'checkout', _checkout):
+        event.remove(Pool, 'checkout', _checkout)
+
+
+def reset_metrics():
+    """Удаляет накопленные метрики."""
+    with _lock:
+        _metrics.clear()
+
+
+def add_metrics(name, values):
+    """
+    Добавляет к накопленным метрики задачи, собранные в другом процессе.
+
+    Args:
+        name (str): Имя задачи.
+        values (dict): Счетчики в виде TaskMetrics.as_dict().
+    """
+    with _lock:
+        _metrics.setdefault(name, TaskMetrics()).add(TaskMetrics(**values))
+
+
+def get_metrics():
+    """Возвращает накопленные метрики: {имя задачи: словарь счетчиков}, задачи по алфавиту."""
+    with _lock:
+        return {name: _metrics[name].as_dict() for name in sorted(_metrics)}
+
+
+def to_json(metrics=None):
+    """
+    Возвращает метрики в виде JSON.
+
+    Args:
+        metrics (dict): Метрики в формате get_metrics; по умолчанию - накопленные.
+    """
+    return json.dumps(get_metrics() if metrics is None else metrics, ensure_ascii=False, indent=2)
+
+
+def _escape_label(value):
+    return value.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def to_openmetrics(metrics=None):
+    """
+    Возвращает метрики в текстовом формате OpenMetrics: по счетчику на каждое поле TaskMetrics
+    с меткой task, например `sqlex_task_db_time_seconds_total{task="ships.task_56"} 0.0123`.
+
+    Args:
+        metrics (dict): Метрики в формате get_metrics; по умолчанию - накопленные.
+    """
+    metrics = get_metrics() if metrics is None else metrics
+    lines = []
+    for field, (unit, description) in _DESCRIPTIONS.items():
+        family = f'{METRICS_PREFIX}_{field}' + (f'_{unit}' if unit else '')
+        lines.append(f'# TYPE {family} counter')
+        if unit:
+            lines.append(f'# UNIT {family} {unit}')
+        lines.append(f'# HELP {family} {description}.')
+        for name, values in metrics.items():
+            lines.append(f'{family}_total{{task="{_escape_label(name)}"}} {values[field]}')
+    lines.append('# EOF')
+    return '\n'.join(lines) + '\n'
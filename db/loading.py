@@ -0,0 +1,133 @@
+"""
+Стратегии загрузки связей моделей и обнаружение ленивых загрузок (проблема N+1).
+
+Связи моделей (Product.pcs, Classes.ships, Battles.outcomes, ...) объявлены с ленивой загрузкой:
+отчет, который обходит их у каждой родительской строки, выполняет по запросу на строку.
+loader_option строит опцию запроса с нужной стратегией по ее названию:
+
+    'select' - selectinload: один дополнительный запрос `WHERE ... IN (...)` на связь;
+    'joined' - joinedload: связь загружается тем же запросом через LEFT OUTER JOIN;
+    'raise'  - raiseload: обращение к незагруженной связи вызывает исключение;
+    'lazy'   - lazyload: запрос при первом обращении к связи (поведение по умолчанию).
+
+Детектор ленивых загрузок считает их в каждой сессии по связям и, когда число ленивых загрузок
+одной связи превышает порог, предупреждает (LazyLoadWarning) или прерывает запрос (LazyLoadError).
+Он включается переменными DB_LAZY_LOAD_THRESHOLD/DB_LAZY_LOAD_ACTION или вызовом
+enable_lazy_load_detection; у включенного детектора порог и действие отдельной сессии можно
+переопределить в session.info (ключи THRESHOLD и ACTION).
+"""
+import warnings
+
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload, lazyload, raiseload, selectinload
+
+from db.config import DB_LAZY_LOAD_ACTION
+from db.routing import RoutingSession
+
+# Название стратегии -> функция, строящая опцию загрузки
+STRATEGIES = {
+    'select': selectinload,
+    'joined': joinedload,
+    'raise': raiseload,
+    'lazy': lazyload,
+}
+
+ACTIONS = ('warn', 'raise')
+
+# Ключи session.info: счетчики ленивых загрузок, порог и действие сессии
+_COUNTS = 'lazy_load_counts'
+THRESHOLD = 'lazy_load_threshold'
+ACTION = 'lazy_load_action'
+
+# Порог и действие по умолчанию для всех сессий (None - детектор выключен)
+_threshold = None
+_action = DB_LAZY_LOAD_ACTION
+
+
+class LazyLoadError(Exception):
+    """Число ленивых загрузок связи в сессии превысило порог."""
+
+
+class LazyLoadWarning(UserWarning):
+    """Число ленивых загрузок связи в сессии превысило порог."""
+
+
+def loader_option(attribute, strategy):
+    """
+    Возвращает опцию запроса, загружающую связь выбранной стратегией.
+
+    Args:
+        attribute: Атрибут связи, например Product.pcs.
+        strategy (str): Название стратегии из STRATEGIES.
+    """
+    try:
+        return STRATEGIES[strategy](attribute)
+    except KeyError:
+        raise ValueError(
+            f'Неизвестная стратегия загрузки {strategy!r}, доступны: {", ".join(STRATEGIES)}'
+        ) from None
+
+
+def relationship_name(attribute):
+    """Имя связи в виде 'Модель.связь', например 'Product.pcs'."""
+    return f'{attribute.class_.__name__}.{attribute.key}'
+
+
+def _do_orm_execute(orm_execute_state):
+    # lazy_loaded_from задан только у ленивой загрузки; selectinload и прочие стратегии его не задают
+    state = orm_execute_state.lazy_loaded_from
+    if state is None:
+        return
+
+    session = orm_execute_state.session
+    threshold = session.info.get(THRESHOLD, _threshold)
+    if threshold is None:
+        return
+
+    relationship = orm_execute_state.loader_strategy_path[-1]
+    name = f'{state.class_.__name__}.{relationship.key}'
+    counts = session.info.setdefault(_COUNTS, {})
+    counts[name] = counts.get(name, 0) + 1
+    if counts[name] != threshold + 1:
+        return
+
+    # Сообщаем один раз на связь, когда порог превышен впервые
+    message = (
+        f'Связь {name} загружена лениво больше {threshold} раз в одной сессии (N+1 запросов): '
+        f'загрузите ее стратегией select или joined'
+    )
+    if session.info.get(ACTION, _action) == 'raise':
+        raise LazyLoadError(message)
+    warnings.warn(message, LazyLoadWarning, stacklevel=2)
+
+
+def enable_lazy_load_detection(threshold, action=None):
+    """
+    Включает подсчет ленивых загрузок связей в сессиях db.database.
+
+    Args:
+        threshold (int): Сколько ленивых загрузок одной связи допустимо в сессии.
+        action (str): 'warn' - предупреждение LazyLoadWarning, 'raise' - исключение LazyLoadError;
+            по умолчанию DB_LAZY_LOAD_ACTION.
+    """
+    global _threshold, _action
+    action = action or DB_LAZY_LOAD_ACTION
+    if action not in ACTIONS:
+        raise ValueError(f'Неизвестное действие {action!r}, доступны: {", ".join(ACTIONS)}')
+    _threshold, _action = threshold, action
+    if not event.contains(RoutingSession, 'do_orm_execute', _do_orm_execute):
+        # Раньше кэша результатов: ленивая загрузка из кэша тоже считается
+        event.listen(RoutingSession, 'do_orm_execute', _do_orm_execute, insert=True)
+
+
+def disable_lazy_load_detection():
+    """Выключает подсчет ленивых загрузок."""
+    global _threshold
+    _threshold = None
+    if event.contains(RoutingSession, 'do_orm_execute', _do_orm_execute):
+        event.remove(RoutingSession, 'do_orm_execute', _do_orm_execute)
+
+
+def get_lazy_load_counts(session):
+    """Возвращает число ленивых загрузок в сессии по связям: {'Product.pcs': 12, ...}."""
+    return dict(session.info.get(_COUNTS, {}))
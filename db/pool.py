@@ -0,0 +1,226 @@
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+
+import psycopg2
+from psycopg2 import extensions
+
+
+class PoolTimeoutError(Exception):
+    """Свободное соединение не появилось в пуле за отведенное время."""
+
+
+@dataclass
+class PoolStats:
+    """Снимок статистики пула соединений."""
+    checkouts: int = 0
+    waits: int = 0
+    wait_time: float = 0.0
+    connections_created: int = 0
+    connections_closed: int = 0
+    health_check_failures: int = 0
+    size: int = 0
+    idle: int = 0
+
+    def as_dict(self):
+        return asdict(self)
+
+
+class ConnectionPool:
+    """
+    Потокобезопасный пул соединений psycopg2.
+
+    Пул держит не менее `min_size` и не более `max_size` открытых соединений.
+    Если все соединения заняты, запрашивающий поток ждет освобождения соединения
+    не дольше `timeout` секунд. Соединения сверх `min_size`, простаивающие дольше
+    `idle_timeout` секунд, закрываются. Перед выдачей долго простаивавшее соединение
+    проверяется запросом `SELECT 1`, если включен `health_check`.
+    """
+
+    def __init__(self, connect_kwargs, min_size=1, max_size=10, idle_timeout=300.0,
+                 timeout=30.0, health_check=True, health_check_interval=30.0):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f'Некорректные размеры пула: min_size={min_size}, max_size={max_size}')
+
+        self.connect_kwargs = connect_kwargs
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.health_check = health_check
+        self.health_check_interval = health_check_interval
+
+        # Свободные соединения в виде пар (соединение, время возврата в пул).
+        # Выдаем последнее возвращенное, чтобы редко используемые успевали закрыться по таймауту
+        self._idle = []
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = PoolStats()
+
+        for _ in range(min_size):
+            self._size += 1
+            self._idle.append((self._connect(), time.monotonic()))
+
+    def _connect(self):
+        connection = psycopg2.connect(**self.connect_kwargs)
+        with self._cond:
+            self._stats.connections_created += 1
+        return connection
+
+    def _close_connection(self, connection):
+        try:
+            connection.close()
+        finally:
+            self._stats.connections_closed += 1
+
+    def _is_alive(self, connection, idle_since):
+        """Проверяет, что соединение пригодно для выдачи."""
+        if connection.closed:
+            return False
+        if connection.get_transaction_status() == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if not self.health_check or time.monotonic() - idle_since < self.health_check_interval:
+            return True
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            connection.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def _reap_idle(self):
+        """Закрывает соединения, простаивающие дольше idle_timeout (вызывается под блокировкой)."""
+        now = time.monotonic()
+        # Самые старые соединения лежат в начале списка
+        while (self._idle and self._size > self.min_size
+               and now - self._idle[0][1] > self.idle_timeout):
+            connection, _ = self._idle.pop(0)
+            self._size -= 1
+            self._close_connection(connection)
+
+    def getconn(self):
+        """Выдает соединение из пула, при необходимости создавая новое или ожидая свободное."""
+        deadline = time.monotonic() + self.timeout
+
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise psycopg2.InterfaceError('Пул соединений закрыт')
+
+                self._reap_idle()
+                started_waiting = None
+                while not self._idle and self._size >= self.max_size:
+                    if started_waiting is None:
+                        started_waiting = time.monotonic()
+                        self._stats.waits += 1
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats.wait_time += time.monotonic() - started_waiting
+                        raise PoolTimeoutError(
+                            f'Нет свободных соединений в пуле (max_size={self.max_size}) '
+                            f'за {self.timeout} с'
+                        )
+                    self._cond.wait(remaining)
+                if started_waiting is not None:
+                    self._stats.wait_time += time.monotonic() - started_waiting
+
+                self._stats.checkouts += 1
+                if self._idle:
+                    connection, idle_since = self._idle.pop()
+                else:
+                    # Резервируем место под новое соединение, само подключение - вне блокировки
+                    self._size += 1
+                    connection, idle_since = None, None
+
+            if connection is None:
+                try:
+                    return self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+
+            if self._is_alive(connection, idle_since):
+                return connection
+
+            # Соединение испорчено: закрываем его и пробуем снова
+            with self._cond:
+                self._stats.health_check_failures += 1
+                self._stats.checkouts -= 1
+                self._size -= 1
+                self._close_connection(connection)
+
+    def putconn(self, connection, discard=False):
+        """
+        Возвращает соединение в пул.
+
+        Args:
+            connection: Соединение, ранее полученное через getconn.
+            discard (bool): Закрыть соединение вместо возврата в пул.
+        """
+        if not connection.closed and not discard:
+            try:
+                # Завершаем открытую psycopg2 транзакцию, чтобы соединение вернулось в исходное состояние
+                if connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+            except psycopg2.Error:
+                discard = True
+
+        with self._cond:
+            if self._closed or connection.closed or discard:
+                self._size -= 1
+                if not connection.closed:
+                    self._close_connection(connection)
+            else:
+                self._idle.append((connection, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Контекстный менеджер: выдает соединение и возвращает его в пул после блока `with`."""
+        connection = self.getconn()
+        discard = False
+        try:
+            yield connection
+        except psycopg2.InterfaceError:
+            discard = True
+            raise
+        finally:
+            self.putconn(connection, discard=discard)
+
+    def resize(self, max_size):
+        """
+        Меняет наибольшее число соединений пула. При уменьшении лишние соединения закрываются
+        по мере простоя (см. idle_timeout), а новые не создаются, пока их не станет меньше max_size.
+
+        Args:
+            max_size (int): Новое наибольшее число соединений (не меньше min_size).
+        """
+        if max_size < max(self.min_size, 1):
+            raise ValueError(f'Некорректный размер пула: min_size={self.min_size}, max_size={max_size}')
+        with self._cond:
+            self.max_size = max_size
+            self._cond.notify_all()
+
+    def stats(self):
+        """Возвращает снимок статистики пула (PoolStats)."""
+        with self._cond:
+            snapshot = PoolStats(**asdict(self._stats))
+            snapshot.size = self._size
+            snapshot.idle = len(self._idle)
+        return snapshot
+
+    def close(self):
+        """Закрывает все свободные соединения; занятые закроются при возврате в пул."""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                connection, _ = self._idle.pop()
+                self._size -= 1
+                self._close_connection(connection)
+            self._cond.notify_all()
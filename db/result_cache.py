@@ -0,0 +1,263 @@
+"""
+Кэш результатов запросов SQLAlchemy с инвалидацией по версиям таблиц.
+
+Кэш включается явно (enable_result_cache или переменная DB_RESULT_CACHE) и работает
+в пределах процесса. Ключ записи - скомпилированный SQL вместе со значениями параметров,
+поэтому вызовы задачи с разными параметрами (например, task_1(max_price=600)) кэшируются отдельно.
+
+Для каждой таблицы хранится номер версии. Запись кэша помнит версии таблиц своего запроса
+и считается устаревшей, если хотя бы одна из них изменилась. Версия таблицы увеличивается
+при любом INSERT/UPDATE/DELETE через SQLAlchemy (сессии ORM, bulk_load, clear_tables),
+при загрузке через COPY и повторно при фиксации или откате транзакции, в которой была запись.
+Запросы сессии, транзакция которой уже меняла их таблицы, выполняются мимо кэша: их результат
+содержит незафиксированные изменения и не должен достаться другим сессиям.
+"""
+import threading
+from collections import Counter, OrderedDict
+
+from sqlalchemy import Select, Table, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import loading
+from sqlalchemy.sql.util import find_tables
+
+from db.config import DB_RESULT_CACHE_SIZE
+from db.routing import RoutingSession
+
+# Версии таблиц: имя таблицы -> номер версии
+_table_versions = Counter()
+_versions_lock = threading.Lock()
+
+# Таблицы, которые СУБД меняет сама (например, триггерами) при изменении исходной таблицы:
+# имя исходной таблицы -> имена зависимых таблиц
+_dependent_tables = {}
+
+# Ключ connection.info, под которым копятся таблицы, измененные в текущей транзакции
+_DIRTY_TABLES = 'result_cache_dirty_tables'
+
+_cache = None
+
+
+class ResultCache:
+    """
+    Потокобезопасный LRU-кэш замороженных результатов (FrozenResult) ограниченного размера.
+
+    Args:
+        max_size (int): Максимальное число записей; при переполнении вытесняется
+            запись, к которой дольше всего не обращались.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Скомпилированный SQL по ключу кэша компиляции, чтобы не компилировать запрос на каждом вызове
+        self.statement_cache = {}
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Возвращает актуальный результат по ключу или None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                frozen, versions = entry
+                if all(_table_versions[table] == version for table, version in versions):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return frozen
+                del self._entries[key]
+                self.stale += 1
+            self.misses += 1
+            return None
+
+    def put(self, key, frozen, versions):
+        """
+        Сохраняет результат.
+
+        Args:
+            key: Ключ записи.
+            frozen: FrozenResult запроса.
+            versions: Версии таблиц запроса на момент его выполнения - пары (таблица, версия).
+        """
+        with self._lock:
+            self._entries[key] = (frozen, versions)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.statement_cache.clear()
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / requests if requests else 0.0,
+            }
+
+
+def _table_names(statement):
+    return sorted({table.name for table in find_tables(statement, include_crud=True) if isinstance(table, Table)})
+
+
+def _current_versions(tables):
+    with _versions_lock:
+        return tuple((table, _table_versions[table]) for table in tables)
+
+
+def add_dependent_tables(table, dependents):
+    """
+    Сообщает кэшу, что при изменении таблицы меняются и другие таблицы (например, триггерами),
+    чтобы записи, прочитанные из них, тоже становились устаревшими.
+
+    Args:
+        table (str): Имя исходной таблицы.
+        dependents: Имена зависимых таблиц.
+    """
+    _dependent_tables.setdefault(table, set()).update(dependents)
+
+
+def invalidate_tables(tables, connection=None):
+    """
+    Делает устаревшими записи кэша, прочитанные из указанных таблиц и зависимых от них
+    (см. add_dependent_tables).
+
+    Args:
+        tables: Имена таблиц.
+        connection: Соединение SQLAlchemy, в транзакции которого изменены таблицы. Версии
+            этих таблиц увеличатся еще раз при фиксации или откате транзакции, чтобы не остались
+            результаты, прочитанные другими сессиями до фиксации.
+    """
+    tables = set(tables)
+    tables.update(dependent for table in list(tables) for dependent in _dependent_tables.get(table, ()))
+    with _versions_lock:
+        for table in tables:
+            _table_versions[table] += 1
+    if connection is not None:
+        connection.info.setdefault(_DIRTY_TABLES, set()).update(tables)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is None or context.compiled is None:
+        return
+    if context.isinsert or context.isupdate or context.isdelete:
+        invalidate_tables(_table_names(context.compiled.statement), conn)
+
+
+def _end_transaction(conn):
+    tables = conn.info.pop(_DIRTY_TABLES, None)
+    if tables:
+        invalidate_tables(tables)
+
+
+def _sees_own_writes(session, bind_arguments, tables):
+    """
+    Видит ли запрос незафиксированные изменения своей сессии: у сессии есть несброшенные объекты
+    или ее транзакция уже меняла таблицы запроса. Такой результат нельзя ни брать из кэша
+    (он не учитывает эти изменения), ни класть в кэш (другие сессии увидели бы данные,
+    которые еще могут быть откачены).
+    """
+    if session.new or session.dirty or session.deleted:
+        return True
+    if not session.in_transaction():
+        return False
+    written = session.connection(bind_arguments=bind_arguments).info.get(_DIRTY_TABLES)
+    return bool(written) and not written.isdisjoint(tables)
+
+
+def _do_orm_execute(orm_execute_state):
+    cache = _cache
+    if cache is None or not orm_execute_state.is_select:
+        return None
+
+    options = orm_execute_state.execution_options
+    # Потоковое чтение (stream, yield_per) не кэшируем: результат может не поместиться в память
+    if not options.get('result_cache', True) or options.get('yield_per') or options.get('stream_results'):
+        return None
+
+    statement = orm_execute_state.statement
+    cache_key = statement._generate_cache_key()
+    if cache_key is None:
+        return None
+
+    session = orm_execute_state.session
+    tables = _table_names(statement)
+    if _sees_own_writes(session, orm_execute_state.bind_arguments, tables):
+        return None
+
+    bind = session.get_bind(**orm_execute_state.bind_arguments)
+    key = (bind.url, cache_key.to_offline_string(
+        cache.statement_cache, statement, orm_execute_state.parameters or {}
+    ))
+
+    frozen = cache.get(key)
+    if frozen is None:
+        # Версии запоминаются до выполнения запроса: если таблицу изменят во время
+        # его выполнения, запись сразу окажется устаревшей
+        versions = _current_versions(tables)
+        frozen = orm_execute_state.invoke_statement().freeze()
+        cache.put(key, frozen, versions)
+
+    # Объекты ORM из кэша присоединяем к текущей сессии; составные запросы (union и т.п.)
+    # возвращают только столбцы, поэтому их результат отдается как есть
+    if isinstance(statement, Select):
+        return loading.merge_frozen_result(orm_execute_state.session, statement, frozen, load=False)()
+    return frozen()
+
+
+def enable_result_cache(max_size=None):
+    """
+    Включает кэш результатов для запросов на чтение, выполняемых через сессии db.database.
+
+    Отдельный запрос можно исключить из кэширования опцией
+    `statement.execution_options(result_cache=False)`.
+
+    Args:
+        max_size (int): Максимальное число записей, по умолчанию DB_RESULT_CACHE_SIZE.
+    """
+    global _cache
+    _cache = ResultCache(max_size or DB_RESULT_CACHE_SIZE)
+    if not event.contains(RoutingSession, 'do_orm_execute', _do_orm_execute):
+        event.listen(RoutingSession, 'do_orm_execute', _do_orm_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'commit', _end_transaction)
+        event.listen(Engine, 'rollback', _end_transaction)
+
+
+def disable_result_cache():
+    """Выключает кэш результатов и освобождает его записи."""
+    global _cache
+    _cache = None
+    if event.contains(RoutingSession, 'do_orm_execute', _do_orm_execute):
+        event.remove(RoutingSession, 'do_orm_execute', _do_orm_execute)
+        event.remove(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.remove(Engine, 'commit', _end_transaction)
+        event.remove(Engine, 'rollback', _end_transaction)
+
+
+def clear_result_cache():
+    """Удаляет все записи кэша результатов."""
+    if _cache is not None:
+        _cache.clear()
+
+
+def get_result_cache_stats():
+    """
+    Возвращает статистику кэша результатов: число записей (size), попаданий (hits),
+    промахов (misses), устаревших записей (stale), вытесненных записей (evictions)
+    и долю попаданий (hit_rate). Если кэш выключен, возвращается пустой словарь.
+    """
+    if _cache is None:
+        return {}
+    return _cache.stats()
@@ -0,0 +1,231 @@
+"""
+Маршрутизация запросов по БД предметных областей.
+
+Модели каждой области (компьютерная фирма, фирма вторсырья, корабли, ...) объявлены
+на собственной `Base`, поэтому по таблице запроса можно определить область и выполнить
+запрос на движке этой области. У каждого движка свой пул соединений: тяжелый отчет
+по фирме вторсырья не занимает соединения, нужные запросам по кораблям.
+Если для области не задана отдельная БД (DB_NAME_*), используется общая DB_NAME.
+"""
+import os
+import sys
+import threading
+
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.util import find_tables
+
+from db.config import (
+    DB_PASSWORD,
+    DB_USER,
+    DB_HOST,
+    DB_PORT,
+    DB_NAME,
+    DB_NAME_COMPUTER_FIRM,
+    DB_NAME_RECYCLING_FIRM,
+    DB_NAME_SHIPS,
+    DB_NAME_AIRPORT,
+    DB_NAME_PAINTING,
+    DB_HOST_COMPUTER_FIRM,
+    DB_PORT_COMPUTER_FIRM,
+    DB_HOST_RECYCLING_FIRM,
+    DB_PORT_RECYCLING_FIRM,
+    DB_HOST_SHIPS,
+    DB_PORT_SHIPS,
+    DB_HOST_AIRPORT,
+    DB_PORT_AIRPORT,
+    DB_HOST_PAINTING,
+    DB_PORT_PAINTING,
+    DB_ENGINE_POOL_SIZE,
+    DB_ENGINE_MAX_OVERFLOW,
+    DB_QUERY_CACHE_SIZE,
+)
+from db.instrumentation import mark_checkout_start
+
+# Предметная область -> модуль с ее моделями и параметры подключения к ее БД
+DOMAINS = {
+    'computer_firm': dict(
+        models='db.db_1_computer_firm.models',
+        dbname=DB_NAME_COMPUTER_FIRM, host=DB_HOST_COMPUTER_FIRM, port=DB_PORT_COMPUTER_FIRM
+    ),
+    'recycling_firm': dict(
+        models='db.db_2_recycling_firm.models',
+        dbname=DB_NAME_RECYCLING_FIRM, host=DB_HOST_RECYCLING_FIRM, port=DB_PORT_RECYCLING_FIRM
+    ),
+    'ships': dict(
+        models='db.db_3_ships.models',
+        dbname=DB_NAME_SHIPS, host=DB_HOST_SHIPS, port=DB_PORT_SHIPS
+    ),
+    'airport': dict(
+        models='db.db_4_airport.models',
+        dbname=DB_NAME_AIRPORT, host=DB_HOST_AIRPORT, port=DB_PORT_AIRPORT
+    ),
+    'painting': dict(
+        models='db.db_5_painting.models',
+        dbname=DB_NAME_PAINTING, host=DB_HOST_PAINTING, port=DB_PORT_PAINTING
+    ),
+}
+
+# Движки создаются лениво; ключ None - движок общей БД DB_NAME
+_engines = {}
+_lock = threading.Lock()
+# Размер пула движков; увеличивается set_engine_pool_size под число потоков
+_pool_size = DB_ENGINE_POOL_SIZE
+
+
+def _check_domain(domain):
+    if domain is not None and domain not in DOMAINS:
+        raise ValueError(f'Неизвестная предметная область {domain!r}, доступны: {", ".join(DOMAINS)}')
+
+
+def get_connect_params(domain=None):
+    """
+    Возвращает параметры подключения psycopg2 (dbname, user, password, host, port) для области.
+    Незаданные для области параметры берутся из общих DB_NAME, DB_HOST, DB_PORT.
+    """
+    _check_domain(domain)
+    settings = DOMAINS.get(domain, {})
+    return dict(
+        dbname=settings.get('dbname') or DB_NAME,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        host=settings.get('host') or DB_HOST,
+        port=settings.get('port') or DB_PORT
+    )
+
+
+def _create_engine(domain):
+    params = get_connect_params(domain)
+    return create_engine(
+        f'postgresql://{params["user"]}:{params["password"]}@'
+        f'{params["host"]}:{params["port"]}/{params["dbname"]}',
+        pool_size=_pool_size,
+        max_overflow=DB_ENGINE_MAX_OVERFLOW,
+        query_cache_size=DB_QUERY_CACHE_SIZE
+    )
+
+
+def get_domain_engine(domain=None):
+    """Возвращает движок SQLAlchemy предметной области (с собственным пулом), создавая его при первом обращении"""
+    engine = _engines.get(domain)
+    if engine is None:
+        _check_domain(domain)
+        with _lock:
+            engine = _engines.get(domain)
+            if engine is None:
+                engine = _create_engine(domain)
+                _engines[domain] = engine
+    return engine
+
+
+def set_engine_pool_size(size):
+    """
+    Увеличивает пулы движков до `size` соединений (но не меньше DB_ENGINE_POOL_SIZE), например
+    под число потоков, одновременно выполняющих задачи. Уже созданные движки с меньшим пулом
+    заменяются новыми; их свободные соединения закрываются, занятые - при возврате.
+
+    Args:
+        size (int): Требуемый размер пула.
+    """
+    global _pool_size
+    with _lock:
+        _pool_size = max(size, DB_ENGINE_POOL_SIZE)
+        for domain, engine in list(_engines.items()):
+            if engine.pool.size() < _pool_size:
+                _engines[domain] = _create_engine(domain)
+                engine.dispose()
+
+
+def domain_of_table(table):
+    """
+    Определяет предметную область таблицы по метаданным `Base`, на которой она объявлена.
+    Рассматриваются только уже импортированные модули моделей, поэтому функция
+    не загружает модели других областей. Возвращает None, если область не найдена.
+    """
+    metadata = getattr(table, 'metadata', None)
+    if metadata is None:
+        return None
+
+    for domain, settings in DOMAINS.items():
+        module = sys.modules.get(settings['models'])
+        base = getattr(module, 'Base', None)
+        if base is not None and base.metadata is metadata:
+            return domain
+    return None
+
+
+class RoutingSession(Session):
+    """
+    Сессия, выбирающая движок по предметной области модели или таблиц запроса.
+
+    Запросы, область которых определить не удалось (например, `text()`), выполняются
+    на движке общей БД DB_NAME.
+    """
+
+    def execute(self, statement, params=None, *, bind_arguments=None, **kw):
+        # Для составных запросов (union, except_, intersect) SQLAlchemy не передает в get_bind
+        # ни модель, ни сам запрос, поэтому передаем запрос явно
+        bind_arguments = {'clause': statement, **(bind_arguments or {})}
+        return super().execute(statement, params, bind_arguments=bind_arguments, **kw)
+
+    def scalars(self, statement, params=None, *, bind_arguments=None, **kw):
+        bind_arguments = {'clause': statement, **(bind_arguments or {})}
+        return super().scalars(statement, params, bind_arguments=bind_arguments, **kw)
+
+    def scalar(self, statement, params=None, *, bind_arguments=None, **kw):
+        bind_arguments = {'clause': statement, **(bind_arguments or {})}
+        return super().scalar(statement, params, bind_arguments=bind_arguments, **kw)
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        # Сессия выбирает движок непосредственно перед получением соединения из его пула:
+        # от этой отметки инструментирование считает время ожидания соединения
+        mark_checkout_start()
+        # Явно привязанная сессия (например, в тестах) маршрутизацию не использует
+        if self.bind is not None:
+            return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+        domain = None
+        if mapper is not None:
+            domain = domain_of_table(inspect(mapper).local_table)
+        if domain is None and clause is not None:
+            for table in find_tables(clause, include_crud=True):
+                domain = domain_of_table(table)
+                if domain is not None:
+                    break
+        return self.domain_engine(domain)
+
+    def domain_engine(self, domain):
+        """Движок, на котором выполняются запросы области (переопределяется асинхронной сессией)."""
+        return get_domain_engine(domain)
+
+
+def dispose_engines():
+    """Закрывает пулы всех созданных движков (например, перед завершением процесса)."""
+    with _lock:
+        for engine in _engines.values():
+            engine.dispose()
+
+
+def reset_engines():
+    """
+    Забывает созданные движки, не закрывая их соединения.
+
+    Нужна в дочернем процессе после fork: унаследованные соединения принадлежат
+    родителю, поэтому ребенок должен создать собственные движки при первом обращении.
+    """
+    with _lock:
+        for engine in _engines.values():
+            engine.dispose(close=False)
+        _engines.clear()
+
+
+def _after_fork_in_child():
+    global _lock
+    # В момент fork блокировку мог держать другой поток родителя: в ребенке она никогда не освободится
+    _lock = threading.Lock()
+    reset_engines()
+
+
+# Дочерний процесс (пул рабочих процессов, multiprocessing и т.п.) сразу после fork забывает
+# движки родителя, в том числе и те, что получены через `from db.database import engine`
+os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,137 @@
+"""
+Командная строка для запуска задач.
+
+Примеры (из корня проекта):
+
+    python -m tasks --list
+    python -m tasks --all --workers 4
+    python -m tasks --all --threads 8 --quiet
+    python -m tasks --task 1 --task 2 --variant postgre
+    python -m tasks --domain ships --quiet
+    python -m tasks --task 30 --format stream --max-rows 20
+    python -m tasks --task 56 --explain --scale sf10
+    python -m tasks --all --quiet --metrics openmetrics --metrics-file metrics.txt
+"""
+import argparse
+import sys
+
+from tabulate import tabulate
+
+from db.explain import print_summary, save_plans
+from db.instrumentation import to_json, to_openmetrics
+from tasks.durations import estimate_makespan, load_durations, longest_first, record_durations
+from tasks.output import RENDERERS, get_renderer
+from tasks.registry import TASK_CLASSES, ORM, POSTGRE, select_tasks
+from tasks.runner import run_tasks
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m tasks', description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--task', type=int, action='append', dest='numbers', metavar='N',
+                        help='номер задачи (можно указать несколько раз)')
+    parser.add_argument('--domain', action='append', dest='domains', choices=list(TASK_CLASSES),
+                        help='предметная область (можно указать несколько раз)')
+    parser.add_argument('--variant', action='append', dest='variants', choices=[ORM, POSTGRE],
+                        help='вариант решения: SQLAlchemy (orm) или сырой SQL (postgre)')
+    parser.add_argument('--all', action='store_true', help='запустить все зарегистрированные задачи')
+    parser.add_argument('--workers', type=int, default=1, help='число рабочих процессов')
+    parser.add_argument('--threads', type=int, default=1,
+                        help='число потоков, выполняющих задачи одновременно (вместо рабочих процессов)')
+    parser.add_argument('--quiet', action='store_true', help='не печатать результаты задач, только сводку')
+    parser.add_argument('--format', choices=list(RENDERERS), default=None,
+                        help='формат вывода результатов, по умолчанию TASK_OUTPUT_FORMAT')
+    parser.add_argument('--max-rows', type=int, default=None,
+                        help='сколько строк результата выводить, по умолчанию TASK_OUTPUT_MAX_ROWS')
+    parser.add_argument('--list', action='store_true', help='показать зарегистрированные задачи и выйти')
+    parser.add_argument('--explain', action='store_true',
+                        help='сохранить планы EXPLAIN ANALYZE запросов задач в архив и вывести сводку')
+    parser.add_argument('--scale', default=None,
+                        help='метка набора данных для архива планов (например, sf10)')
+    parser.add_argument('--metrics', choices=['json', 'openmetrics'], default=None,
+                        help='посчитать запросы, время в БД, строки и ожидание пула по задачам и вывести их')
+    parser.add_argument('--metrics-file', default=None,
+                        help='записать метрики в файл вместо вывода на экран')
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if not (args.all or args.list or args.numbers or args.domains):
+        parser.error('укажите задачи: --task, --domain или --all')
+
+    specs = select_tasks(args.numbers, args.domains, args.variants)
+    if args.list:
+        print(tabulate([(spec.number, spec.variant, spec.name) for spec in specs],
+                       ['N', 'variant', 'task'], tablefmt='pretty'))
+        return 0
+    if not specs:
+        parser.error('под заданные фильтры не подходит ни одна задача')
+    if args.workers > 1 and args.threads > 1:
+        parser.error('--workers и --threads нельзя указывать вместе')
+
+    # Длительности прошлых запусков: по ним пул получает сначала самые долгие задачи
+    durations = load_durations()
+
+    renderer_options = {} if args.max_rows is None else {'max_rows': args.max_rows}
+    results, wall_time = run_tasks(
+        specs, args.workers, get_renderer(args.format, **renderer_options), explain=args.explain,
+        instrument=args.metrics is not None, threads=args.threads, durations=durations
+    )
+    if not args.explain:
+        # С --explain каждый SELECT выполняется еще раз под EXPLAIN ANALYZE: такие времена не записываем
+        record_durations(results)
+
+    for result in results:
+        if not args.quiet and result.output:
+            print(result.output, end='')
+        if result.error:
+            print(f'{result.spec.name} завершилась ошибкой:\n{result.error}', file=sys.stderr)
+
+    if args.explain:
+        for result in results:
+            if result.plans:
+                path = save_plans(result.spec.name, result.plans, args.scale)
+                print_summary(result.spec.name, result.plans)
+                print(f'Планы сохранены в {path}')
+
+    print(tabulate(
+        [(result.spec.name, f'{result.seconds:.3f}', result.rows, 'ok' if result.ok else 'error')
+         for result in results],
+        ['task', 'seconds', 'rows', 'status'],
+        tablefmt='pretty'
+    ))
+    print(f'Задач: {len(results)}, общее время: {wall_time:.3f} с, '
+          f'сумма времени задач: {sum(result.seconds for result in results):.3f} с')
+    pool_size = max(args.workers, args.threads)
+    if pool_size > 1 and durations:
+        print(f'Оценка общего времени по записанным длительностям: '
+              f'{estimate_makespan(longest_first(specs, durations), durations, pool_size):.3f} с '
+              f'(в исходном порядке {estimate_makespan(specs, durations, pool_size):.3f} с)')
+
+    if args.metrics:
+        exported = to_json() if args.metrics == 'json' else to_openmetrics()
+        if args.metrics_file:
+            with open(args.metrics_file, 'w', encoding='utf-8') as file:
+                file.write(exported)
+            print(f'Метрики сохранены в {args.metrics_file}')
+        else:
+            print(exported.rstrip('\n'))
+
+    # При запуске в рабочих процессах статистика кэша остается в них, поэтому выводим ее
+    # только для задач, выполненных в текущем процессе
+    if args.workers <= 1:
+        from db.database import get_statement_cache_stats
+
+        stats = get_statement_cache_stats()
+        print(f'Кэш компиляции SQLAlchemy: попаданий {stats["hits"]}, промахов {stats["misses"]}, '
+              f'доля попаданий {stats["hit_rate"]:.0%}')
+
+    return 0 if all(result.ok for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
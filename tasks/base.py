@@ -0,0 +1,276 @@
+import asyncio
+import functools
+import time
+
+from sqlalchemy import bindparam, select, tuple_
+
+from db.config import DB_FETCH_BATCH_SIZE, DB_ASYNC_CONCURRENCY
+from db.database import get_scoped_session, has_scoped_session, remove_scoped_session
+from db.instrumentation import track_task
+from db.loading import loader_option, relationship_name
+from tasks.output import get_renderer
+
+
+def cached_statement(builder):
+    """
+    Декоратор для методов `stmt_N` классов задач: запрос строится при первом вызове,
+    а дальше возвращается уже готовый объект.
+
+    Запросы SQLAlchemy неизменяемы, поэтому один объект безопасно выполнять из разных сессий
+    и потоков. Изменяемые условия задачи (пороги цен, производитель и т.п.) задаются через
+    `bindparam` и передаются при выполнении, поэтому всем вызовам подходит одна
+    скомпилированная форма запроса из кэша компиляции движка.
+
+    Args:
+        builder: Функция без аргументов, строящая запрос.
+    """
+    return staticmethod(functools.cache(builder))
+
+
+@functools.cache
+def _page_statements(table):
+    """
+    Запросы страниц таблицы при постраничном просмотре по ключу: первая страница и страница
+    после ключа (:after_<столбец> для каждого столбца первичного ключа). Строки - кортежи столбцов
+    таблицы в порядке первичного ключа, размер страницы - :page_size.
+    """
+    key = list(table.primary_key.columns)
+    first = select(*table.columns).order_by(*key).limit(bindparam('page_size'))
+    after = tuple_(*(bindparam(f'after_{column.key}') for column in key))
+    return first, first.where(tuple_(*key) > after)
+
+
+class SessionCreater:
+    """
+    Базовый класс для создания сессий SQLAlchemy.
+
+    Этот класс позволяет управлять сессиями SQLAlchemy, обеспечивая их создание и закрытие
+    в контексте оператора `with`. Он предоставляет удобный способ взаимодействия с базой данных,
+    а также автоматически закрывает сессию после завершения блока `with`.
+
+    Если в конструктор передана готовая сессия, класс использует ее и не закрывает
+    при выходе из блока `with` - сессией управляет тот, кто ее создал.
+
+    Иначе используется сессия текущего потока (db.database.ScopedSession), поэтому задачи можно
+    выполнять из пула потоков: у каждого потока своя сессия. Вложенный блок `with` в том же потоке
+    работает в сессии внешнего блока, а закрывает сессию блок, который ее создал.
+
+    Результаты задач выводятся рендерером `output` (см. tasks/output.py): готовым объектом
+    или названием формата ('pretty', 'stream', 'csv', 'jsonl'); по умолчанию - TASK_OUTPUT_FORMAT.
+
+    Связи моделей, которые обходят отчеты класса, загружаются стратегиями из LOADER_STRATEGIES
+    (см. db/loading.py); аргумент `loaders` переопределяет их, например {'Product.pcs': 'joined'}.
+    """
+
+    # Стратегии загрузки связей по умолчанию: 'Модель.связь' -> 'select' | 'joined' | 'raise' | 'lazy'
+    LOADER_STRATEGIES = {}
+
+    def __init__(self, session=None, output=None, loaders=None):
+        self.session = session
+        self.loaders = {**self.LOADER_STRATEGIES, **(loaders or {})}
+        self._owns_session = session is None
+        self.output = get_renderer(output)
+        # Число строк в результате последней выполненной задачи
+        self.last_row_count = 0
+
+    def __enter__(self):
+        """Открывает сессию SQLAlchemy текущего потока внутри контекстного блока `with`."""
+        if self._owns_session:
+            self._removes_session = not has_scoped_session()
+            self.session = get_scoped_session()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Закрывает сессию SQLAlchemy при выходе из контекстного блока `with`.
+
+        Args:
+            exc_type (type): Тип исключения, если такое произошло внутри блока `with`.
+            exc_value (Exception): Исключение, если такое произошло внутри блока `with`.
+            traceback (traceback): Трейс исключения, если такое произошло внутри блока `with`.
+        """
+        if self._owns_session and self._removes_session:
+            remove_scoped_session()
+
+    def _show(self, title, rows, headers):
+        """
+        Выводит результат задачи рендерером `output` и запоминает число строк в `last_row_count`.
+
+        Args:
+            title (str): Заголовок, например "Task #1 (SQL-Alchemy):".
+            rows: Строки результата (Result SQLAlchemy, список кортежей и т.п.).
+            headers (list): Заголовки столбцов.
+        """
+        self.last_row_count = self.output.render(title, rows, headers)
+
+    def loader_options(self, *attributes):
+        """
+        Возвращает опции запроса, загружающие связи стратегиями экземпляра (связи без стратегии
+        загружаются лениво).
+
+        Args:
+            attributes: Атрибуты связей, например Product.pcs.
+        """
+        return [
+            loader_option(attribute, self.loaders.get(relationship_name(attribute), 'lazy'))
+            for attribute in attributes
+        ]
+
+    def table_page(self, model, after=None, page_size=None):
+        """
+        Возвращает страницу таблицы модели: строки, следующие за ключом `after` в порядке первичного
+        ключа, и ключ последней строки страницы (None, если страница последняя).
+
+        Страница читается по индексу первичного ключа (WHERE (ключ) > :after ORDER BY ключ LIMIT n),
+        поэтому время чтения страницы не зависит от ее номера, в отличие от OFFSET. Столбцы берутся
+        из метаданных модели (`__table__`), без обращения к каталогу БД.
+
+        Args:
+            model: Модель (PC, Ships, ...) или таблица.
+            after (tuple): Значения первичного ключа последней строки предыдущей страницы;
+                по умолчанию - первая страница.
+            page_size (int): Число строк страницы, по умолчанию DB_FETCH_BATCH_SIZE.
+        """
+        table = getattr(model, '__table__', model)
+        page_size = page_size or DB_FETCH_BATCH_SIZE
+        first, following = _page_statements(table)
+        params = {'page_size': page_size}
+        if after is not None:
+            params.update(
+                (f'after_{column.key}', value) for column, value in zip(table.primary_key.columns, after)
+            )
+        rows = self.session.execute(first if after is None else following, params).all()
+        if len(rows) < page_size:
+            return rows, None
+        positions = [table.columns.keys().index(column.key) for column in table.primary_key.columns]
+        return rows, tuple(rows[-1][position] for position in positions)
+
+    def table_pages(self, model, page_size=None):
+        """
+        Итератор по страницам таблицы модели (см. table_page): в памяти хранится только текущая страница.
+
+        Args:
+            model: Модель (PC, Ships, ...) или таблица.
+            page_size (int): Число строк страницы, по умолчанию DB_FETCH_BATCH_SIZE.
+        """
+        after = None
+        while True:
+            rows, after = self.table_page(model, after, page_size)
+            if rows:
+                yield rows
+            if after is None:
+                break
+
+    def show_table(self, model, page_size=None, title=None):
+        """
+        Выводит всю таблицу модели рендерером `output`, читая ее постранично (см. table_page).
+        С форматами 'stream', 'csv' и 'jsonl' потребление памяти не зависит от размера таблицы.
+
+        Args:
+            model: Модель (PC, Ships, ...) или таблица.
+            page_size (int): Число строк страницы, по умолчанию DB_FETCH_BATCH_SIZE.
+            title (str): Заголовок, по умолчанию "<таблица> table:".
+        """
+        table = getattr(model, '__table__', model)
+        rows = (row for page in self.table_pages(table, page_size) for row in page)
+        self._show(title or f"{table.name} table:", rows, [column.name for column in table.columns])
+
+    def stream(self, statement, batch_size=None):
+        """
+        Выполняет запрос в потоковом режиме и возвращает итератор по строкам результата.
+
+        Строки читаются с сервера пачками по `batch_size` (yield_per + серверный курсор),
+        поэтому потребление памяти не зависит от размера результата.
+
+        Args:
+            statement: Запрос SQLAlchemy (select, union и т.д.).
+            batch_size (int): Размер пачки, по умолчанию DB_FETCH_BATCH_SIZE.
+        """
+        result = self.session.execute(
+            statement.execution_options(yield_per=batch_size or DB_FETCH_BATCH_SIZE)
+        )
+        try:
+            yield from result
+        finally:
+            result.close()
+
+
+class AsyncSessionCreater:
+    """
+    Асинхронный вариант SessionCreater для использования в `async with`.
+
+    Методы классов задач синхронные, поэтому они выполняются на синхронной "проекции"
+    асинхронной сессии через `AsyncSession.run_sync`: пока одна задача ждет ответа БД,
+    цикл событий выполняет остальные.
+    """
+
+    async def __aenter__(self):
+        """Создает и возвращает новую асинхронную сессию SQLAlchemy внутри блока `async with`."""
+        # Асинхронный движок и драйвер asyncpg загружаем только при первом использовании
+        from db.async_database import get_async_session
+
+        self.session = get_async_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """Закрывает асинхронную сессию при выходе из блока `async with`."""
+        await self.session.close()
+
+    async def run(self, task_class, task_name, *args, **kwargs):
+        """
+        Выполняет метод `task_name` класса задач `task_class` и возвращает его результат.
+
+        Варианты `task_N_postgre` работают через блокирующий psycopg2 (exec_query),
+        поэтому они выполняются в отдельном потоке.
+        """
+        if task_name.endswith('_postgre'):
+            return await asyncio.to_thread(
+                _call_task, None, task_class, task_name, args, kwargs
+            )
+        return await self.session.run_sync(
+            _call_task, task_class, task_name, args, kwargs
+        )
+
+
+def _call_task(session, task_class, task_name, args, kwargs):
+    """Создает экземпляр класса задач поверх переданной сессии и вызывает метод задачи."""
+    # Имя задачи как в реестре: модуль класса задач совпадает с предметной областью
+    with track_task(f'{task_class.__module__.rsplit(".", 1)[-1]}.{task_name}'):
+        return getattr(task_class(session=session), task_name)(*args, **kwargs)
+
+
+async def run_tasks_async(calls, concurrency=None):
+    """
+    Выполняет задачи конкурентно, не более `concurrency` одновременно.
+
+    Args:
+        calls: Последовательность пар (класс задач, имя метода),
+            например [(ShipsTasks, 'task_56'), (ComputerFirmTasks, 'task_24')].
+        concurrency (int): Предел одновременно выполняемых задач, по умолчанию DB_ASYNC_CONCURRENCY.
+
+    Returns:
+        Список пар (имя задачи, время выполнения в секундах) в порядке `calls`.
+        Если задача завершилась ошибкой, вместо времени возвращается исключение.
+    """
+    semaphore = asyncio.Semaphore(concurrency or DB_ASYNC_CONCURRENCY)
+
+    async def run_one(task_class, task_name):
+        async with semaphore:
+            started = time.perf_counter()
+            async with AsyncSessionCreater() as creater:
+                await creater.run(task_class, task_name)
+            return time.perf_counter() - started
+
+    results = await asyncio.gather(
+        *(run_one(task_class, task_name) for task_class, task_name in calls),
+        return_exceptions=True
+    )
+    return [
+        (f'{task_class.__name__}.{task_name}', result)
+        for (task_class, task_name), result in zip(calls, results)
+    ]
+
+
+def run_tasks_concurrently(calls, concurrency=None):
+    """Синхронная обертка над run_tasks_async для запуска из обычного кода."""
+    return asyncio.run(run_tasks_async(list(calls), concurrency))
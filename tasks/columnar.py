@@ -0,0 +1,653 @@
+"""
+Векторный движок задач компьютерной фирмы без обращения к БД.
+
+Таблицы Product, PC, Laptop и Printer один раз читаются из БД пачками (yield_per) и хранятся
+в памяти по столбцам в массивах NumPy; строковые столбцы (maker, type, cd, color) кодируются
+словарем: в массиве хранятся целые коды, а сами строки - один раз в словаре столбца.
+Соединение таблиц устройств с Product по номеру модели вычисляется при загрузке (индекс строки
+Product для каждой строки устройства), поэтому задачи сводятся к векторным фильтрам,
+группировкам (np.unique, np.bincount) и выборкам по индексам и выполняются за микросекунды
+на учебных данных и за доли секунды на миллионах строк.
+
+Движок повторяет запросы ComputerFirmTasks (см. SUPPORTED); метод verify сравнивает его
+результаты с результатами запросов stmt_N в БД как мультимножества строк.
+
+Нужен NumPy (необязательная зависимость: pip install numpy).
+
+Запуск из корня проекта:
+
+    python -m tasks.columnar                       # все поддерживаемые задачи
+    python -m tasks.columnar --task 1 --task 20    # выбранные задачи
+    python -m tasks.columnar --verify              # сравнить результаты с запросами в БД
+"""
+import argparse
+import sys
+import time
+from collections import Counter
+
+from sqlalchemy import Enum, Integer, String, select
+from tabulate import tabulate
+
+from db.config import DB_FETCH_BATCH_SIZE
+from db.database import get_session
+from db.db_1_computer_firm.models import Laptop, PC, Printer, Product
+from tasks.output import get_renderer
+
+try:
+    import numpy as np
+except ImportError:  # NumPy нужен только этому модулю
+    np = None
+
+# Таблица -> (модель, загружаемые столбцы)
+TABLES = {
+    'product': (Product, ('model', 'maker', 'type')),
+    'pc': (PC, ('code', 'model_id', 'speed', 'ram', 'hd', 'cd', 'price')),
+    'laptop': (Laptop, ('code', 'model_id', 'speed', 'ram', 'hd', 'price', 'screen')),
+    'printer': (Printer, ('code', 'model_id', 'color', 'type', 'price')),
+}
+
+# Порядок типов продукции в task_65
+TYPE_ORDER = {'PC': 1, 'Laptop': 2}
+
+
+class DictionaryColumn:
+    """
+    Строковый столбец, закодированный словарем.
+
+    Attributes:
+        codes: Массив int32 с кодами значений.
+        dictionary: Массив значений (dtype=object); значение строки i - dictionary[codes[i]].
+    """
+
+    def __init__(self, codes, dictionary):
+        self.codes = codes
+        self.dictionary = dictionary
+        self._index = {value: code for code, value in enumerate(dictionary.tolist())}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def code(self, value):
+        """Код значения или -1, если значения нет в столбце (тогда сравнение с ним всегда ложно)."""
+        return self._index.get(value, -1)
+
+    def decode(self, codes):
+        return self.dictionary[codes]
+
+    def sort_keys(self, codes):
+        """Ключи, упорядочивающие коды по значениям строк (для ORDER BY по строковому столбцу)."""
+        ranks = np.empty(len(self.dictionary), dtype=np.int64)
+        ranks[np.argsort(self.dictionary.astype(str), kind='stable')] = np.arange(len(self.dictionary))
+        return ranks[codes]
+
+
+class _DictionaryEncoder:
+    """Накапливает коды строкового столбца по пачкам строк."""
+
+    def __init__(self):
+        self._index = {}
+        self._chunks = []
+
+    def append(self, values):
+        index = self._index
+        self._chunks.append(np.fromiter(
+            (index.setdefault(value, len(index)) for value in values), dtype=np.int32, count=len(values)
+        ))
+
+    def finish(self):
+        codes = np.concatenate(self._chunks) if self._chunks else np.empty(0, dtype=np.int32)
+        dictionary = np.empty(len(self._index), dtype=object)
+        dictionary[:] = list(self._index)
+        return DictionaryColumn(codes, dictionary)
+
+
+class _NumericEncoder:
+    """
+    Накапливает числовой столбец. NULL хранится как NaN, поэтому сравнения с ним ложны,
+    как и в SQL; целочисленный столбец без NULL приводится к int64.
+    """
+
+    def __init__(self, integer):
+        self.integer = integer
+        self._chunks = []
+
+    def append(self, values):
+        self._chunks.append(np.array([np.nan if value is None else value for value in values], dtype=np.float64))
+
+    def finish(self):
+        values = np.concatenate(self._chunks) if self._chunks else np.empty(0, dtype=np.float64)
+        if self.integer and not np.isnan(values).any():
+            values = values.astype(np.int64)
+        return values
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError('Векторному движку нужен NumPy: pip install numpy')
+
+
+def _rows(*columns):
+    """Собирает строки результата из столбцов; NaN превращается в None (NULL)."""
+    lists = [np.asarray(column).tolist() for column in columns]
+    return [
+        tuple(None if isinstance(value, float) and value != value else value for value in row)
+        for row in zip(*lists)
+    ]
+
+
+def _distinct(*columns):
+    """Уникальные сочетания значений столбцов (коды строк и числа) - аналог SELECT DISTINCT."""
+    if not len(columns[0]):
+        return columns
+    if len(columns) == 1:
+        return (np.unique(columns[0]),)
+    unique = np.unique(np.column_stack([column.astype(np.float64) for column in columns]), axis=0)
+    return tuple(unique[:, i].astype(column.dtype) for i, column in enumerate(columns))
+
+
+def _group(keys):
+    """Возвращает уникальные значения ключа группировки и номер группы каждой строки."""
+    unique, inverse = np.unique(keys, return_inverse=True)
+    return unique, inverse.reshape(-1)
+
+
+def _group_mean(inverse, groups, values):
+    """AVG по группам без учета NULL; для групп без значений - NaN."""
+    valid = ~np.isnan(values)
+    counts = np.bincount(inverse[valid], minlength=groups)
+    sums = np.bincount(inverse[valid], weights=values[valid], minlength=groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / counts
+
+
+def _group_max(inverse, groups, values):
+    """MAX по группам без учета NULL."""
+    result = np.full(groups, -np.inf)
+    np.fmax.at(result, inverse, values.astype(np.float64))
+    result[result == -np.inf] = np.nan
+    return result
+
+
+def _mean(values):
+    values = values[~np.isnan(values)] if values.dtype.kind == 'f' else values
+    return float(values.mean()) if len(values) else None
+
+
+def _round_half_up(values, places):
+    """Округление как у numeric в PostgreSQL (половина - от нуля), а не банковское, как у np.round."""
+    scale = 10 ** places
+    return np.sign(values) * np.floor(np.abs(values) * scale + 0.5) / scale
+
+
+class ColumnarComputerFirm:
+    """
+    Данные компьютерной фирмы в памяти и векторные реализации задач ComputerFirmTasks.
+
+    Args:
+        tables: Словарь {таблица: {столбец: массив или DictionaryColumn}} (см. load).
+    """
+
+    # Задачи, которые умеет выполнять движок
+    SUPPORTED = (
+        1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 15, 17, 18, 19, 20, 21, 22, 23, 24, 25, 26, 27, 28,
+        58, 65, 82, 89, 90,
+    )
+
+    def __init__(self, tables):
+        _require_numpy()
+        self.tables = tables
+        self.product = tables['product']
+        self.pc = tables['pc']
+        self.laptop = tables['laptop']
+        self.printer = tables['printer']
+
+        # Соединение с Product по номеру модели: индекс строки Product для каждой строки устройства (-1 - нет пары)
+        models = self.product['model']
+        order = np.argsort(models, kind='stable')
+        sorted_models = models[order]
+        self.product_row = {}
+        for name in ('pc', 'laptop', 'printer'):
+            model_ids = tables[name]['model_id']
+            if len(sorted_models):
+                positions = np.clip(np.searchsorted(sorted_models, model_ids), 0, len(sorted_models) - 1)
+                self.product_row[name] = np.where(sorted_models[positions] == model_ids, order[positions], -1)
+            else:
+                self.product_row[name] = np.full(len(model_ids), -1)
+
+    @classmethod
+    def load(cls, session=None, batch_size=None):
+        """
+        Загружает таблицы компьютерной фирмы из БД.
+
+        Строки читаются пачками по batch_size и сразу раскладываются по столбцам, поэтому
+        кроме итоговых массивов в памяти держится только одна пачка строк.
+
+        Args:
+            session: Сессия SQLAlchemy; по умолчанию создается и закрывается новая.
+            batch_size (int): Размер пачки, по умолчанию DB_FETCH_BATCH_SIZE.
+        """
+        _require_numpy()
+        owns_session = session is None
+        session = session or get_session()
+        try:
+            tables = {
+                name: cls._load_table(session, model, columns, batch_size or DB_FETCH_BATCH_SIZE)
+                for name, (model, columns) in TABLES.items()
+            }
+        finally:
+            if owns_session:
+                session.close()
+        return cls(tables)
+
+    @staticmethod
+    def _load_table(session, model, columns, batch_size):
+        attributes = [getattr(model, column) for column in columns]
+        encoders = []
+        for attribute in attributes:
+            column_type = attribute.property.columns[0].type
+            if isinstance(column_type, (String, Enum)):
+                encoders.append(_DictionaryEncoder())
+            else:
+                encoders.append(_NumericEncoder(isinstance(column_type, Integer)))
+
+        result = session.execute(select(*attributes).execution_options(yield_per=batch_size))
+        try:
+            for rows in result.partitions():
+                for encoder, values in zip(encoders, zip(*rows)):
+                    encoder.append(values)
+        finally:
+            result.close()
+        return {column: encoder.finish() for column, encoder in zip(columns, encoders)}
+
+    def row_counts(self):
+        return {name: len(next(iter(columns.values()))) for name, columns in self.tables.items()}
+
+    # --- Вспомогательные выборки ---
+
+    def _makers(self, table):
+        """Коды производителей для строк таблицы устройств и маска строк, у которых есть пара в Product."""
+        rows = self.product_row[table]
+        joined = rows >= 0
+        return self.product['maker'].codes[np.where(joined, rows, 0)], joined
+
+    def _product_types(self, table):
+        rows = self.product_row[table]
+        return self.product['type'].codes[np.where(rows >= 0, rows, 0)]
+
+    def _decode_makers(self, codes, ordered=False):
+        maker = self.product['maker']
+        if ordered:
+            codes = codes[np.argsort(maker.sort_keys(codes), kind='stable')]
+        return _rows(maker.decode(codes))
+
+    def _makers_of_type(self, type_name):
+        product = self.product
+        return np.unique(product['maker'].codes[product['type'].codes == product['type'].code(type_name)])
+
+    # --- Задачи ---
+
+    def query(self, number, **params):
+        """
+        Выполняет задачу.
+
+        Args:
+            number (int): Номер задачи из SUPPORTED.
+            params: Параметры задачи, как у ComputerFirmTasks.task_N (например, max_price для task_1).
+
+        Returns:
+            Пара (заголовки столбцов, список строк-кортежей).
+        """
+        if number not in self.SUPPORTED:
+            raise ValueError(f'Задача {number} не поддерживается векторным движком')
+        return getattr(self, f'query_{number}')(**params)
+
+    def query_1(self, max_price=500.0):
+        pc = self.pc
+        mask = pc['price'] < max_price
+        return ['model', 'speed', 'hd'], _rows(pc['model_id'][mask], pc['speed'][mask], pc['hd'][mask])
+
+    def query_2(self):
+        return ['maker'], self._decode_makers(self._makers_of_type('Printer'))
+
+    def query_3(self, min_price=1000):
+        laptop = self.laptop
+        rows = np.flatnonzero(laptop['price'] > min_price)
+        rows = rows[np.argsort(laptop['model_id'][rows], kind='stable')]
+        return ['model', 'ram', 'screen'], _rows(laptop['model_id'][rows], laptop['ram'][rows], laptop['screen'][rows])
+
+    def query_4(self):
+        printer = self.printer
+        mask = printer['color'].codes == printer['color'].code('y')
+        return ['code', 'model_id', 'color', 'type', 'price'], _rows(
+            printer['code'][mask], printer['model_id'][mask],
+            printer['color'].decode(printer['color'].codes[mask]),
+            printer['type'].decode(printer['type'].codes[mask]),
+            printer['price'][mask]
+        )
+
+    def query_5(self, max_price=600):
+        pc = self.pc
+        cd = pc['cd']
+        mask = np.isin(cd.codes, [cd.code('12x'), cd.code('24x')]) & (pc['price'] < max_price)
+        return ['model', 'speed', 'hd'], _rows(pc['model_id'][mask], pc['speed'][mask], pc['hd'][mask])
+
+    def query_6(self, min_hd=10):
+        makers, joined = self._makers('laptop')
+        mask = joined & (self.laptop['hd'] >= min_hd)
+        makers, speeds = _distinct(makers[mask], self.laptop['speed'][mask])
+        return ['maker', 'speed'], _rows(self.product['maker'].decode(makers), speeds)
+
+    def query_7(self, maker='B'):
+        code = self.product['maker'].code(maker)
+        models, prices = [], []
+        for table in ('pc', 'laptop', 'printer'):
+            makers, joined = self._makers(table)
+            mask = joined & (makers == code)
+            models.append(self.tables[table]['model_id'][mask].astype(np.float64))
+            prices.append(self.tables[table]['price'][mask])
+        models, prices = _distinct(np.concatenate(models), np.concatenate(prices))
+        return ['model', 'price'], _rows(models.astype(np.int64), prices)
+
+    def query_8(self):
+        makers = np.setdiff1d(self._makers_of_type('PC'), self._makers_of_type('Laptop'))
+        return ['maker'], self._decode_makers(makers)
+
+    def query_9(self, min_speed=450):
+        makers, joined = self._makers('pc')
+        makers = np.unique(makers[joined & (self.pc['speed'] >= min_speed)])
+        return ['maker'], self._decode_makers(makers, ordered=True)
+
+    def query_10(self):
+        printer = self.printer
+        if not len(printer['price']):
+            return ['model', 'price'], []
+        mask = printer['price'] == np.nanmax(printer['price'])
+        return ['model', 'price'], _rows(printer['model_id'][mask], printer['price'][mask])
+
+    def query_11(self):
+        return ['avg_speed'], [(_mean(self.pc['speed']),)]
+
+    def query_12(self, min_price=1000):
+        laptop = self.laptop
+        return ['avg_speed'], [(_mean(laptop['speed'][laptop['price'] > min_price]),)]
+
+    def query_13(self, maker='A'):
+        makers, joined = self._makers('pc')
+        mask = joined & (makers == self.product['maker'].code(maker))
+        return ['avg_speed'], [(_mean(self.pc['speed'][mask]),)]
+
+    def query_15(self):
+        hd = self.pc['hd']
+        values, counts = np.unique(hd[~np.isnan(hd)], return_counts=True)
+        return ['hd'], _rows(values[counts >= 2])
+
+    def query_17(self):
+        pc_speed = self.pc['speed'].astype(np.float64)
+        # ALL по пустому подзапросу истинно, а при NULL в подзапросе ни одно сравнение не истинно
+        if np.isnan(pc_speed).any():
+            return ['type', 'model', 'speed'], []
+        laptop = self.laptop
+        mask = self.product_row['laptop'] >= 0
+        if len(pc_speed):
+            mask &= laptop['speed'] < pc_speed.min()
+        types, models, speeds = _distinct(
+            self._product_types('laptop')[mask], laptop['model_id'][mask], laptop['speed'][mask]
+        )
+        return ['type', 'model', 'speed'], _rows(self.product['type'].decode(types), models, speeds)
+
+    def query_18(self):
+        printer = self.printer
+        color = printer['color'].codes == printer['color'].code('y')
+        if not color.any():
+            return ['maker', 'price'], []
+        makers, joined = self._makers('printer')
+        mask = joined & color & (printer['price'] == np.nanmin(printer['price'][color]))
+        makers, prices = _distinct(makers[mask], printer['price'][mask])
+        return ['maker', 'price'], _rows(self.product['maker'].decode(makers), prices)
+
+    def query_19(self):
+        makers, joined = self._makers('laptop')
+        mask = joined & (self._product_types('laptop') == self.product['type'].code('Laptop'))
+        groups, inverse = _group(makers[mask])
+        screens = _group_mean(inverse, len(groups), self.laptop['screen'][mask])
+        return ['maker', 'avg_screen'], _rows(self.product['maker'].decode(groups), screens)
+
+    def query_20(self, min_models=3):
+        product = self.product
+        mask = product['type'].codes == product['type'].code('PC')
+        makers, counts = np.unique(product['maker'].codes[mask], return_counts=True)
+        keep = counts >= min_models
+        return ['maker', 'model_count'], _rows(product['maker'].decode(makers[keep]), counts[keep])
+
+    def query_21(self):
+        makers, joined = self._makers('pc')
+        mask = joined & (self._product_types('pc') == self.product['type'].code('PC'))
+        groups, inverse = _group(makers[mask])
+        prices = _group_max(inverse, len(groups), self.pc['price'][mask])
+        return ['maker', 'pc_max_price'], _rows(self.product['maker'].decode(groups), prices)
+
+    def query_22(self, min_speed=600):
+        pc = self.pc
+        mask = pc['speed'] > min_speed
+        groups, inverse = _group(pc['speed'][mask])
+        prices = _group_mean(inverse, len(groups), pc['price'][mask])
+        return ['speed', 'pc_avg_price'], _rows(groups, prices)
+
+    def query_23(self, min_speed=750):
+        pc_makers, pc_joined = self._makers('pc')
+        laptop_makers, laptop_joined = self._makers('laptop')
+        makers = np.intersect1d(
+            pc_makers[pc_joined & (self.pc['speed'] >= min_speed)],
+            laptop_makers[laptop_joined & (self.laptop['speed'] >= min_speed)]
+        )
+        return ['maker'], self._decode_makers(makers)
+
+    def query_24(self):
+        models, prices = [], []
+        for table in ('pc', 'laptop', 'printer'):
+            price = self.tables[table]['price']
+            if len(price) and not np.isnan(price).all():
+                mask = price == np.nanmax(price)
+                models.append(self.tables[table]['model_id'][mask].astype(np.float64))
+                prices.append(price[mask])
+        if not models:
+            return ['model'], []
+        models, prices = np.concatenate(models), np.concatenate(prices)
+        return ['model'], _rows(np.unique(models[prices == prices.max()]).astype(np.int64))
+
+    def query_25(self):
+        pc = self.pc
+        ram = pc['ram'].astype(np.float64)
+        if not len(ram) or np.isnan(ram).all():
+            return ['maker'], []
+        min_ram = ram == np.nanmin(ram)
+        speed = pc['speed'].astype(np.float64)
+        if np.isnan(speed[min_ram]).all():
+            return ['maker'], []
+        makers, joined = self._makers('pc')
+        mask = joined & min_ram & (speed == np.nanmax(speed[min_ram]))
+        makers = np.intersect1d(self._makers_of_type('Printer'), makers[mask])
+        return ['maker'], self._decode_makers(makers)
+
+    def query_26(self, maker='A'):
+        code = self.product['maker'].code(maker)
+        prices = []
+        for table in ('pc', 'laptop'):
+            makers, joined = self._makers(table)
+            prices.append(self.tables[table]['price'][joined & (makers == code)])
+        return ['AVG_price'], [(_mean(np.concatenate(prices)),)]
+
+    def query_27(self):
+        makers, joined = self._makers('pc')
+        mask = joined & np.isin(makers, self._makers_of_type('Printer'))
+        groups, inverse = _group(makers[mask])
+        hds = _group_mean(inverse, len(groups), self.pc['hd'][mask])
+        return ['maker', 'AVG_hd'], _rows(self.product['maker'].decode(groups), hds)
+
+    def query_28(self):
+        _, counts = np.unique(self.product['maker'].codes, return_counts=True)
+        return ['Qty'], [(int((counts == 1).sum()),)]
+
+    def query_58(self):
+        product = self.product
+        makers = np.unique(product['maker'].codes)
+        types = np.unique(product['type'].codes)
+        # Матрица "производитель x тип" с числом моделей строится одним проходом по Product
+        maker_index = np.searchsorted(makers, product['maker'].codes)
+        type_index = np.searchsorted(types, product['type'].codes)
+        counts = np.bincount(maker_index * len(types) + type_index, minlength=len(makers) * len(types))
+        counts = counts.reshape(len(makers), len(types))
+        percents = _round_half_up(counts * 100.0 / counts.sum(axis=1, keepdims=True), 2)
+        return ['maker', 'type', 'prc'], _rows(
+            product['maker'].decode(np.repeat(makers, len(types))),
+            product['type'].decode(np.tile(types, len(makers))),
+            percents.reshape(-1)
+        )
+
+    def query_65(self):
+        product = self.product
+        makers, types = _distinct(product['maker'].codes, product['type'].codes)
+        type_names = product['type'].dictionary
+        type_order = np.array([TYPE_ORDER.get(name, 3) for name in type_names.tolist()], dtype=np.int64)[types]
+        order = np.lexsort((type_order, product['maker'].sort_keys(makers)))
+        makers, types = makers[order], types[order]
+        first = np.ones(len(makers), dtype=bool)
+        first[1:] = makers[1:] != makers[:-1]
+        shown = np.where(first, product['maker'].decode(makers), '')
+        return ['num', 'maker', 'type'], _rows(np.arange(1, len(makers) + 1), shown, type_names[types])
+
+    def query_82(self, window=6):
+        pc = self.pc
+        if len(pc['code']) < window:
+            return ['code', 'avg_price'], []
+        order = np.argsort(pc['code'], kind='stable')
+        prices = pc['price'][order]
+        # Скользящее окно из текущей и пяти следующих строк; NULL не участвует в среднем, как в AVG.
+        # Суммы и число цен окна - разности префиксных сумм (память O(n), без копии n x window);
+        # цены сдвинуты на среднее, чтобы префиксные суммы не росли с числом строк и не теряли точность
+        valid = ~np.isnan(prices)
+        shift = prices[valid].mean() if valid.any() else 0.0
+        sums = np.concatenate(([0.0], np.cumsum(np.where(valid, prices - shift, 0.0))))
+        counts = np.concatenate(([0], np.cumsum(valid)))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            averages = (sums[window:] - sums[:-window]) / (counts[window:] - counts[:-window]) + shift
+        return ['code', 'avg_price'], _rows(pc['code'][order][:len(averages)], averages)
+
+    def query_89(self):
+        maker = self.product['maker']
+        makers, counts = np.unique(maker.codes, return_counts=True)
+        if not len(counts):
+            return ['maker', 'qty'], []
+        mask = (counts == counts.max()) | (counts == counts.min())
+        order = np.lexsort((maker.sort_keys(makers[mask]), -counts[mask]))
+        return ['maker', 'qty'], _rows(maker.decode(makers[mask][order]), counts[mask][order])
+
+    def query_90(self):
+        product = self.product
+        order = np.argsort(product['model'], kind='stable')[3:-3]
+        return ['maker', 'model', 'type'], _rows(
+            product['maker'].decode(product['maker'].codes[order]),
+            product['model'][order],
+            product['type'].decode(product['type'].codes[order])
+        )
+
+    # --- Вывод и проверка ---
+
+    def run(self, number, output=None, **params):
+        """
+        Выполняет задачу и выводит результат рендерером (см. tasks/output.py).
+
+        Returns:
+            Число строк результата.
+        """
+        headers, rows = self.query(number, **params)
+        return get_renderer(output).render(f'Task #{number} (NumPy):', rows, headers)
+
+    def verify(self, numbers=None, session=None, float_places=None):
+        """
+        Сравнивает результаты движка с результатами запросов stmt_N в БД как мультимножества строк.
+
+        Args:
+            numbers: Номера задач, по умолчанию - все из SUPPORTED.
+            session: Сессия SQLAlchemy; по умолчанию создается и закрывается новая.
+            float_places (int): Сколько знаков после запятой учитывать при сравнении чисел.
+
+        Returns:
+            Список словарей {'number', 'columnar_rows', 'sql_rows', 'equal', 'error'}.
+        """
+        # Нормализация значений - та же, что при сравнении вариантов решения задач
+        from tasks.computer_firm import ComputerFirmTasks
+        from tasks.equivalence import DEFAULT_FLOAT_PLACES, normalize_row
+
+        float_places = DEFAULT_FLOAT_PLACES if float_places is None else float_places
+        owns_session = session is None
+        session = session or get_session()
+        reports = []
+        try:
+            for number in numbers or self.SUPPORTED:
+                report = {'number': number, 'columnar_rows': 0, 'sql_rows': 0, 'equal': False, 'error': None}
+                try:
+                    _, rows = self.query(number)
+                    expected = session.execute(getattr(ComputerFirmTasks, f'stmt_{number}')()).all()
+                except Exception as error:
+                    session.rollback()
+                    report['error'] = f'{type(error).__name__}: {str(error).splitlines()[0]}'
+                else:
+                    actual = Counter(normalize_row(row, float_places) for row in rows)
+                    expected = Counter(normalize_row(row, float_places) for row in expected)
+                    report.update(
+                        columnar_rows=sum(actual.values()), sql_rows=sum(expected.values()),
+                        equal=actual == expected
+                    )
+                reports.append(report)
+        finally:
+            if owns_session:
+                session.close()
+        return reports
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m tasks.columnar', description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--task', type=int, action='append', dest='numbers', metavar='N',
+                        help='номер задачи (по умолчанию - все поддерживаемые)')
+    parser.add_argument('--verify', action='store_true', help='сравнить результаты с запросами в БД')
+    parser.add_argument('--format', dest='output_format', help='формат вывода: pretty, stream, csv, jsonl')
+    args = parser.parse_args(argv)
+
+    if np is None:
+        parser.error('векторному движку нужен NumPy: pip install numpy')
+    unknown = sorted(set(args.numbers or ()) - set(ColumnarComputerFirm.SUPPORTED))
+    if unknown:
+        parser.error(f'задачи не поддерживаются векторным движком: {", ".join(map(str, unknown))}')
+
+    started = time.perf_counter()
+    engine = ColumnarComputerFirm.load()
+    counts = ', '.join(f'{name}={count}' for name, count in engine.row_counts().items())
+    print(f'Загружено за {time.perf_counter() - started:.3f} s: {counts}', file=sys.stderr)
+
+    if args.verify:
+        reports = engine.verify(args.numbers)
+        print(tabulate(
+            [(report['number'], report['columnar_rows'], report['sql_rows'],
+              'error' if report['error'] else 'equal' if report['equal'] else 'different')
+             for report in reports],
+            ['N', 'numpy rows', 'sql rows', 'status'], tablefmt='pretty'
+        ))
+        for report in reports:
+            if report['error']:
+                print(f'task_{report["number"]}: {report["error"]}', file=sys.stderr)
+        return 0 if all(report['equal'] for report in reports) else 1
+
+    renderer = get_renderer(args.output_format)
+    for number in args.numbers or ColumnarComputerFirm.SUPPORTED:
+        started = time.perf_counter()
+        headers, rows = engine.query(number)
+        elapsed = time.perf_counter() - started
+        renderer.render(f'Task #{number} (NumPy, {elapsed * 1e6:.0f} us):', rows, headers)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,1244 @@
+from sqlalchemy import (
+    distinct,
+    select,
+    or_,
+    union,
+    except_,
+    func,
+    and_,
+    intersect,
+    union_all,
+    all_,
+    cte,
+    bindparam,
+    case,
+    cast,
+    true,
+    Numeric,
+    String,
+)
+from sqlalchemy.orm import aliased
+
+from db.database import exec_query
+from db.db_1_computer_firm.models import Product, PC, Laptop, Printer
+from tasks.base import SessionCreater, cached_statement
+
+
+class ComputerFirmTasks(SessionCreater):
+    """
+    Класс для решения задач по первой БД (компьютерная фирма)
+    """
+
+    # Отчеты по производителям обходят модели каждого из них: связи загружаются
+    # отдельным запросом на связь, а не запросом на каждую модель
+    LOADER_STRATEGIES = {
+        'Product.pcs': 'select',
+        'Product.laptops': 'select',
+        'Product.printers': 'select',
+    }
+
+    # Тип продукции -> связь Product с изделиями этого типа
+    PRODUCT_ITEMS = {'PC': 'pcs', 'Laptop': 'laptops', 'Printer': 'printers'}
+
+    def maker_catalog(self):
+        """
+        Обходит производителей, их модели и изделия моделей (ПК, ноутбуки, принтеры) и возвращает
+        строки (maker, model, type, items, min_price): число изделий модели и минимальную цену.
+        """
+        statement = (
+            select(Product)
+            .order_by(Product.maker, Product.model)
+            .options(*self.loader_options(Product.pcs, Product.laptops, Product.printers))
+        )
+        # joinedload коллекций повторяет родительскую строку для каждого изделия
+        for product in self.session.scalars(statement).unique():
+            items = getattr(product, self.PRODUCT_ITEMS[product.type])
+            prices = [item.price for item in items if item.price is not None]
+            yield product.maker, product.model, product.type, len(items), min(prices, default=None)
+
+    def show_maker_catalog(self):
+        """Выводит maker_catalog рендерером `output`."""
+        self._show("Maker catalog:", self.maker_catalog(), ['maker', 'model', 'type', 'items', 'min_price'])
+
+    def show_pc_table(self, page_size=None):
+        """Выводит таблицу PC постранично (см. SessionCreater.show_table)."""
+        self.show_table(PC, page_size, title="PC table:")
+
+    def iter_pc_table(self, batch_size=None):
+        """Потоковый вариант show_pc_table: итератор по объектам PC, читаемым пачками с сервера."""
+        for row in self.stream(select(PC), batch_size):
+            yield row.PC
+
+    # Тексты запросов вариантов task_N_postgre. Вынесены в атрибуты класса,
+    # чтобы бенчмарк (benchmarks/orm_vs_raw.py) выполнял ровно тот же SQL
+    SQL_1 = """
+        SELECT model_id, speed, hd
+        FROM pc
+        WHERE price < 500.0
+        ORDER BY model_id, speed
+        """
+
+    SQL_2 = """
+        SELECT DISTINCT maker
+        FROM product
+        WHERE type = 'Printer'
+        """
+
+    SQL_58 = """
+        WITH counts AS (
+            SELECT maker, type, count(*) AS cnt
+            FROM product
+            GROUP BY maker, type
+        )
+        SELECT
+            m.maker,
+            t.type,
+            round(coalesce(c.cnt, 0) * 100.0 / sum(coalesce(c.cnt, 0)) OVER (PARTITION BY m.maker), 2) AS prc
+        FROM (SELECT DISTINCT maker FROM product) m
+            CROSS JOIN (SELECT DISTINCT type FROM product) t
+            LEFT JOIN counts c ON c.maker = m.maker AND c.type = t.type
+        ORDER BY m.maker, t.type
+        """
+
+    SQL_65 = """
+        SELECT
+            row_number() OVER (ORDER BY maker, type_order) AS num,
+            CASE
+                WHEN row_number() OVER (PARTITION BY maker ORDER BY type_order) = 1
+                THEN maker
+                ELSE ''
+            END AS maker,
+            type
+        FROM (
+            SELECT DISTINCT
+                maker,
+                type,
+                CASE type WHEN 'PC' THEN 1 WHEN 'Laptop' THEN 2 ELSE 3 END AS type_order
+            FROM product
+        ) t
+        ORDER BY num
+        """
+
+    SQL_82 = """
+        SELECT code, avg_price
+        FROM (
+            SELECT
+                code,
+                avg(price) OVER w AS avg_price,
+                count(*) OVER w AS cnt
+            FROM pc
+            WINDOW w AS (ORDER BY code ROWS BETWEEN CURRENT ROW AND 5 FOLLOWING)
+        ) t
+        WHERE cnt = 6
+        ORDER BY code
+        """
+
+    SQL_89 = """
+        SELECT maker, cnt
+        FROM (
+            SELECT
+                maker,
+                count(*) AS cnt,
+                max(count(*)) OVER () AS max_cnt,
+                min(count(*)) OVER () AS min_cnt
+            FROM product
+            GROUP BY maker
+        ) t
+        WHERE cnt = max_cnt OR cnt = min_cnt
+        ORDER BY cnt DESC, maker
+        """
+
+    SQL_90 = """
+        SELECT maker, model, type
+        FROM (
+            SELECT
+                maker,
+                model,
+                type,
+                row_number() OVER (ORDER BY model) AS rn,
+                count(*) OVER () AS total
+            FROM product
+        ) t
+        WHERE rn > 3 AND rn <= total - 3
+        ORDER BY model
+        """
+
+    # Запросы SQLAlchemy строятся один раз и переиспользуются (см. cached_statement),
+    # изменяемые условия задач передаются в них через bindparam
+
+    @cached_statement
+    def stmt_1():
+        """Запрос SQLAlchemy для task_1."""
+        # Фильтруем ПК по стоимости менее 500 долларов и выбираем необходимые столбцы
+        return (
+            select(
+                PC.model_id,
+                PC.speed,
+                PC.hd
+            )
+            .filter(PC.price < bindparam('max_price', 500.0))
+        )
+
+    def task_1(self, max_price=500.0):
+        query = self.session.execute(self.stmt_1(), {'max_price': max_price}).all()
+
+        headers = ['model', 'speed', 'hd']
+        self._show("Task #1 (SQL-Alchemy):", query, headers)
+
+    def task_1_postgre(self):
+        result = exec_query(self.SQL_1, domain='computer_firm')
+
+        if result:
+            headers = ['model', 'speed', 'hd']
+            self._show("Task #1 (PostgreSQL):", result, headers)
+        else:
+            print("No results found")
+
+    @cached_statement
+    def stmt_2():
+        """Запрос SQLAlchemy для task_2."""
+        return (
+            select(distinct(Product.maker))
+            .filter_by(type='Printer')
+        )
+
+    def task_2(self):
+        """Найдите производителей принтеров. Вывести: maker"""
+        query = self.session.execute(self.stmt_2()).all()
+
+        headers = ['maker']
+        self._show("Task #2 (SQL-Alchemy):", query, headers)
+
+    def task_2_postgre(self):
+        result = exec_query(self.SQL_2, domain='computer_firm')
+        if result:
+            headers = ['maker']
+            self._show("Task #2 (PostgreSQL):", result, headers)
+        else:
+            print("No results found")
+
+    @cached_statement
+    def stmt_3():
+        """Запрос SQLAlchemy для task_3."""
+        return (
+            select(
+                Laptop.model_id,
+                Laptop.ram,
+                Laptop.screen
+            )
+            .filter(Laptop.price > bindparam('min_price', 1000))
+            .order_by(Laptop.model_id)
+        )
+
+    def task_3(self, min_price=1000):
+        """
+        Найдите номер модели, объем памяти и размеры экранов ПК-блокнотов,
+        цена которых превышает 1000 дол.
+        """
+        query = self.session.execute(self.stmt_3(), {'min_price': min_price}).all()
+
+        headers = ['model', 'ram', 'screen']
+        self._show("Task #3 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_4():
+        """Запрос SQLAlchemy для task_4."""
+        return (
+            select(
+                Printer.code,
+                Printer.model_id,
+                Printer.color,
+                Printer.type,
+                Printer.price
+            )
+            .filter(Printer.color == 'y')
+        )
+
+    def task_4(self):
+        """Найдите все записи таблицы Printer для цветных принтеров."""
+        query = self.session.execute(self.stmt_4()).all()
+
+        headers = [column.name for column in Printer.__table__.columns]
+        self._show("Task #4 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_5():
+        """Запрос SQLAlchemy для task_5."""
+        return (
+            select(
+                PC.model_id,
+                PC.speed,
+                PC.hd
+            )
+            .filter(or_(PC.cd == '12x', PC.cd == '24x')
+                    & (PC.price < bindparam('max_price', 600)))
+        )
+
+    def task_5(self, max_price=600):
+        """
+        Найдите номер модели, скорость и размер жесткого диска ПК,
+        имеющих 12x или 24x CD и цену менее 600 дол.
+        """
+        query = self.session.execute(self.stmt_5(), {'max_price': max_price}).all()
+
+        headers = ['model', 'speed', 'hd']
+        self._show("Task #5 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_6():
+        """Запрос SQLAlchemy для task_6."""
+        lap = aliased(Laptop)
+        prod = aliased(Product)
+
+        return (
+            select(
+                distinct(prod.maker),
+                lap.speed
+            )
+            .select_from(lap)
+            .join(prod, lap.model_id == prod.model)
+            .filter(lap.hd >= bindparam('min_hd', 10))
+        )
+
+    def task_6(self, min_hd=10):
+        """
+        Для каждого производителя, выпускающего ПК-блокноты c объёмом жесткого диска
+        не менее 10 Гбайт, найти скорости таких ПК-блокнотов. Вывод: производитель, скорость.
+        """
+        query = self.session.execute(self.stmt_6(), {'min_hd': min_hd}).all()
+
+        headers = ['maker', 'speed']
+        self._show("Task #6 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_7():
+        """Запрос SQLAlchemy для task_7."""
+        maker = bindparam('maker', 'B')
+
+        return union(
+            select(
+                distinct(PC.model_id),
+                PC.price
+            )
+            .join(Product, PC.model_id == Product.model)
+            .filter(Product.maker == maker),
+
+            select(
+                distinct(Product.model),
+                Laptop.price
+            )
+            .join(Laptop, Laptop.model_id == Product.model)
+            .filter(Product.maker == maker),
+
+            select(
+                distinct(Product.model),
+                Printer.price
+            )
+            .join(Printer, Printer.model_id == Product.model)
+            .filter(Product.maker == maker)
+        )
+
+    def task_7(self, maker='B'):
+        """
+        Найдите номера моделей и цены всех имеющихся в продаже
+        продуктов (любого типа) производителя B (латинская буква).
+        """
+        query = self.session.execute(self.stmt_7(), {'maker': maker})
+
+        headers = ['model', 'price']
+        self._show("Task #7 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_8():
+        """Запрос SQLAlchemy для task_8."""
+        return except_(
+            select(Product.maker)
+            .filter(Product.type == 'PC'),
+
+            select(Product.maker)
+            .filter(Product.type == 'Laptop')
+        )
+
+    def task_8(self):
+        """Найдите производителя, выпускающего ПК, но не ПК-блокноты."""
+        query = self.session.execute(self.stmt_8())
+        headers = ['maker']
+        self._show("Task #8 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_9():
+        """Запрос SQLAlchemy для task_9."""
+        return (
+            select(
+                distinct(Product.maker)
+            )
+            .join(PC, Product.model == PC.model_id)
+            .filter(PC.speed >= bindparam('min_speed', 450))
+            .order_by(Product.maker)
+        )
+
+    def task_9(self, min_speed=450):
+        """Найдите производителей ПК с процессором не менее 450 Мгц. Вывести: Maker"""
+        query = self.session.execute(self.stmt_9(), {'min_speed': min_speed})
+
+        headers = ['maker']
+        self._show("Task #9 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_10():
+        """Запрос SQLAlchemy для task_10."""
+        return (
+            select(
+                Printer.model_id,
+                Printer.price
+            )
+            .filter(Printer.price == select(func.max(Printer.price)).scalar_subquery())
+        )
+
+    def task_10(self):
+        """Найдите модели принтеров, имеющих самую высокую цену. Вывести: model, price"""
+        query = self.session.execute(self.stmt_10()).all()
+
+        headers = ['model', 'price']
+        self._show("Task #10 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_11():
+        """Запрос SQLAlchemy для task_11."""
+        return select(func.avg(PC.speed))
+
+    def task_11(self):
+        """Найдите среднюю скорость ПК."""
+        query = self.session.execute(self.stmt_11())
+
+        headers = ['avg_speed']
+        self._show("Task #11 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_12():
+        """Запрос SQLAlchemy для task_12."""
+        return (
+            select(
+                func.avg(Laptop.speed)
+            )
+            .filter(Laptop.price > bindparam('min_price', 1000))
+        )
+
+    def task_12(self, min_price=1000):
+        """Найдите среднюю скорость ПК-блокнотов, цена которых превышает 1000 дол."""
+        query = self.session.execute(self.stmt_12(), {'min_price': min_price})
+
+        headers = ['avg_speed']
+        self._show("Task #12 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_13():
+        """Запрос SQLAlchemy для task_13."""
+        return (
+            select(
+                func.avg(PC.speed)
+            )
+            .join(Product, PC.model_id == Product.model)
+            .filter(Product.maker == bindparam('maker', 'A'))
+        )
+
+    def task_13(self, maker='A'):
+        """Найдите среднюю скорость ПК, выпущенных производителем A."""
+        query = self.session.execute(self.stmt_13(), {'maker': maker})
+
+        headers = ['avg_speed']
+        self._show("Task #13 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_15():
+        """Запрос SQLAlchemy для task_15."""
+        return (
+            select(
+                PC.hd
+            )
+            .group_by(PC.hd)
+            .having(func.count(PC.hd) >= 2)
+            .order_by(PC.hd)
+        )
+
+    def task_15(self):
+        """Найдите размеры жестких дисков, совпадающих у двух и более PC. Вывести: HD"""
+        query = self.session.execute(self.stmt_15())
+
+        headers = ['hd']
+        self._show("Task #15 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_16():
+        """Запрос SQLAlchemy для task_16."""
+        a = aliased(PC)
+        b = aliased(PC)
+
+        return (
+            select(
+                distinct(a.model_id),
+                b.model_id,
+                a.speed,
+                a.ram
+            )
+            .filter(and_(a.model_id > b.model_id, a.speed == b.speed, a.ram == b.ram))
+        )
+
+    def task_16(self):
+        """
+        Найдите пары моделей PC, имеющих одинаковые скорость и RAM.
+        В результате каждая пара указывается только один раз, т.е. (i,j), но не (j,i),
+        Порядок вывода: модель с большим номером, модель с меньшим номером, скорость и RAM.
+        """
+        query = self.session.execute(self.stmt_16())
+
+        headers = ['A_model', 'B_model', 'speed', 'ram']
+        self._show("Task #16 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_17():
+        """Запрос SQLAlchemy для task_17."""
+        return (
+            select(
+                distinct(Product.type),
+                Laptop.model_id,
+                Laptop.speed
+            )
+            .join(Laptop, Product.model == Laptop.model_id)
+            .filter(Laptop.speed < all_((select(PC.speed)).scalar_subquery()))
+        )
+
+    def task_17(self):
+        """
+        Найдите модели ПК-блокнотов, скорость которых меньше скорости каждого из ПК.
+        Вывести: type, model, speed"""
+        query = self.session.execute(self.stmt_17())
+
+        headers = ['type', 'model', 'speed']
+        self._show("Task #17 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_18():
+        """Запрос SQLAlchemy для task_18."""
+        subquery_printer_min_price = (
+            select(
+                func.min(Printer.price)
+            )
+            .filter(Printer.color == 'y')
+            .scalar_subquery()
+        )
+
+        return (
+            select(
+                distinct(Product.maker),
+                Printer.price
+            )
+            .join(Product, Printer.model_id == Product.model)
+            .filter(and_(Printer.price == subquery_printer_min_price, Printer.color == 'y'))
+        )
+
+    def task_18(self):
+        """
+        Найдите производителей самых дешевых цветных принтеров.
+        Вывести: maker, price
+        """
+        query = self.session.execute(self.stmt_18()).all()
+
+        headers = ['maker', 'price']
+        self._show("Task #18 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_19():
+        """Запрос SQLAlchemy для task_19."""
+        return (
+            select(
+                Product.maker,
+                func.avg(Laptop.screen)
+            )
+            .join(Laptop, Product.model == Laptop.model_id)
+            .filter(Product.type == 'Laptop')
+            .group_by(Product.maker)
+        )
+
+    def task_19(self):
+        """
+        Для каждого производителя, имеющего модели в таблице Laptop,
+        найдите средний размер экрана выпускаемых им ПК-блокнотов.
+        Вывести: maker, средний размер экрана.
+        """
+        query = self.session.execute(self.stmt_19())
+
+        headers = ['maker', 'avg_screen']
+        self._show("Task #19 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_20():
+        """Запрос SQLAlchemy для task_20."""
+        return (
+            select(
+                Product.maker,
+                func.count(Product.model)
+            )
+            .filter(Product.type == 'PC')
+            .group_by(Product.maker)
+            .having(func.count(Product.model) >= bindparam('min_models', 3))
+        )
+
+    def task_20(self, min_models=3):
+        """
+        Найдите производителей, выпускающих по меньшей мере три различных модели ПК.
+        Вывести: Maker, число моделей ПК.
+        """
+        query = self.session.execute(self.stmt_20(), {'min_models': min_models})
+
+        headers = ['maker', 'model_count']
+        self._show("Task #20 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_21():
+        """Запрос SQLAlchemy для task_21."""
+        return (
+            select(
+                Product.maker,
+                func.max(PC.price)
+            )
+            .join(PC, PC.model_id == Product.model)
+            .filter(Product.type == 'PC')
+            .group_by(Product.maker)
+        )
+
+    def task_21(self):
+        """
+        Найдите максимальную цену ПК, выпускаемых каждым производителем,
+        у которого есть модели в таблице PC.
+        Вывести: maker, максимальная цена.
+        """
+        query = self.session.execute(self.stmt_21())
+
+        headers = ['maker', 'pc_max_price']
+        self._show("Task #21 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_22():
+        """Запрос SQLAlchemy для task_22."""
+        return (
+            select(
+                PC.speed,
+                func.avg(PC.price)
+            )
+            .filter(PC.speed > bindparam('min_speed', 600))
+            .group_by(PC.speed)
+        )
+
+    def task_22(self, min_speed=600):
+        """
+        Для каждого значения скорости ПК, превышающего 600 МГц,
+        определите среднюю цену ПК с такой же скоростью.
+        Вывести: speed, средняя цена.
+        """
+        query = self.session.execute(self.stmt_22(), {'min_speed': min_speed})
+
+        headers = ['speed', 'pc_avg_price']
+        self._show("Task #22 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_23():
+        """Запрос SQLAlchemy для task_23."""
+        min_speed = bindparam('min_speed', 750)
+
+        return intersect(
+            select(
+                Product.maker
+            )
+            .join(PC, Product.model == PC.model_id)
+            .filter(PC.speed >= min_speed),
+
+            select(
+                Product.maker
+            )
+            .join(Laptop, Laptop.model_id == Product.model)
+            .filter(Laptop.speed >= min_speed)
+        )
+
+    def task_23(self, min_speed=750):
+        """
+        Найдите производителей, которые производили бы как ПК
+        со скоростью не менее 750 МГц, так и ПК-блокноты со скоростью не менее 750 МГц.
+        Вывести: Maker
+        """
+        query = self.session.execute(self.stmt_23(), {'min_speed': min_speed})
+
+        headers = ['maker']
+        self._show("Task #23 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_24():
+        """Запрос SQLAlchemy для task_24."""
+        max_price = cte(
+            union(
+                select(PC.model_id, PC.price)
+                .filter(PC.price == select(func.max(PC.price)).scalar_subquery()),
+
+                select(Laptop.model_id, Laptop.price)
+                .filter(Laptop.price == select(func.max(Laptop.price)).scalar_subquery()),
+
+                select(Printer.model_id, Printer.price)
+                .filter(Printer.price == select(func.max(Printer.price)).scalar_subquery())
+            )
+        )
+
+        return (
+            select(max_price.c.model_id)
+            .filter(max_price.c.price ==
+                    select(func.max(max_price.c.price)).scalar_subquery())
+        )
+
+    def task_24(self):
+        """
+        Перечислите номера моделей любых типов,
+        имеющих самую высокую цену по всей имеющейся в базе данных продукции.
+        """
+        query = self.session.execute(self.stmt_24())
+
+        headers = ['model']
+        self._show("Task #24 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_25():
+        """Запрос SQLAlchemy для task_25."""
+        min_ram_sub = (
+            select(func.min(PC.ram)).scalar_subquery()
+        )
+
+        pc_spec = cte(
+            select(
+                func.max(PC.speed).label('max_speed'),
+                PC.ram
+            )
+            .filter(PC.ram.in_(min_ram_sub))
+            .group_by(PC.ram)
+        )
+
+        maker_table = (
+            select(Product.maker)
+            .join(PC, PC.model_id == Product.model)
+            .join(pc_spec, (pc_spec.c.max_speed == PC.speed) & (pc_spec.c.ram == PC.ram))
+        )
+
+        return (
+            select(
+                distinct(Product.maker)
+            )
+            .filter((Product.type == 'Printer') & Product.maker.in_(maker_table))
+        )
+
+    def task_25(self):
+        """
+        Найдите производителей принтеров, которые производят ПК с
+        наименьшим объемом RAM и с самым быстрым процессором среди всех ПК,
+        имеющих наименьший объем RAM.
+        Вывести: Maker
+
+        with pc_spec AS (
+        SELECT max(speed) max_speed, ram
+        FROM pc
+        WHERE ram IN (select min(ram) min_ram from pc)
+        GROUP BY ram)
+
+        SELECT DISTINCT maker
+        FROM product
+        WHERE type = 'Printer'
+            AND maker IN (SELECT maker
+                            FROM product
+                            JOIN pc ON pc.model = product.model
+                            JOIN pc_spec ON pc_spec.max_speed = pc.speed
+                                AND pc_spec.ram = pc.ram)
+        """
+        query = self.session.execute(self.stmt_25())
+
+        headers = ['maker']
+        self._show("Task #25 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_26():
+        """Запрос SQLAlchemy для task_26."""
+        tmp = cte(
+            union_all(
+                select(PC.model_id, PC.price),
+                select(Laptop.model_id, Laptop.price)
+            )
+        )
+
+        return (
+            select(
+                func.avg(tmp.c.price)
+            )
+            .join(Product, Product.model == tmp.c.model_id)
+            .filter(Product.maker == bindparam('maker', 'A'))
+        )
+
+    def task_26(self, maker='A'):
+        """
+        Найдите среднюю цену ПК и ПК-блокнотов, выпущенных производителем A.
+        Вывести: одна общая средняя цена.
+
+        WITH tmp AS (
+        SELECT model, price
+        FROM PC
+        UNION ALL
+        SELECT model, price
+        FROM Laptop)
+
+        SELECT avg(price) as AVG_price
+        FROM tmp JOIN product
+        ON product.model = tmp.model
+        WHERE maker = 'A'
+        """
+        query = self.session.execute(self.stmt_26(), {'maker': maker})
+
+        headers = ['AVG_price']
+        self._show("Task #26 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_27():
+        """Запрос SQLAlchemy для task_27."""
+        subquery = (
+            select(Product.maker)
+            .filter(Product.type == 'Printer')
+        )
+
+        return (
+            select(
+                distinct(Product.maker),
+                func.avg(PC.hd)
+            )
+            .join(PC, PC.model_id == Product.model)
+            .filter(Product.maker.in_(subquery))
+            .group_by(Product.maker)
+        )
+
+    def task_27(self):
+        """
+        Найдите средний размер диска ПК каждого из тех производителей,
+        которые выпускают и принтеры.
+        Вывести: maker, средний размер HD.
+        """
+        query = self.session.execute(self.stmt_27())
+
+        headers = ['maker', 'AVG_hd']
+        self._show("Task #27 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_28():
+        """Запрос SQLAlchemy для task_28."""
+        tmp_cte = cte(
+            select(Product.maker)
+            .group_by(Product.maker)
+            .having(func.count(Product.model) == 1)
+        )
+
+        return select(func.count(tmp_cte.c.maker))
+
+    def task_28(self):
+        """
+        Используя таблицу Product, определить количество производителей,
+        выпускающих по одной модели.
+        """
+        query = self.session.execute(self.stmt_28())
+
+        headers = ['Qty']
+        self._show("Task #28 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_35():
+        """Запрос SQLAlchemy для task_35."""
+        return (
+            select(
+                Product.model,
+                Product.type
+            )
+            .filter(
+                or_(
+                    func.cast(Product.model, String).notlike('%[^0-9]%'),
+                    func.cast(Product.model, String).notlike('%[^A-Z]%')
+                )
+            )
+        )
+
+    def task_35(self):
+        """
+        В таблице Product найти модели, которые состоят только из цифр
+        или только из латинских букв (A-Z, без учета регистра).
+        Вывод: номер модели, тип модели.
+
+        SELECT model, type
+        FROM Product
+        WHERE model NOT LIKE '%[^0-9]%'
+          OR model NOT LIKE '%[^A-Z]%';
+        """
+        query = self.session.execute(self.stmt_35())
+
+        headers = ['Model', 'Type']
+        self._show("Task #35 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_58():
+        """Запрос SQLAlchemy для task_58."""
+        makers = select(distinct(Product.maker).label('maker')).subquery()
+        types = select(distinct(Product.type).label('type')).subquery()
+        counts = (
+            select(Product.maker, Product.type, func.count().label('cnt'))
+            .group_by(Product.maker, Product.type)
+            .subquery()
+        )
+        cnt = func.coalesce(counts.c.cnt, 0)
+
+        # Общее число моделей производителя считается оконной суммой по уже сгруппированным
+        # строкам, а не отдельным подзапросом для каждой пары (производитель, тип)
+        return (
+            select(
+                makers.c.maker,
+                types.c.type,
+                func.round(
+                    cast(cnt, Numeric) * 100.0 / func.sum(cnt).over(partition_by=makers.c.maker), 2
+                ).label('prc')
+            )
+            .select_from(
+                makers
+                .join(types, true())
+                .outerjoin(counts, and_(counts.c.maker == makers.c.maker, counts.c.type == types.c.type))
+            )
+            .order_by(makers.c.maker, types.c.type)
+        )
+
+    def task_58(self):
+        """
+        Для каждого типа продукции и каждого производителя из таблицы Product c
+        точностью до двух десятичных знаков найти процентное отношение числа моделей
+        данного типа данного производителя к общему числу моделей этого производителя.
+
+        WITH pcj AS (
+            SELECT *
+            FROM (
+                SELECT DISTINCT [maker]
+                FROM product
+            ) AS tp CROSS JOIN (
+                SELECT DISTINCT [type]
+                FROM Product) AS tt
+        )
+
+        SELECT
+            DISTINCT pcj.maker,
+            pcj.type,
+            cast(
+                count(model) over(PARTITION by pcj.[maker], pcj.[type]) * 100.0 /
+                count(model) over(PARTITION by pcj.[maker]) AS numeric(10, 2)
+            ) AS val
+        FROM
+            pcj
+            LEFT JOIN product ON pcj.maker = product.maker
+            AND pcj.type = product.type;
+        """
+        query = self.session.execute(self.stmt_58())
+
+        headers = ['maker', 'type', 'prc']
+        self._show("Task #58 (SQL-Alchemy):", query, headers)
+
+    def task_58_postgre(self):
+        result = exec_query(self.SQL_58, domain='computer_firm')
+
+        if result:
+            headers = ['maker', 'type', 'prc']
+            self._show("Task #58 (PostgreSQL):", result, headers)
+        else:
+            print("No results found")
+
+    @cached_statement
+    def stmt_65():
+        """Запрос SQLAlchemy для task_65."""
+        # Порядок типов задается явно, а не длиной названия, как в T-SQL
+        type_order = case((Product.type == 'PC', 1), (Product.type == 'Laptop', 2), else_=3)
+        number = func.row_number().over(order_by=(Product.maker, type_order)).label('num')
+        first_in_maker = func.row_number().over(partition_by=Product.maker, order_by=type_order)
+
+        return (
+            select(
+                number,
+                case((first_in_maker == 1, Product.maker), else_='').label('maker'),
+                Product.type
+            )
+            .group_by(Product.maker, Product.type)
+            .order_by(number)
+        )
+
+    def task_65(self):
+        """
+        Пронумеровать уникальные пары {maker, type} из Product, упорядочив их следующим образом:
+        - имя производителя (maker) по возрастанию;
+        - тип продукта (type) в порядке PC, Laptop, Printer.
+        Если некий производитель выпускает несколько типов продукции, то выводить его имя только в первой строке;
+        остальные строки для ЭТОГО производителя должны содержать пустую строку символов ('').
+
+        SELECT
+            row_number() over(ORDER BY maker, len(TYPE)) AS rowNumber,
+            CASE
+                WHEN row_number() over(PARTITION by maker ORDER BY len(TYPE)) = 1
+                THEN maker
+                ELSE ''
+            END AS maker,
+            TYPE
+        FROM Product
+        GROUP BY maker, TYPE;
+        """
+        query = self.session.execute(self.stmt_65())
+
+        headers = ['num', 'maker', 'type']
+        self._show("Task #65 (SQL-Alchemy):", query, headers)
+
+    def task_65_postgre(self):
+        result = exec_query(self.SQL_65, domain='computer_firm')
+
+        if result:
+            headers = ['num', 'maker', 'type']
+            self._show("Task #65 (PostgreSQL):", result, headers)
+        else:
+            print("No results found")
+
+    def task_75(self):
+        """
+        Для тех производителей, у которых есть продукты с известной ценой хотя бы в одной
+        из таблиц Laptop, PC, Printer найти максимальные цены на каждый из типов продукции.
+        Вывод: maker, максимальная цена на ноутбуки, максимальная цена на ПК, максимальная цена на принтеры.
+        Для отсутствующих продуктов/цен использовать NULL.
+
+        SELECT
+          maker,
+          [laptop],
+          [pc],
+          [printer]
+        FROM (SELECT
+                maker,
+                TYPE,
+                MAX (price)(price) price
+               FROM Product p JOIN (SELECT model, price
+                                    FROM PC
+                                    UNION
+                                    SELECT model, price
+                                    FROM Laptop
+                                    UNION
+                                    SELECT model, price
+                                    FROM Printer) as W
+                ON p.model = w.model
+                GROUP BY maker, TYPE
+                HAVING MAX (price) IS NOT NULL
+        ) A PIVOT (
+                    MAX (price) FOR TYPE IN ([laptop], [pc], [printer])
+                  ) pvt;
+        """
+
+    @cached_statement
+    def stmt_82():
+        """Запрос SQLAlchemy для task_82."""
+        # Вместо самосоединения пронумерованных строк (квадратичного по числу ПК) среднее
+        # считается скользящим окном из текущей и пяти следующих строк за один проход
+        frame = dict(order_by=PC.code, rows=(0, 5))
+        windows = (
+            select(
+                PC.code,
+                func.avg(PC.price).over(**frame).label('avg_price'),
+                func.count().over(**frame).label('cnt')
+            )
+            .subquery()
+        )
+
+        return (
+            select(windows.c.code, windows.c.avg_price)
+            # В последних пяти окнах меньше шести строк
+            .filter(windows.c.cnt == 6)
+            .order_by(windows.c.code)
+        )
+
+    def task_82(self):
+        """
+        В наборе записей из таблицы PC, отсортированном по столбцу code (по возрастанию)
+        найти среднее значение цены для каждой шестерки подряд идущих ПК.
+        Вывод: значение code, которое является первым в наборе из шести строк, среднее значение цены в наборе.
+
+        WITH CTE(code, price, number) AS (
+            SELECT
+                PC.code,
+                PC.price,
+                number = ROW_NUMBER() OVER (ORDER BY PC.code)
+            FROM PC
+        )
+        SELECT
+            CTE.code,
+            AVG(C.price)
+        FROM CTE JOIN CTE C
+        ON (C.number - CTE.number) < 6 AND (C.number - CTE.number) >= 0
+        GROUP BY CTE.number, CTE.code
+        HAVING COUNT(CTE.number) = 6;
+        """
+        query = self.session.execute(self.stmt_82())
+
+        headers = ['code', 'avg_price']
+        self._show("Task #82 (SQL-Alchemy):", query, headers)
+
+    def task_82_postgre(self):
+        result = exec_query(self.SQL_82, domain='computer_firm')
+
+        if result:
+            headers = ['code', 'avg_price']
+            self._show("Task #82 (PostgreSQL):", result, headers)
+        else:
+            print("No results found")
+
+    @cached_statement
+    def stmt_89():
+        """Запрос SQLAlchemy для task_89."""
+        # Максимум и минимум числа моделей считаются окнами по всему результату группировки
+        counts = (
+            select(
+                Product.maker,
+                func.count().label('cnt'),
+                func.max(func.count()).over().label('max_cnt'),
+                func.min(func.count()).over().label('min_cnt')
+            )
+            .group_by(Product.maker)
+            .subquery()
+        )
+
+        return (
+            select(counts.c.maker, counts.c.cnt)
+            .filter(or_(counts.c.cnt == counts.c.max_cnt, counts.c.cnt == counts.c.min_cnt))
+            .order_by(counts.c.cnt.desc(), counts.c.maker)
+        )
+
+    def task_89(self):
+        """
+        Найти производителей, у которых больше всего моделей в таблице Product,
+        а также тех, у которых меньше всего моделей.
+        Вывод: maker, число моделей
+
+        WITH a AS (
+            SELECT
+                maker,
+                count(*) AS cnt,
+                max(count(model)) over (PARTITION by 1) AS maxcol,
+                min(count(model)) over (PARTITION by 1) AS mincol
+            FROM Product
+            GROUP BY maker
+        )
+        SELECT
+            maker,
+            cnt
+        FROM a
+        WHERE
+            cnt = maxcol
+            OR cnt = mincol;
+        """
+        query = self.session.execute(self.stmt_89())
+
+        headers = ['maker', 'qty']
+        self._show("Task #89 (SQL-Alchemy):", query, headers)
+
+    def task_89_postgre(self):
+        result = exec_query(self.SQL_89, domain='computer_firm')
+
+        if result:
+            headers = ['maker', 'qty']
+            self._show("Task #89 (PostgreSQL):", result, headers)
+        else:
+            print("No results found")
+
+    @cached_statement
+    def stmt_90():
+        """Запрос SQLAlchemy для task_90."""
+        # Одна сортировка по model: номер строки с начала и общее число строк заменяют
+        # вторую нумерацию в обратном порядке
+        numbered = (
+            select(
+                Product.maker,
+                Product.model,
+                Product.type,
+                func.row_number().over(order_by=Product.model).label('rn'),
+                func.count().over().label('total')
+            )
+            .subquery()
+        )
+
+        return (
+            select(numbered.c.maker, numbered.c.model, numbered.c.type)
+            .filter(numbered.c.rn > 3, numbered.c.rn <= numbered.c.total - 3)
+            .order_by(numbered.c.model)
+        )
+
+    def task_90(self):
+        """
+        Вывести все строки из таблицы Product, кроме трех строк с наименьшими
+        номерами моделей и трех строк с наибольшими номерами моделей.
+
+        SELECT
+            t1.maker,
+            t1.model,
+            t1.type
+        FROM (
+            SELECT
+                row_number() over (ORDER BY model) p1,
+                row_number() over (ORDER BY model DESC) p2,
+                *
+            FROM product
+        ) t1
+        WHERE
+            p1 > 3
+            AND p2 > 3;
+        """
+        query = self.session.execute(self.stmt_90())
+
+        headers = ['maker', 'model', 'type']
+        self._show("Task #90 (SQL-Alchemy):", query, headers)
+
+    def task_90_postgre(self):
+        result = exec_query(self.SQL_90, domain='computer_firm')
+
+        if result:
+            headers = ['maker', 'model', 'type']
+            self._show("Task #90 (PostgreSQL):", result, headers)
+        else:
+            print("No results found")
+
+    def task_97(self):
+        """
+        Отобрать из таблицы Laptop те строки, для которых выполняется следующее условие:
+        значения из столбцов speed, ram, price, screen возможно расположить таким образом,
+        что каждое последующее значение будет превосходить предыдущее в 2 раза или более.
+        Замечание: все известные характеристики ноутбуков больше нуля.
+        Вывод: code, speed, ram, price, screen.
+
+        SELECT
+            code,
+            speed,
+            ram,
+            price,
+            screen
+        FROM laptop
+        WHERE EXISTS (
+            SELECT 1 as x
+            FROM (
+                SELECT
+                    v,
+                    rank() over(ORDER BY v) rn
+                FROM (
+                    SELECT
+                        cast(speed AS float) sp,
+                        cast(ram AS float) rm,
+                        cast(price AS float) pr,
+                        cast(screen AS float) sc
+                ) l unpivot(v FOR c IN (sp, rm, pr, sc)) u
+                ) l pivot(max(v) FOR rn IN ([1], [2], [3], [4])) p
+            WHERE
+                [1] * 2 <= [2]
+                AND [2] * 2 <= [3]
+                AND [3] * 2 <= [4]
+        );
+        """
@@ -0,0 +1,85 @@
+"""
+Записанные длительности задач и порядок запуска "сначала самые долгие" (LPT).
+
+После каждого запуска через python -m tasks время успешно выполненных задач сохраняется
+в JSON-файл TASK_DURATIONS_FILE (экспоненциальное сглаживание по запускам). При запуске на пуле
+процессов или потоков задачи отправляются в пул от самой долгой к самой короткой: короткие задачи
+заполняют простои в конце, и общее время (makespan) оказывается не больше 4/3 от оптимального.
+Задачи без записанной длительности отправляются первыми - они могут оказаться самыми долгими.
+"""
+import json
+import math
+import os
+import tempfile
+
+from db.config import TASK_DURATIONS_FILE
+
+# Вес последнего замера при сглаживании длительности
+ALPHA = 0.5
+
+
+def load_durations(path=None):
+    """
+    Загружает записанные длительности задач: {имя задачи: секунды}. Если файла нет, возвращает {}.
+
+    Args:
+        path (str): Файл длительностей, по умолчанию TASK_DURATIONS_FILE.
+    """
+    try:
+        with open(path or TASK_DURATIONS_FILE, encoding='utf-8') as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def record_durations(results, path=None):
+    """
+    Добавляет время успешно выполненных задач к записанным длительностям.
+
+    Args:
+        results: Результаты задач (TaskResult).
+        path (str): Файл длительностей, по умолчанию TASK_DURATIONS_FILE.
+    """
+    path = path or TASK_DURATIONS_FILE
+    durations = load_durations(path)
+    for result in results:
+        if result.ok:
+            previous = durations.get(result.spec.name)
+            durations[result.spec.name] = (
+                result.seconds if previous is None else ALPHA * result.seconds + (1 - ALPHA) * previous
+            )
+
+    # Файл заменяется целиком, чтобы одновременный запуск не прочитал его наполовину записанным;
+    # у каждого запуска свой временный файл, поэтому одновременные записи не мешают друг другу
+    # (сохраняется записанное последним)
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    try:
+        with open(descriptor, 'w', encoding='utf-8') as file:
+            json.dump(dict(sorted(durations.items())), file, indent=2)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def longest_first(specs, durations):
+    """
+    Упорядочивает задачи по убыванию записанной длительности; задачи без записи - в начале.
+
+    Args:
+        specs: Задачи (TaskSpec).
+        durations (dict): Длительности в формате load_durations.
+    """
+    return sorted(specs, key=lambda spec: -durations.get(spec.name, math.inf))
+
+
+def estimate_makespan(specs, durations, workers):
+    """
+    Оценивает общее время выполнения задач на `workers` исполнителях, которые берут задачи
+    из очереди по порядку (задачи без записанной длительности не учитываются).
+    """
+    loads = [0.0] * max(workers, 1)
+    for spec in specs:
+        index = loads.index(min(loads))
+        loads[index] += durations.get(spec.name, 0.0)
+    return max(loads)
@@ -0,0 +1,245 @@
+"""
+Проверка эквивалентности результатов вариантов решения задачи (task_N и task_N_postgre).
+
+Результаты сравниваются как мультимножества строк (порядок строк не важен) без сортировки.
+Запросы задач (stmt_N и SQL_N) читаются потоком - пачками через серверный курсор, поэтому
+в памяти не хранится ни весь результат, ни отсортированная копия, и сравнивать можно задачи
+с миллионами строк. Задачи без stmt_N или SQL_N выполняются обычным вызовом метода, и их
+результат загружается в память целиком.
+
+  1. Каждая строка нормализуется (числа приводятся к float с округлением, даты - к ISO и т.д.)
+     и хэшируется. Строки раскладываются по корзинам по значению хэша; для каждой корзины
+     считается число строк и сумма хэшей по модулю 2**64 (аддитивный хэш мультимножества).
+     Совпадение всех корзин означает (с точностью до коллизий хэша) совпадение мультимножеств.
+  2. Если корзины различаются, оба запроса читаются повторно, и в память попадают только
+     строки из несовпавших корзин - по ним находятся строки, которые есть только в одном варианте.
+
+Запуск из корня проекта:
+
+    python -m tasks.equivalence               # все задачи, у которых есть оба варианта
+    python -m tasks.equivalence --task 1 --task 2
+"""
+import argparse
+import datetime
+import decimal
+import hashlib
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+
+from tabulate import tabulate
+
+from db.database import exec_query
+from tasks.output import Renderer
+from tasks.registry import ORM, POSTGRE, select_tasks
+
+DEFAULT_BUCKETS = 256
+DEFAULT_FLOAT_PLACES = 6
+_MASK = (1 << 64) - 1
+
+
+def normalize_value(value, float_places=DEFAULT_FLOAT_PLACES):
+    """Приводит значение к строке, одинаковой для драйверов и типов (Decimal и float, date и str)."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (int, float, decimal.Decimal)):
+        return repr(round(float(value), float_places) + 0.0)
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+        return value.isoformat()
+    return str(value)
+
+
+def normalize_row(row, float_places=DEFAULT_FLOAT_PLACES):
+    return tuple(normalize_value(value, float_places) for value in row)
+
+
+def row_hash(normalized):
+    """64-битный хэш нормализованной строки."""
+    data = '\x1f'.join(normalized).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+class DigestRenderer(Renderer):
+    """
+    "Рендерер", который вместо вывода считает хэши мультимножества строк по корзинам.
+
+    Args:
+        buckets (int): Число корзин.
+        float_places (int): Сколько знаков после запятой учитывать у чисел.
+        collect_buckets: Номера корзин, строки которых нужно сохранить в `rows`
+            (для поиска различий на втором проходе).
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, float_places=DEFAULT_FLOAT_PLACES, collect_buckets=()):
+        super().__init__()
+        self.buckets = buckets
+        self.float_places = float_places
+        self.collect_buckets = set(collect_buckets)
+        self.counts = [0] * buckets
+        self.sums = [0] * buckets
+        self.rows = Counter()
+        self.columns = None
+
+    def render(self, title, rows, headers):
+        # Без заголовков (строки из stream/exec_query) число столбцов берется по первой строке
+        self.columns = len(headers) if headers is not None else None
+        count = 0
+        for row in rows:
+            if self.columns is None:
+                self.columns = len(row)
+            normalized = normalize_row(row, self.float_places)
+            value = row_hash(normalized)
+            bucket = value % self.buckets
+            self.counts[bucket] += 1
+            self.sums[bucket] = (self.sums[bucket] + value) & _MASK
+            if bucket in self.collect_buckets:
+                self.rows[normalized] += 1
+            count += 1
+        return count
+
+    def mismatched_buckets(self, other):
+        return [
+            bucket for bucket in range(self.buckets)
+            if self.counts[bucket] != other.counts[bucket] or self.sums[bucket] != other.sums[bucket]
+        ]
+
+
+@dataclass
+class EquivalenceReport:
+    """Результат сравнения двух вариантов решения задачи."""
+    number: int
+    left: str
+    right: str
+    left_rows: int = 0
+    right_rows: int = 0
+    mismatched_buckets: int = 0
+    # Различающиеся строки: (строка, сколько раз в left, сколько раз в right)
+    diffs: list = field(default_factory=list)
+    error: str = None
+
+    @property
+    def equal(self):
+        return self.error is None and self.mismatched_buckets == 0
+
+
+def _stream_rows(spec, tasks):
+    """
+    Итератор по строкам запроса задачи, читаемым потоком: stmt_N для ORM-варианта
+    (параметры - значения bindparam по умолчанию), SQL_N для варианта на чистом SQL.
+    Возвращает None, если у задачи нет такого запроса.
+    """
+    if spec.variant == ORM:
+        statement = getattr(tasks, f'stmt_{spec.number}', None)
+        return None if statement is None else tasks.stream(statement())
+    query = getattr(tasks, f'SQL_{spec.number}', None)
+    return None if query is None else exec_query(query, stream=True, domain=spec.domain)
+
+
+def _digest(spec, renderer, session=None):
+    with spec.task_class(session=session, output=renderer) as tasks:
+        rows = _stream_rows(spec, tasks)
+        if rows is None:
+            getattr(tasks, spec.method)()
+        else:
+            renderer.render(spec.name, rows, None)
+    return renderer
+
+
+def compare_specs(left, right, buckets=DEFAULT_BUCKETS, max_diffs=10, float_places=DEFAULT_FLOAT_PLACES):
+    """
+    Сравнивает результаты двух задач как мультимножества строк.
+
+    Args:
+        left, right (TaskSpec): Сравниваемые задачи.
+        buckets (int): Число корзин хэша; чем их больше, тем меньше строк хранится на втором проходе.
+        max_diffs (int): Сколько различающихся строк включить в отчет.
+        float_places (int): Сколько знаков после запятой учитывать при сравнении чисел.
+
+    Returns:
+        EquivalenceReport.
+    """
+    report = EquivalenceReport(number=left.number, left=left.name, right=right.name)
+    try:
+        left_digest = _digest(left, DigestRenderer(buckets, float_places))
+        right_digest = _digest(right, DigestRenderer(buckets, float_places))
+    except Exception as error:
+        report.error = f'{type(error).__name__}: {error}'
+        return report
+
+    report.left_rows = sum(left_digest.counts)
+    report.right_rows = sum(right_digest.counts)
+    if left_digest.columns is not None and right_digest.columns is not None \
+            and left_digest.columns != right_digest.columns:
+        report.error = f'разное число столбцов: {left_digest.columns} и {right_digest.columns}'
+        return report
+
+    mismatched = left_digest.mismatched_buckets(right_digest)
+    report.mismatched_buckets = len(mismatched)
+    if not mismatched:
+        return report
+
+    # Второй проход: собираем только строки из несовпавших корзин
+    left_rows = _digest(left, DigestRenderer(buckets, float_places, mismatched)).rows
+    right_rows = _digest(right, DigestRenderer(buckets, float_places, mismatched)).rows
+    for row in sorted(left_rows.keys() | right_rows.keys()):
+        if left_rows[row] != right_rows[row]:
+            report.diffs.append((row, left_rows[row], right_rows[row]))
+            if len(report.diffs) >= max_diffs:
+                break
+    return report
+
+
+def find_variant_pairs(numbers=None, domains=None):
+    """Возвращает пары (ORM-вариант, вариант на чистом SQL) задач, у которых есть оба варианта."""
+    specs = select_tasks(numbers, domains)
+    orm = {(spec.domain, spec.number): spec for spec in specs if spec.variant == ORM}
+    raw = {(spec.domain, spec.number): spec for spec in specs if spec.variant == POSTGRE}
+    return [(orm[key], raw[key]) for key in sorted(orm.keys() & raw.keys())]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m tasks.equivalence', description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--task', type=int, action='append', dest='numbers', metavar='N',
+                        help='номер задачи (по умолчанию - все задачи с обоими вариантами)')
+    parser.add_argument('--buckets', type=int, default=DEFAULT_BUCKETS, help='число корзин хэша')
+    parser.add_argument('--max-diffs', type=int, default=10, help='сколько различающихся строк показать')
+    parser.add_argument('--float-places', type=int, default=DEFAULT_FLOAT_PLACES,
+                        help='сколько знаков после запятой учитывать при сравнении чисел')
+    args = parser.parse_args(argv)
+
+    pairs = find_variant_pairs(args.numbers)
+    if not pairs:
+        parser.error('нет задач, у которых есть оба варианта решения')
+
+    reports = [
+        compare_specs(left, right, args.buckets, args.max_diffs, args.float_places)
+        for left, right in pairs
+    ]
+
+    for report in reports:
+        if report.error:
+            print(f'{report.left} / {report.right}: {report.error}', file=sys.stderr)
+        elif report.diffs:
+            print(f'{report.left} / {report.right}: различающиеся строки')
+            print(tabulate(
+                [(', '.join(row), left, right) for row, left, right in report.diffs],
+                ['row', report.left, report.right], tablefmt='pretty'
+            ))
+
+    print(tabulate(
+        [(report.number, report.left_rows, report.right_rows, report.mismatched_buckets,
+          'equal' if report.equal else 'error' if report.error else 'different')
+         for report in reports],
+        ['N', 'orm rows', 'postgre rows', 'mismatched buckets', 'status'],
+        tablefmt='pretty'
+    ))
+    return 0 if all(report.equal for report in reports) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
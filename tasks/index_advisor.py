@@ -0,0 +1,163 @@
+"""
+Советник по индексам для запросов задач.
+
+Обходит запросы stmt_N классов задач и собирает столбцы, которые встречаются в условиях
+отбора (столбец и параметр/константа) и в условиях соединения (столбец и столбец).
+Столбец, который не является первым столбцом ни одного индекса или первичного ключа
+своей таблицы, предлагается проиндексировать (индексы моделей создает db/indexes.py).
+
+Запуск из корня проекта:
+
+    python -m tasks.index_advisor                     # предложения по всем задачам
+    python -m tasks.index_advisor --domain ships --all
+"""
+import argparse
+import sys
+from collections import defaultdict
+
+from sqlalchemy import Column, Table
+from sqlalchemy.sql import operators, visitors
+from sqlalchemy.sql.elements import BinaryExpression, ColumnClause, Grouping, Label
+from sqlalchemy.sql.selectable import ScalarSelect
+from tabulate import tabulate
+
+from tasks.registry import TASK_CLASSES, get_task_class
+
+# Операторы сравнения, для которых индекс по столбцу может быть полезен
+_COMPARISONS = {
+    operators.eq, operators.ne, operators.lt, operators.le, operators.gt, operators.ge,
+    operators.in_op, operators.like_op, operators.between_op, operators.is_,
+}
+
+FILTER = 'filter'
+JOIN = 'join'
+
+
+def _base_column(expression):
+    """Возвращает столбец таблицы, к которому сводится выражение, или None."""
+    while isinstance(expression, (Grouping, Label)):
+        expression = expression.element
+    if not isinstance(expression, Column):
+        return None
+    table = expression.table
+    # Псевдонимы таблиц (aliased(PC)) сводим к самой таблице; столбцы подзапросов и CTE пропускаем
+    while table is not None and not isinstance(table, Table):
+        table = getattr(table, 'element', None)
+    if table is None:
+        return None
+    return table.c.get(expression.key)
+
+
+def _is_value(expression):
+    """Не зависит ли выражение от столбцов текущей строки (параметр, константа, скалярный подзапрос)."""
+    while isinstance(expression, Grouping):
+        expression = expression.element
+    if isinstance(expression, ScalarSelect):
+        return True
+    return not any(isinstance(element, ColumnClause) for element in visitors.iterate(expression))
+
+
+def predicate_columns(statement):
+    """
+    Находит столбцы таблиц, участвующие в условиях отбора и соединения запроса.
+
+    Args:
+        statement: Запрос SQLAlchemy (Select, CompoundSelect и т.д.), включая вложенные подзапросы.
+
+    Returns:
+        Множество пар (столбец, вид), где вид - FILTER или JOIN.
+    """
+    found = set()
+    for element in visitors.iterate(statement):
+        if not isinstance(element, BinaryExpression) or element.operator not in _COMPARISONS:
+            continue
+        left, right = _base_column(element.left), _base_column(element.right)
+        if left is not None and right is not None:
+            if left is not right:
+                found.add((left, JOIN))
+                found.add((right, JOIN))
+        elif left is not None and _is_value(element.right):
+            found.add((left, FILTER))
+        elif right is not None and _is_value(element.left):
+            found.add((right, FILTER))
+    return found
+
+
+def _is_indexed(column):
+    """Является ли столбец первым столбцом первичного ключа или одного из индексов таблицы."""
+    table = column.table
+    leading = [list(index.columns)[0] for index in table.indexes if index.columns]
+    primary_key = list(table.primary_key.columns)
+    if primary_key:
+        leading.append(primary_key[0])
+    return any(item is column for item in leading)
+
+
+def task_statements(domains=None):
+    """Возвращает пары (имя задачи, запрос) для всех запросов stmt_N классов задач."""
+    for domain in domains or TASK_CLASSES:
+        task_class = get_task_class(domain)
+        for name in sorted(dir(task_class)):
+            if name.startswith('stmt_') and name[5:].isdigit():
+                yield f'{domain}.task_{name[5:]}', getattr(task_class, name)()
+
+
+def advise(statements, include_indexed=False):
+    """
+    Предлагает индексы для столбцов из условий отбора и соединения запросов.
+
+    Args:
+        statements: Пары (имя задачи, запрос SQLAlchemy), например из task_statements().
+        include_indexed (bool): Включать в результат и уже проиндексированные столбцы.
+
+    Returns:
+        Список словарей {'table', 'column', 'kinds', 'tasks', 'indexed'}, отсортированный
+        по числу задач, которым индекс помог бы (по убыванию).
+    """
+    usage = defaultdict(lambda: {'kinds': set(), 'tasks': set()})
+    for task_name, statement in statements:
+        for column, kind in predicate_columns(statement):
+            usage[column]['kinds'].add(kind)
+            usage[column]['tasks'].add(task_name)
+
+    proposals = []
+    for column, info in usage.items():
+        indexed = _is_indexed(column)
+        if indexed and not include_indexed:
+            continue
+        proposals.append({
+            'table': column.table.name,
+            'column': column.name,
+            'kinds': sorted(info['kinds']),
+            'tasks': sorted(info['tasks'], key=lambda name: (name.split('.')[0], int(name.rsplit('_', 1)[1]))),
+            'indexed': indexed,
+        })
+    proposals.sort(key=lambda item: (-len(item['tasks']), item['table'], item['column']))
+    return proposals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m tasks.index_advisor', description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--all', action='store_true', dest='include_indexed',
+                        help='показать и уже проиндексированные столбцы')
+    parser.add_argument('--domain', action='append', choices=list(TASK_CLASSES),
+                        help='предметная область (можно указать несколько раз), по умолчанию - все')
+    args = parser.parse_args(argv)
+
+    proposals = advise(task_statements(args.domain), args.include_indexed)
+    if not proposals:
+        print('Все столбцы из условий отбора и соединения уже проиндексированы')
+        return 0
+    print(tabulate(
+        [(item['table'], item['column'], ', '.join(item['kinds']), 'yes' if item['indexed'] else 'no',
+          ', '.join(item['tasks'])) for item in proposals],
+        ['table', 'column', 'used in', 'indexed', 'tasks'], tablefmt='pretty'
+    ))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
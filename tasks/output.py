@@ -0,0 +1,201 @@
+"""
+Вывод результатов задач.
+
+Рендерер получает заголовок, итератор строк и заголовки столбцов, выводит их и возвращает
+число строк результата. Доступные форматы (см. get_renderer):
+
+  - pretty - таблица tabulate(..., tablefmt='pretty'); результат целиком собирается в памяти;
+  - stream - таблица фиксированной ширины: ширина столбцов считается по первым строкам,
+    остальные строки выводятся по мере чтения;
+  - csv    - строки в формате CSV (первая строка - заголовки столбцов);
+  - jsonl  - по одному JSON-объекту {столбец: значение} на строку.
+
+Форматы csv и jsonl не выводят заголовок задачи, а сообщение об обрезанных строках пишут
+в stderr, чтобы вывод можно было сразу передать другой программе. Если файл не указан, рендерер пишет в текущий sys.stdout (поэтому вывод
+можно перехватить через contextlib.redirect_stdout).
+"""
+import csv
+import json
+import sys
+from itertools import islice
+
+from tabulate import tabulate
+
+from db.config import TASK_OUTPUT_FORMAT, TASK_OUTPUT_MAX_ROWS, TASK_OUTPUT_SAMPLE_SIZE
+
+
+class Renderer:
+    """
+    Базовый класс рендереров.
+
+    Args:
+        file: Файлоподобный объект для вывода, по умолчанию - текущий sys.stdout.
+        max_rows (int): Сколько строк выводить; остальные только подсчитываются,
+            и в конце выводится строка "... N more rows". None или 0 - без ограничения.
+    """
+
+    # Писать ли сообщение "... N more rows" в stderr, чтобы не портить машиночитаемый вывод
+    notice_to_stderr = False
+
+    def __init__(self, file=None, max_rows=None):
+        self._file = file
+        self.max_rows = max_rows or None
+
+    @property
+    def file(self):
+        return self._file if self._file is not None else sys.stdout
+
+    def render(self, title, rows, headers):
+        """
+        Выводит результат задачи.
+
+        Args:
+            title (str): Заголовок, например "Task #1 (SQL-Alchemy):".
+            rows: Итерируемый объект со строками результата (Result SQLAlchemy, список кортежей и т.п.).
+            headers (list): Заголовки столбцов.
+
+        Returns:
+            Число строк результата (включая не выведенные из-за max_rows).
+        """
+        raise NotImplementedError
+
+    def _write_rest(self, rows):
+        """Подсчитывает строки сверх max_rows и сообщает об их числе."""
+        rest = sum(1 for _ in rows)
+        if rest:
+            file = sys.stderr if self.notice_to_stderr else self.file
+            file.write(f'... {rest} more rows\n')
+        return rest
+
+
+class PrettyRenderer(Renderer):
+    """Таблица tabulate в стиле 'pretty' (формат вывода по умолчанию)."""
+
+    def render(self, title, rows, headers):
+        rows = iter(rows)
+        shown = list(islice(rows, self.max_rows))
+        file = self.file
+        file.write(f'{title}\n')
+        file.write(tabulate(shown, headers, tablefmt='pretty'))
+        file.write('\n')
+        return len(shown) + self._write_rest(rows)
+
+
+class StreamingRenderer(Renderer):
+    """
+    Таблица фиксированной ширины, которая выводится по мере чтения строк.
+
+    Ширина столбцов определяется по заголовкам и первым `sample_size` строкам;
+    более длинные значения в остальных строках обрезаются и помечаются символом '~'.
+
+    Args:
+        sample_size (int): Число строк для расчета ширины столбцов, по умолчанию TASK_OUTPUT_SAMPLE_SIZE.
+    """
+
+    def __init__(self, file=None, max_rows=None, sample_size=None):
+        super().__init__(file, max_rows)
+        self.sample_size = sample_size or TASK_OUTPUT_SAMPLE_SIZE
+
+    def render(self, title, rows, headers):
+        rows = iter(rows)
+        limit = self.max_rows
+        sample = [
+            ['' if value is None else str(value) for value in row]
+            for row in islice(rows, min(self.sample_size, limit or self.sample_size))
+        ]
+        widths = [len(str(header)) for header in headers]
+        for row in sample:
+            widths = [max(width, len(value)) for width, value in zip(widths, row)]
+
+        border = '+' + '+'.join('-' * (width + 2) for width in widths) + '+\n'
+
+        def line(values):
+            cells = []
+            for value, width in zip(values, widths):
+                if len(value) > width:
+                    value = value[:width - 1] + '~'
+                cells.append(value.ljust(width))
+            return '| ' + ' | '.join(cells) + ' |\n'
+
+        file = self.file
+        file.write(f'{title}\n')
+        file.write(border)
+        file.write(line([str(header) for header in headers]))
+        file.write(border)
+
+        count = 0
+        for row in sample:
+            file.write(line(row))
+            count += 1
+        remaining = rows if limit is None else islice(rows, limit - count)
+        for row in remaining:
+            file.write(line(['' if value is None else str(value) for value in row]))
+            count += 1
+
+        file.write(border)
+        return count + self._write_rest(rows)
+
+
+class CsvRenderer(Renderer):
+    """Строки в формате CSV; каждая строка записывается сразу после чтения."""
+
+    notice_to_stderr = True
+
+    def render(self, title, rows, headers):
+        rows = iter(rows)
+        writer = csv.writer(self.file)
+        writer.writerow(headers)
+        count = 0
+        for row in islice(rows, self.max_rows):
+            writer.writerow(row)
+            count += 1
+        return count + self._write_rest(rows)
+
+
+class JsonLinesRenderer(Renderer):
+    """По одному JSON-объекту на строку; значения, которых нет в JSON (Decimal, date), выводятся строками."""
+
+    notice_to_stderr = True
+
+    def render(self, title, rows, headers):
+        rows = iter(rows)
+        file = self.file
+        count = 0
+        for row in islice(rows, self.max_rows):
+            file.write(json.dumps(dict(zip(headers, row)), ensure_ascii=False, default=str))
+            file.write('\n')
+            count += 1
+        return count + self._write_rest(rows)
+
+
+RENDERERS = {
+    'pretty': PrettyRenderer,
+    'stream': StreamingRenderer,
+    'csv': CsvRenderer,
+    'jsonl': JsonLinesRenderer,
+}
+
+
+def get_renderer(output=None, **kwargs):
+    """
+    Возвращает рендерер.
+
+    Args:
+        output: Готовый рендерер или название формата ('pretty', 'stream', 'csv', 'jsonl');
+            по умолчанию - формат TASK_OUTPUT_FORMAT.
+        kwargs: Параметры конструктора рендерера (file, max_rows, sample_size);
+            max_rows по умолчанию берется из TASK_OUTPUT_MAX_ROWS.
+    """
+    if isinstance(output, Renderer):
+        return output
+
+    name = output or TASK_OUTPUT_FORMAT
+    try:
+        renderer_class = RENDERERS[name]
+    except KeyError:
+        raise ValueError(f'Неизвестный формат вывода {name!r}, доступны: {", ".join(RENDERERS)}') from None
+
+    kwargs.setdefault('max_rows', TASK_OUTPUT_MAX_ROWS)
+    if renderer_class is not StreamingRenderer:
+        kwargs.pop('sample_size', None)
+    return renderer_class(**kwargs)
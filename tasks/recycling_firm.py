@@ -0,0 +1,371 @@
+from bisect import bisect_right
+from datetime import date
+
+from sqlalchemy import and_, bindparam, func, select
+
+from db.database import exec_query
+from db.db_2_recycling_firm.models import Balance, Balance_o, Income, Income_o, Outcome, Outcome_o
+from tasks.base import SessionCreater, cached_statement
+
+
+class CashCheckpoints:
+    """
+    Снимок нарастающих остатков по пунктам приема для поиска остатка на дату за O(log n).
+
+    Для каждого пункта хранятся упорядоченные даты операций и остаток на конец каждой из них
+    (префиксные суммы прихода минус расхода). Снимок не следит за изменениями данных:
+    после загрузки новых операций его нужно построить заново.
+    """
+
+    def __init__(self, dates, balances):
+        self._dates = dates
+        self._balances = balances
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Строит снимок по строкам (point, date, inc, out, balance), упорядоченным по пункту и дате,
+        - например, по результату RecyclingFirmTasks.running_balance.
+
+        Args:
+            rows: Итерируемые строки нарастающих остатков.
+        """
+        dates, balances = {}, {}
+        for point, date, _, _, balance in rows:
+            dates.setdefault(point, []).append(date)
+            balances.setdefault(point, []).append(balance)
+        return cls(dates, balances)
+
+    @property
+    def points(self):
+        """Пункты приема, вошедшие в снимок."""
+        return sorted(self._dates)
+
+    def balance_at(self, point, on_date):
+        """
+        Возвращает остаток пункта на конец дня `on_date`: 0 до первой операции,
+        None для пункта без операций.
+
+        Args:
+            point (int): Пункт приема.
+            on_date (date): Дата.
+        """
+        dates = self._dates.get(point)
+        if dates is None:
+            return None
+        index = bisect_right(dates, on_date)
+        return self._balances[point][index - 1] if index else 0
+
+
+class RecyclingFirmTasks(SessionCreater):
+    """
+    Класс для решения задач по второй БД (Фирма вторсырья)
+    """
+
+    # Варианты task_N_postgre вычисляют результат по исходным таблицам, а ORM-варианты читают
+    # материализованные балансы (db/db_2_recycling_firm/balances.py), поэтому сравнение вариантов
+    # (python -m tasks.equivalence) проверяет и актуальность балансов
+    SQL_29 = """
+        SELECT
+            coalesce(i.point, o.point) AS point,
+            coalesce(i.date, o.date) AS date,
+            i.inc,
+            o.out
+        FROM income_o i
+        FULL OUTER JOIN outcome_o o
+            ON i.point = o.point AND i.date = o.date
+        """
+
+    SQL_30 = """
+        SELECT
+            coalesce(i.point, o.point) AS point,
+            coalesce(i.date, o.date) AS date,
+            o.sum_out,
+            i.sum_inc
+        FROM (SELECT point, date, sum(inc) AS sum_inc FROM income GROUP BY point, date) i
+        FULL OUTER JOIN (SELECT point, date, sum(out) AS sum_out FROM outcome GROUP BY point, date) o
+            ON i.point = o.point AND i.date = o.date
+        ORDER BY date
+        """
+
+    @cached_statement
+    def stmt_29():
+        """Запрос SQLAlchemy для task_29."""
+        # Полное внешнее соединение Income_o и Outcome_o уже материализовано в balance_o
+        return (
+            select(
+                Balance_o.point,
+                Balance_o.date,
+                Balance_o.inc,
+                Balance_o.out
+            )
+        )
+
+    @cached_statement
+    def stmt_29_range():
+        """
+        Запрос task_29 за период [:date_from, :date_to] по исходным таблицам: условие по дате
+        у каждой из них позволяет PostgreSQL читать только секции периода (см. partitions.py).
+        """
+        income = (
+            select(Income_o.point, Income_o.date, Income_o.inc)
+            .where(Income_o.date.between(bindparam('date_from'), bindparam('date_to')))
+            .subquery()
+        )
+        outcome = (
+            select(Outcome_o.point, Outcome_o.date, Outcome_o.out)
+            .where(Outcome_o.date.between(bindparam('date_from'), bindparam('date_to')))
+            .subquery()
+        )
+        return (
+            select(
+                func.coalesce(income.c.point, outcome.c.point).label('point'),
+                func.coalesce(income.c.date, outcome.c.date).label('date'),
+                income.c.inc,
+                outcome.c.out
+            )
+            .join_from(
+                income, outcome,
+                and_(income.c.point == outcome.c.point, income.c.date == outcome.c.date),
+                full=True
+            )
+        )
+
+    def task_29(self, date_from=None, date_to=None):
+        """
+        В предположении, что приход и расход денег на каждом пункте приема
+        фиксируется не чаще одного раза в день [т.е. первичный ключ (пункт, дата)],
+        написать запрос с выходными данными (пункт, дата, приход, расход).
+
+        Использовать таблицы Income_o и Outcome_o.
+
+        SELECT
+            CASE
+                WHEN i.point IS NOT NULL THEN i.point
+                ELSE o.point
+            END,
+            CASE
+                WHEN i.date IS NOT NULL THEN i.date
+                ELSE o.date
+            END,
+            inc,
+            out
+        FROM Income_o i
+        FULL OUTER JOIN Outcome_o o
+            ON i.point = o.point
+        AND i.date = o.date;
+
+        Если задан период (date_from и/или date_to, включительно), строки за него читаются
+        из Income_o и Outcome_o запросом stmt_29_range, а не из материализованного balance_o.
+        """
+        if date_from is None and date_to is None:
+            query = self.session.execute(self.stmt_29())
+        else:
+            query = self.session.execute(self.stmt_29_range(), {
+                'date_from': date_from or date.min, 'date_to': date_to or date.max
+            })
+
+        headers = ['POINT', 'DATE', 'inc', 'out']
+        self._show("Task #29 (SQL-Alchemy):", query, headers)
+
+    def task_29_postgre(self):
+        result = exec_query(self.SQL_29, domain='recycling_firm')
+
+        if result:
+            headers = ['POINT', 'DATE', 'inc', 'out']
+            self._show("Task #29 (PostgreSQL):", result, headers)
+        else:
+            print("No results found")
+
+    @cached_statement
+    def stmt_30():
+        """Запрос SQLAlchemy для task_30."""
+        # Суммы за каждый день уже посчитаны в balance, группировка по всей истории не нужна
+        return (
+            select(
+                Balance.point,
+                Balance.date,
+                Balance.out.label('sum_out'),
+                Balance.inc.label('sum_inc')
+            )
+            .order_by(Balance.date)
+        )
+
+    @cached_statement
+    def stmt_30_range():
+        """Запрос task_30 за период [:date_from, :date_to] по исходным таблицам (см. stmt_29_range)."""
+        income = (
+            select(Income.point, Income.date, func.sum(Income.inc).label('sum_inc'))
+            .where(Income.date.between(bindparam('date_from'), bindparam('date_to')))
+            .group_by(Income.point, Income.date)
+            .subquery()
+        )
+        outcome = (
+            select(Outcome.point, Outcome.date, func.sum(Outcome.out).label('sum_out'))
+            .where(Outcome.date.between(bindparam('date_from'), bindparam('date_to')))
+            .group_by(Outcome.point, Outcome.date)
+            .subquery()
+        )
+        day = func.coalesce(income.c.date, outcome.c.date).label('date')
+        return (
+            select(
+                func.coalesce(income.c.point, outcome.c.point).label('point'),
+                day,
+                outcome.c.sum_out,
+                income.c.sum_inc
+            )
+            .join_from(
+                income, outcome,
+                and_(income.c.point == outcome.c.point, income.c.date == outcome.c.date),
+                full=True
+            )
+            .order_by(day)
+        )
+
+    def task_30(self, date_from=None, date_to=None):
+        """
+        В предположении, что приход и расход денег на каждом
+        пункте приема фиксируется произвольное число раз (первичным ключом
+        в таблицах является столбец code), требуется получить таблицу,
+        в которой каждому пункту за каждую дату выполнения операций будет
+        соответствовать одна строка.
+
+        SELECT
+          point,
+          date,
+          sum(sum_out) as sum_out,
+          sum(sum_inc) as sum_inc
+        FROM (SELECT point,
+                     date,
+                     sum(inc) as sum_inc,
+                     NULL as sum_out
+              FROM income
+              GROUP BY point, date
+              UNION
+              SELECT point,
+                     date,
+                     NULL sum_inc,
+                     sum(out) as sum_out
+              FROM outcome
+              GROUP BY point, date) t
+        GROUP BY point, date
+
+        Если задан период (date_from и/или date_to, включительно), суммы за него считаются
+        по Income и Outcome запросом stmt_30_range, а не читаются из материализованного balance.
+        """
+        if date_from is None and date_to is None:
+            query = self.session.execute(self.stmt_30())
+        else:
+            query = self.session.execute(self.stmt_30_range(), {
+                'date_from': date_from or date.min, 'date_to': date_to or date.max
+            })
+
+        headers = ['POINT', 'DATE', 'sum_out', 'sum_inc']
+        self._show("Task #30 (SQL-Alchemy):", query, headers)
+
+    def task_30_postgre(self):
+        result = exec_query(self.SQL_30, domain='recycling_firm')
+
+        if result:
+            headers = ['POINT', 'DATE', 'sum_out', 'sum_inc']
+            self._show("Task #30 (PostgreSQL):", result, headers)
+        else:
+            print("No results found")
+
+    # Заголовки строк running_balance
+    RUNNING_BALANCE_HEADERS = ['POINT', 'DATE', 'inc', 'out', 'balance']
+
+    @staticmethod
+    def _running_balance_statement(point=None, date_from=None, date_to=None):
+        """
+        Запрос нарастающих остатков: один упорядоченный проход оконной суммы по balance.
+
+        Отбор по пункту и по date_to сделан до окна, а по date_from - после него, чтобы остаток
+        на первую дату периода учитывал всю предыдущую историю пункта. Сортировка результата
+        совпадает с порядком окна (point, date), поэтому PostgreSQL обходится одной сортировкой
+        или чтением по первичному ключу balance.
+        """
+        flow = func.coalesce(Balance.inc, 0) - func.coalesce(Balance.out, 0)
+        running = select(
+            Balance.point,
+            Balance.date,
+            Balance.inc,
+            Balance.out,
+            func.sum(flow).over(
+                partition_by=Balance.point, order_by=Balance.date, rows=(None, 0)
+            ).label('balance')
+        )
+        if point is not None:
+            running = running.where(Balance.point == point)
+        if date_to is not None:
+            running = running.where(Balance.date <= date_to)
+        running = running.subquery()
+
+        statement = select(running).order_by(running.c.point, running.c.date)
+        if date_from is not None:
+            statement = statement.where(running.c.date >= date_from)
+        return statement
+
+    def running_balance(self, point=None, date_from=None, date_to=None, batch_size=None):
+        """
+        Возвращает итератор по нарастающим остаткам денег на пунктах приема
+        (point, date, inc, out, balance) в порядке пункта и даты.
+
+        inc и out - приход и расход за день (таблицы Income и Outcome), balance - остаток
+        на конец дня с начала истории пункта. Строки читаются с сервера пачками (см. stream),
+        поэтому длинный период не загружается в память целиком.
+
+        Args:
+            point (int): Пункт приема; по умолчанию - все пункты.
+            date_from (date): Первая дата периода включительно; по умолчанию - с начала истории.
+            date_to (date): Последняя дата периода включительно; по умолчанию - до конца истории.
+            batch_size (int): Размер пачки, по умолчанию DB_FETCH_BATCH_SIZE.
+        """
+        statement = self._running_balance_statement(point, date_from, date_to)
+        return self.stream(statement, batch_size)
+
+    def show_running_balance(self, point=None, date_from=None, date_to=None, batch_size=None):
+        """
+        Выводит нарастающие остатки рендерером `output` (аргументы - как у running_balance).
+        С форматами 'stream', 'csv' и 'jsonl' строки печатаются по мере чтения.
+        """
+        rows = self.running_balance(point, date_from, date_to, batch_size)
+        self._show("Running balance:", rows, self.RUNNING_BALANCE_HEADERS)
+
+    @cached_statement
+    def stmt_cash_on_hand():
+        """Остаток пункта на конец дня :on_date - сумма по префиксу первичного ключа (point, date) balance."""
+        return (
+            select(func.coalesce(func.sum(func.coalesce(Balance.inc, 0) - func.coalesce(Balance.out, 0)), 0))
+            .where(Balance.point == bindparam('point'), Balance.date <= bindparam('on_date'))
+        )
+
+    def cash_checkpoints(self, point=None, batch_size=None):
+        """
+        Строит снимок CashCheckpoints нарастающих остатков одним проходом running_balance.
+
+        Args:
+            point (int): Пункт приема; по умолчанию - все пункты.
+            batch_size (int): Размер пачки, по умолчанию DB_FETCH_BATCH_SIZE.
+        """
+        return CashCheckpoints.from_rows(self.running_balance(point, batch_size=batch_size))
+
+    def cash_on_hand(self, point, on_date, checkpoints=None):
+        """
+        Возвращает остаток денег на пункте приема на конец дня `on_date`.
+
+        Без `checkpoints` выполняется один запрос к balance; со снимком cash_checkpoints остаток
+        находится двоичным поиском без обращения к БД, что выгодно для серии запросов.
+        Пункта, которого нет в снимке (например, снимок построен по другому пункту), остаток
+        запрашивается из БД.
+
+        Args:
+            point (int): Пункт приема.
+            on_date (date): Дата.
+            checkpoints (CashCheckpoints): Снимок нарастающих остатков.
+        """
+        if checkpoints is not None:
+            balance = checkpoints.balance_at(point, on_date)
+            if balance is not None:
+                return balance
+        return self.session.scalar(self.stmt_cash_on_hand(), {'point': point, 'on_date': on_date})
@@ -0,0 +1,252 @@
+"""
+Реестр задач: автоматически находит методы `task_N` и `task_N_postgre` в классах задач.
+
+Классы задач загружаются лениво, поэтому выбор задач одной БД не импортирует модели остальных.
+"""
+import contextlib
+import importlib
+import io
+import json
+import re
+import sys
+import threading
+import time
+import traceback
+import zlib
+from dataclasses import dataclass, fields
+
+from db.explain import capture_plans
+from db.instrumentation import TaskMetrics, enable_instrumentation, track_task
+
+# Предметная область -> класс задач (модуль, имя класса)
+TASK_CLASSES = {
+    'computer_firm': ('tasks.computer_firm', 'ComputerFirmTasks'),
+    'recycling_firm': ('tasks.recycling_firm', 'RecyclingFirmTasks'),
+    'ships': ('tasks.ships', 'ShipsTasks'),
+}
+
+TASK_NAME_RE = re.compile(r'^task_(?P<number>\d+)(?P<postgre>_postgre)?$')
+
+ORM = 'orm'
+POSTGRE = 'postgre'
+
+# Текст длиннее этого числа байт передается из рабочего процесса сжатым (см. TaskResult.__reduce__)
+COMPRESS_THRESHOLD = 1024
+
+
+def get_task_class(domain):
+    """Возвращает класс задач предметной области, импортируя его модуль при первом обращении."""
+    module_name, class_name = TASK_CLASSES[domain]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def _is_implemented(method):
+    """
+    Отличает решенные задачи от заготовок, у которых есть только docstring с T-SQL:
+    тело заготовки не обращается ни к одному имени (self.session, select, ...).
+    """
+    return bool(method.__code__.co_names)
+
+
+@dataclass(frozen=True, order=True)
+class TaskSpec:
+    """Описание зарегистрированной задачи. Содержит только строки и числа, поэтому передается между процессами."""
+    number: int
+    variant: str
+    domain: str
+    method: str
+
+    @property
+    def name(self):
+        return f'{self.domain}.{self.method}'
+
+    @property
+    def task_class(self):
+        return get_task_class(self.domain)
+
+
+@dataclass
+class TaskResult:
+    """Результат выполнения задачи: время, число строк, вывод и ошибка (если была)."""
+    spec: TaskSpec
+    seconds: float
+    rows: int = 0
+    output: str = ''
+    error: str = None
+    # Планы запросов задачи в режиме профилирования (см. db/explain.py)
+    plans: list = None
+    # Счетчики запросов задачи при включенном инструментировании (см. db/instrumentation.py)
+    metrics: dict = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __reduce__(self):
+        # Между процессами результат передается кортежем простых значений: длинный вывод
+        # и планы сжимаются, а метрики передаются без имен полей
+        spec = self.spec
+        return _restore_result, (
+            (spec.number, spec.variant, spec.domain, spec.method),
+            self.seconds,
+            self.rows,
+            _pack_text(self.output),
+            self.error,
+            None if self.plans is None else _pack_text(json.dumps(self.plans, default=str)),
+            None if self.metrics is None else tuple(self.metrics.values()),
+        )
+
+
+def _pack_text(text):
+    """Сжимает длинный текст; короткий остается строкой."""
+    data = text.encode('utf-8')
+    return zlib.compress(data, 1) if len(data) > COMPRESS_THRESHOLD else text
+
+
+def _unpack_text(value):
+    return zlib.decompress(value).decode('utf-8') if isinstance(value, bytes) else value
+
+
+def _restore_result(spec, seconds, rows, output, error, plans, metrics):
+    return TaskResult(
+        spec=TaskSpec(*spec),
+        seconds=seconds,
+        rows=rows,
+        output=_unpack_text(output),
+        error=error,
+        plans=None if plans is None else json.loads(_unpack_text(plans)),
+        metrics=None if metrics is None else dict(zip((field.name for field in fields(TaskMetrics)), metrics)),
+    )
+
+
+def discover(domains=None):
+    """
+    Находит решенные задачи в классах задач.
+
+    Args:
+        domains: Предметные области для поиска, по умолчанию - все.
+
+    Returns:
+        Список TaskSpec, упорядоченный по номеру задачи и варианту решения.
+    """
+    specs = []
+    for domain in domains or TASK_CLASSES:
+        task_class = get_task_class(domain)
+        for attribute in dir(task_class):
+            match = TASK_NAME_RE.match(attribute)
+            if match is None or not _is_implemented(getattr(task_class, attribute)):
+                continue
+            specs.append(TaskSpec(
+                number=int(match['number']),
+                variant=POSTGRE if match['postgre'] else ORM,
+                domain=domain,
+                method=attribute
+            ))
+    return sorted(specs)
+
+
+def select_tasks(numbers=None, domains=None, variants=None):
+    """
+    Отбирает зарегистрированные задачи по номерам, предметным областям и вариантам решения.
+    Пустой фильтр означает "все".
+    """
+    numbers = set(numbers or ())
+    variants = set(variants or ())
+    return [
+        spec for spec in discover(domains)
+        if (not numbers or spec.number in numbers)
+        and (not variants or spec.variant in variants)
+    ]
+
+
+class _ThreadStdout:
+    """Замена sys.stdout, направляющая вывод потока в его буфер, если поток перехватывает вывод."""
+
+    def __init__(self, default):
+        self.default = default
+        self.local = threading.local()
+
+    @property
+    def target(self):
+        buffer = getattr(self.local, 'buffer', None)
+        return self.default if buffer is None else buffer
+
+    def write(self, text):
+        return self.target.write(text)
+
+    def flush(self):
+        self.target.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.target, name)
+
+
+_stdout_lock = threading.Lock()
+_stdout_users = 0
+
+
+@contextlib.contextmanager
+def _capture_stdout(buffer):
+    """
+    Перехватывает вывод текущего потока в `buffer`. В отличие от contextlib.redirect_stdout,
+    не затрагивает вывод других потоков, поэтому задачи можно выполнять в пуле потоков.
+    """
+    global _stdout_users
+    with _stdout_lock:
+        if _stdout_users == 0:
+            sys.stdout = _ThreadStdout(sys.stdout)
+        _stdout_users += 1
+        proxy = sys.stdout
+    proxy.local.buffer = buffer
+    try:
+        yield buffer
+    finally:
+        proxy.local.buffer = None
+        with _stdout_lock:
+            _stdout_users -= 1
+            if _stdout_users == 0:
+                sys.stdout = proxy.default
+
+
+def run_task(spec, session=None, capture_output=True, output=None, explain=False, instrument=False):
+    """
+    Выполняет одну задачу в собственной сессии (или в переданной) и измеряет время.
+
+    Args:
+        spec (TaskSpec): Задача.
+        session: Готовая сессия SQLAlchemy; по умолчанию открывается новая.
+        capture_output (bool): Перехватить печатаемую задачей таблицу в TaskResult.output
+            вместо вывода в stdout.
+        output: Рендерер результата или название формата (см. tasks/output.py).
+        explain (bool): Сохранить планы EXPLAIN ANALYZE запросов задачи в TaskResult.plans.
+        instrument (bool): Включить инструментирование (если оно еще не включено); счетчики
+            запросов задачи попадают в TaskResult.metrics.
+
+    Returns:
+        TaskResult. Исключение задачи не пробрасывается, а записывается в TaskResult.error.
+    """
+    captured = io.StringIO()
+    redirect = _capture_stdout(captured) if capture_output else contextlib.nullcontext()
+    started = time.perf_counter()
+    rows, error = 0, None
+    profiling = capture_plans() if explain else contextlib.nullcontext()
+    if instrument:
+        enable_instrumentation()
+
+    with redirect, profiling as plans, track_task(spec.name) as metrics:
+        try:
+            with spec.task_class(session=session, output=output) as tasks:
+                getattr(tasks, spec.method)()
+                rows = tasks.last_row_count
+        except Exception:
+            error = traceback.format_exc(limit=3)
+
+    return TaskResult(
+        spec=spec,
+        seconds=time.perf_counter() - started,
+        rows=rows,
+        output=captured.getvalue(),
+        error=error,
+        plans=plans,
+        metrics=metrics.as_dict() if metrics is not None else None
+    )
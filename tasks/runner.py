@@ -0,0 +1,74 @@
+"""
+Параллельный запуск задач из реестра на пуле рабочих процессов или потоков.
+
+Рабочие процессы обходят GIL при построении объектов ORM и выводе результатов. Сразу после fork
+рабочий процесс забывает унаследованные движки, пулы и сессии родителя (обработчики os.register_at_fork
+в db/routing.py и db/database.py) и создает собственные при первом запросе, поэтому задачи разных
+процессов не делят соединения. Результаты возвращаются родителю в сжатом виде (TaskResult.__reduce__).
+
+Потоки одного процесса делят движки, но каждый работает в собственной сессии (db.database.ScopedSession),
+а пулы соединений увеличиваются до числа потоков.
+
+На пуле задачи отправляются в порядке убывания записанной длительности (см. tasks/durations.py),
+а результаты возвращаются в исходном порядке.
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from db.database import size_pools
+from db.instrumentation import add_metrics
+from tasks.durations import longest_first
+from tasks.registry import run_task
+
+
+def _run_on_pool(executor, task_runner, specs, durations):
+    """Отправляет задачи в пул от самой долгой к самой короткой и возвращает результаты в порядке specs."""
+    futures = {}
+    for spec in longest_first(specs, durations):
+        # Одна и та же задача может встречаться в specs несколько раз
+        futures.setdefault(spec, []).append(executor.submit(task_runner, spec))
+    return [futures[spec].pop(0).result() for spec in specs]
+
+
+def run_tasks(specs, workers=1, output=None, explain=False, instrument=False, threads=1, durations=None):
+    """
+    Выполняет задачи и возвращает их результаты в порядке `specs`.
+
+    Args:
+        specs: Последовательность TaskSpec (см. tasks.registry.select_tasks).
+        workers (int): Число рабочих процессов; при 1 задачи выполняются в текущем процессе.
+        threads (int): Число потоков текущего процесса, выполняющих задачи одновременно
+            (только при workers=1).
+        output: Рендерер результатов или название формата (см. tasks/output.py). Рендерер без
+            явно заданного файла передается в рабочие процессы вместе с задачей.
+        explain (bool): Собрать планы EXPLAIN ANALYZE запросов каждой задачи (TaskResult.plans).
+        instrument (bool): Считать запросы каждой задачи (TaskResult.metrics и db.instrumentation.get_metrics;
+            метрики рабочих процессов добавляются к метрикам текущего процесса).
+        durations (dict): Записанные длительности задач {имя: секунды} (см. tasks.durations.load_durations),
+            по которым задачи упорядочиваются на пуле; без них порядок отправки совпадает со `specs`.
+
+    Returns:
+        Пара (список TaskResult, общее время выполнения в секундах).
+    """
+    if workers > 1 and threads > 1:
+        raise ValueError('Укажите либо рабочие процессы (workers), либо потоки (threads)')
+
+    specs = list(specs)
+    task_runner = partial(run_task, output=output, explain=explain, instrument=instrument)
+    started = time.perf_counter()
+
+    if threads > 1:
+        size_pools(threads)
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = _run_on_pool(executor, task_runner, specs, durations or {})
+    elif workers <= 1:
+        results = [task_runner(spec) for spec in specs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = _run_on_pool(executor, task_runner, specs, durations or {})
+        for result in results:
+            if result.metrics is not None:
+                add_metrics(result.spec.name, result.metrics)
+
+    return results, time.perf_counter() - started
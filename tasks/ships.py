@@ -0,0 +1,385 @@
+from sqlalchemy import (
+    select,
+    union,
+    except_,
+    func,
+    and_,
+    intersect,
+    union_all,
+    case,
+    bindparam,
+    Float,
+)
+
+from db.db_3_ships.models import Battles, Outcomes, Ships, Classes
+from tasks.base import SessionCreater, cached_statement
+
+
+class ShipsTasks(SessionCreater):
+    # Запросы SQLAlchemy строятся один раз и переиспользуются (см. cached_statement),
+    # изменяемые условия задач передаются в них через bindparam
+
+    # Отчеты обходят корабли каждого класса и участников каждого сражения
+    LOADER_STRATEGIES = {
+        'Classes.ships': 'select',
+        'Battles.outcomes': 'select',
+    }
+
+    def class_fleet(self):
+        """Обходит классы и их корабли и возвращает строки (class_name, country, ships, names)."""
+        statement = select(Classes).order_by(Classes.class_name).options(*self.loader_options(Classes.ships))
+        for ship_class in self.session.scalars(statement).unique():
+            names = sorted(ship.name for ship in ship_class.ships)
+            yield ship_class.class_name, ship_class.country, len(names), ', '.join(names)
+
+    def show_class_fleet(self):
+        """Выводит class_fleet рендерером `output`."""
+        self._show("Class fleet:", self.class_fleet(), ['class_name', 'country', 'ships', 'names'])
+
+    def battle_results(self):
+        """Обходит сражения и их участников и возвращает строки (battle, date, ships, sunk)."""
+        statement = select(Battles).order_by(Battles.date, Battles.name).options(*self.loader_options(Battles.outcomes))
+        for battle in self.session.scalars(statement).unique():
+            sunk = sum(outcome.result == 'sunk' for outcome in battle.outcomes)
+            yield battle.name, battle.date, len(battle.outcomes), sunk
+
+    def show_battle_results(self):
+        """Выводит battle_results рендерером `output`."""
+        self._show("Battle results:", self.battle_results(), ['battle', 'date', 'ships', 'sunk'])
+
+    @cached_statement
+    def stmt_31():
+        """Запрос SQLAlchemy для task_31."""
+        return (
+            select(
+                Classes.class_name,
+                Classes.country
+            )
+            .filter(Classes.bore >= bindparam('min_bore', 16))
+        )
+
+    def task_31(self, min_bore=16):
+        """
+        SELECT class, country
+        FROM Classes
+        WHERE bore >= 16
+        """
+        query = self.session.execute(self.stmt_31(), {'min_bore': min_bore})
+
+        headers = ['Class_name', 'Country']
+        self._show("Task #31 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_32():
+        """Запрос SQLAlchemy для task_32."""
+        # Исключаем корабли, которые присутствуют и в таблице Outcomes, и в таблице Ships
+        except_subquery = except_(
+            select(Outcomes.ship.label('class_name')),
+            select(Ships.name.label('class_name'))
+        )
+
+        # Объединяем подзапросы для join
+        union_subqueries = union_all(select(Ships.class_name), except_subquery).alias()
+
+        return (
+            select(
+                Classes.country,
+                func.cast(func.avg(func.power(Classes.bore, 3) / 2), Float(6, 2)).label('weight')
+            )
+            .join(
+                union_subqueries,
+                Classes.class_name == union_subqueries.c.class_name
+            )
+            .group_by(Classes.country)
+        )
+
+    def task_32(self):
+        """
+        Одной из характеристик корабля является половина куба калибра его главных орудий (mw).
+        С точностью до 2 десятичных знаков определите среднее значение mw для кораблей каждой
+        страны, у которой есть корабли в базе данных.
+
+        SELECT
+            country,
+            CAST(AVG(POWER(bore, 3) / 2) AS numeric(6, 2)) AS weight
+        FROM Classes
+         JOIN (SELECT class
+               FROM Ships
+               UNION ALL
+              (SELECT ship AS class
+               FROM Outcomes
+               EXCEPT
+               SELECT
+               name AS class
+               FROM
+               Ships)) AS t --Исключаем корабли, которые присутствуют и в таблице Outcomes, и в таблице Ships
+          ON Classes.class = t.class
+        GROUP BY country
+        """
+        query = self.session.execute(self.stmt_32())
+
+        headers = ['Country', 'Weight']
+        self._show("Task #32 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_33():
+        """Запрос SQLAlchemy для task_33."""
+        return (
+            select(
+                Outcomes.ship
+            )
+            .filter(and_(Outcomes.battle.like('%Atlantic'), Outcomes.result == 'sunk'))
+        )
+
+    def task_33(self):
+        """
+        Укажите корабли, потопленные в сражениях в Северной Атлантике (North Atlantic). Вывод: ship.
+
+        SELECT ship
+        FROM Outcomes
+        WHERE battle LIKE '%Atlantic'
+          AND result = 'sunk'
+        """
+        query = self.session.execute(self.stmt_33())
+
+        headers = ['ships_name']
+        self._show("Task #33 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_34():
+        """Запрос SQLAlchemy для task_34."""
+        return (
+            select(
+                Ships.name
+            )
+            .join(Classes, Classes.class_name == Ships.class_name)
+            .filter(
+                and_(
+                    Ships.launched >= 1922,
+                    Classes.type == 'bb',
+                    Classes.displacement > 35000
+                )
+            )
+        )
+
+    def task_34(self):
+        """
+        По Вашингтонскому международному договору от начала 1922 г. запрещалось
+        строить линейные корабли водоизмещением более 35 тыс. тонн. Укажите корабли,
+        нарушившие этот договор (учитывать только корабли c известным годом спуска на воду).
+        Вывести названия кораблей.
+
+        SELECT
+          s.name
+        FROM classes c JOIN ships s
+          ON c.class = s.class
+        WHERE s.launched >= 1922
+          AND c.type = 'bb'
+          AND c.displacement > 35000
+        """
+        query = self.session.execute(self.stmt_34())
+
+        headers = ['ships_name']
+        self._show("Task #34 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_36():
+        """Запрос SQLAlchemy для task_36."""
+        return union(
+            select(Ships.name).filter(Ships.name == Ships.class_name),
+            select(Outcomes.ship).join(Classes, Classes.class_name == Outcomes.ship)
+        )
+
+    def task_36(self):
+        """
+        Перечислите названия головных кораблей,
+        имеющихся в базе данных (учесть корабли в Outcomes).
+
+        SELECT name
+        FROM Ships
+        WHERE name = class
+        UNION
+        SELECT ship
+        FROM Outcomes, Classes
+        WHERE class = ship
+        """
+        query = self.session.execute(self.stmt_36())
+
+        headers = ['ships_name']
+        self._show("Task #36 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_37():
+        """Запрос SQLAlchemy для task_37."""
+        from_subquery = (
+            union(
+                select(Ships.name, Ships.class_name),
+                select(
+                    Classes.class_name.label('name'),
+                    Classes.class_name
+                ).join(Outcomes, Classes.class_name == Outcomes.ship)
+            )
+        ).alias()
+
+        return (
+            select(
+                from_subquery.c.class_name
+            )
+            .group_by(from_subquery.c.class_name)
+            .having(func.count(from_subquery.c.name) == 1)
+        )
+
+    def task_37(self):
+        """
+        Найдите классы, в которые входит только один
+        корабль из базы данных (учесть также корабли в Outcomes).
+
+        SELECT class
+        FROM (
+          SELECT name, class
+          FROM Ships
+          UNION
+          SELECT class AS name, class
+          FROM Classes JOIN Outcomes
+            ON Classes.class = Outcomes.ship
+        ) tmp
+        GROUP BY class
+        HAVING count(tmp.name) = 1
+        """
+        query = self.session.execute(self.stmt_37())
+
+        headers = ['class_name']
+        self._show("Task #37 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_38():
+        """Запрос SQLAlchemy для task_38."""
+        return intersect(
+            select(Classes.country).filter(Classes.type == 'bb'),
+            select(Classes.country).filter(Classes.type == 'bc')
+        )
+
+    def task_38(self):
+        """
+        Найдите страны, имевшие когда-либо классы обычных боевых кораблей ('bb')
+        и имевшие когда-либо классы крейсеров ('bc').
+
+        SELECT country
+        FROM Classes
+        WHERE type = 'bb'
+        INTERSECT
+        SELECT country
+        FROM Classes
+        WHERE type = 'bc'
+        """
+        query = self.session.execute(self.stmt_38())
+
+        headers = ['country']
+        self._show("Task #38 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_52():
+        """Запрос SQLAlchemy для task_52."""
+        return (
+            select(
+                Ships.name
+            )
+            .join(Classes, Classes.class_name == Ships.class_name)
+            .filter(
+                func.coalesce(Classes.country, 'Japan') == 'Japan',
+                func.coalesce(Classes.numGuns, '9') >= '9',
+                func.coalesce(Classes.displacement, '65000') <= '65000',
+                func.coalesce(Classes.type, 'bb') == 'bb',
+                func.coalesce(Classes.bore, '18') < '19'
+            )
+        )
+
+    def task_52(self):
+        """
+        Определить названия всех кораблей из таблицы Ships,
+        которые могут быть линейным японским кораблем, имеющим
+        число главных орудий не менее девяти, калибр орудий менее 19 дюймов
+        и водоизмещение не более 65 тыс. тонн
+
+        SELECT name
+        FROM ships JOIN classes
+          ON classes.class = ships.class
+        WHERE
+            COALESCE(country, 'Japan') = 'Japan'
+            AND COALESCE(numGuns, 9) >= 9
+            AND COALESCE(displacement, 65000) <= 65000
+            AND COALESCE(TYPE, 'bb') = 'bb'
+            AND COALESCE(bore, 18) < 19
+        """
+        query = self.session.execute(self.stmt_52())
+
+        headers = ['ships_name']
+        self._show("Task #52 (SQL-Alchemy):", query, headers)
+
+    @cached_statement
+    def stmt_56():
+        """Запрос SQLAlchemy для task_56."""
+        union_1 = (
+            select(
+                Classes.class_name,
+                Outcomes.result,
+                Outcomes.ship.label('name')
+            )
+            .join(Outcomes, Outcomes.ship == Classes.class_name, isouter=True)
+        )
+
+        union_2 = (
+            select(
+                Ships.class_name,
+                Outcomes.result,
+                Ships.name
+            )
+            .join(Outcomes, Ships.name == Outcomes.ship)
+        )
+
+        tmp_cte = union(union_1, union_2).cte('tmp_cte')
+
+        return (
+            select(
+                tmp_cte.c.class_name,
+                func.sum(
+                    case(
+                        (tmp_cte.c.result == 'sunk', 1), else_=0
+                    )
+                ).label('sunks_qty')
+            )
+            .group_by(tmp_cte.c.class_name)
+        )
+
+    def task_56(self):
+        """
+        Для каждого класса определите число кораблей этого класса, потопленных в сражениях.
+        Вывести: класс и число потопленных кораблей.
+
+        with tmp as (
+         -- Таблица результатов боев головных кораблей из outcomes и неголовных из Classes
+         SELECT c.class, o.result, o.ship
+         FROM Classes c LEFT JOIN Outcomes o
+          ON c.class = o.ship
+          UNION
+         -- Таблица результатов боев не головных кораблей в т.ч из outcomes
+         SELECT s.class, o.result, s.name
+         FROM Outcomes o JOIN Ships s
+          ON o.ship = s.name
+        )
+
+        SELECT
+          class,
+          sum (
+               CASE
+                WHEN result = 'sunk' THEN 1
+                ELSE 0
+               END
+              ) as sunks_qty
+        FROM tmp
+        GROUP BY class
+        """
+        query = self.session.execute(self.stmt_56())
+
+        headers = ['class_name', 'sunks_qty']
+        self._show("Task #56 (SQL-Alchemy):", query, headers)
@@ -0,0 +1,40 @@
+"""Кэш результатов не отдает незафиксированные изменения одной сессии другим сессиям."""
+import pytest
+from sqlalchemy import create_engine, func, select
+
+from db.db_1_computer_firm.models import PC, Base
+from db.result_cache import disable_result_cache, enable_result_cache
+from db.routing import RoutingSession
+
+PCS = 200
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "computer_firm.db"}')
+    Base.metadata.create_all(engine)
+    with RoutingSession(bind=engine) as session:
+        session.add_all(PC(speed=500, ram=64, hd=10.0, cd='12x', price=600.0) for _ in range(PCS))
+        session.commit()
+    enable_result_cache()
+    yield engine
+    disable_result_cache()
+    engine.dispose()
+
+
+def count_pcs(session):
+    return session.scalar(select(func.count()).select_from(PC))
+
+
+def test_uncommitted_write_is_not_shared(engine):
+    with RoutingSession(bind=engine) as writer, RoutingSession(bind=engine) as reader:
+        writer.add(PC(speed=500, ram=64, hd=10.0, cd='12x', price=600.0))
+        writer.flush()
+        # Сессия видит свою запись, но результат не попадает в кэш
+        assert count_pcs(writer) == PCS + 1
+        assert count_pcs(reader) == PCS
+
+        writer.rollback()
+        assert count_pcs(reader) == PCS
+        assert count_pcs(writer) == PCS
+